@@ -6,14 +6,15 @@ import dotenv
 dotenv.load_dotenv(override=True)
 ROOT = os.path.abspath(os.path.dirname(__file__))
 
-from collections import deque
-
 GITHUB_PERSONAL_ACCESS_TOKEN = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL")
 
-from agents import Agent, Runner, trace, WebSearchTool
+from agents import Agent, trace, WebSearchTool
 from agents.mcp import MCPServer, MCPServerStdio
 
+from conversation_memory import ConversationMemory, agent_summarizer
+from instrumentation import InstrumentedMCPServer, run_agent
+
 
 async def run(mcp_server: MCPServer, directory_path: str):
     agent = Agent(
@@ -29,7 +30,7 @@ async def run(mcp_server: MCPServer, directory_path: str):
     주어진 회사에 대한 정보를 제공하는 web search assistant입니다.
     """
 
-    chat_history = deque([], maxlen=5)
+    memory = ConversationMemory(PROMPT, summarizer=agent_summarizer(OPENAI_MODEL), model=OPENAI_MODEL)
 
     while True:
         # Ask the user for the git command
@@ -38,23 +39,15 @@ async def run(mcp_server: MCPServer, directory_path: str):
         if command.lower() == "exit":
             break
         
-        END_PROMPT = f"""
-        history: {chat_history}
-        user: {command}"""
-
-        prompt = PROMPT + END_PROMPT
+        prompt = await memory.prompt(command)
         print(prompt)
 
         # Run the command and print the result
         print("\n" + "-" * 40)
         print(f"Running: {command}")
-        result = await Runner.run(starting_agent=agent, input=prompt)
+        result = await run_agent(agent, prompt, workflow="web_search")
         print(result.final_output)
-        current_chat = [
-            {"role": "user", "content": command},
-            {"role": "assistant", "content": result.final_output},
-        ]
-        chat_history.append(current_chat)
+        memory.add(command, result.final_output)
         print("\n" + "-" * 40)
 
 
@@ -88,7 +81,7 @@ async def main():
         },
     ) as server:
         with trace(workflow_name="MCP Git Example"):
-            await run(server, directory_path)
+            await run(InstrumentedMCPServer(server), directory_path)
 
 
 if __name__ == "__main__":
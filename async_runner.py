@@ -0,0 +1,75 @@
+"""
+앱이 소유하는 장수(long-lived) 백그라운드 이벤트 루프.
+
+Streamlit은 rerun마다 스크립트를 처음부터 다시 실행하므로 asyncio.run을 쓰면
+매 상호작용마다 이벤트 루프가 새로 만들어지고, 그 루프에 묶인 MCP 세션,
+subprocess 핸들, HTTP 연결이 모두 버려진다.
+BackgroundLoop는 전용 스레드에서 루프 하나를 계속 돌리고, 어느 스레드에서든
+코루틴을 제출할 수 있는 thread-safe API를 제공한다.
+
+사용 예:
+    app_loop = BackgroundLoop()
+    result = app_loop.run(some_coroutine())         # 블로킹 (스크립트 스레드)
+    future = app_loop.submit(some_coroutine())      # concurrent.futures.Future
+    result = await app_loop.run_async(coroutine())  # 다른 이벤트 루프 안에서
+"""
+import asyncio
+import concurrent.futures
+import platform
+import threading
+from typing import Any, Awaitable, Callable, Optional
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    # Windows에서 subprocess(stdio MCP 서버)를 쓰려면 Proactor 루프가 필요하다.
+    # 전역 정책을 바꾸지 않고 이 루프에만 적용한다.
+    if platform.system() == "Windows":
+        return asyncio.ProactorEventLoop()
+    return asyncio.new_event_loop()
+
+
+class BackgroundLoop:
+    def __init__(self, name: str = "app-loop"):
+        self.name = name
+        self.loop = new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._started.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread.is_alive() and self.loop.is_running()
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """루프에서 코루틴을 실행 (어느 스레드에서든 호출 가능)"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """코루틴을 실행하고 결과를 기다린다. 루프 스레드 안에서는 호출하면 안 된다."""
+        if self.in_loop_thread():
+            raise RuntimeError("BackgroundLoop.run() would deadlock when called from the loop thread")
+        return self.submit(coro).result(timeout)
+
+    async def run_async(self, coro: Awaitable) -> Any:
+        """다른 이벤트 루프에서 이 루프의 결과를 await"""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def call_soon(self, fn: Callable, *args) -> None:
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def stop(self, timeout: float = 10.0):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
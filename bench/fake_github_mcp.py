@@ -0,0 +1,100 @@
+"""
+벤치마크용 가짜 GitHub MCP 서버 (stdio).
+
+네트워크 없이 github-mcp-server와 같은 이름/인자의 tool을 제공하고
+미리 만들어 둔 응답을 설정한 지연 후 돌려준다.
+
+환경 변수:
+    FAKE_MCP_LATENCY_MS: tool 호출마다 추가할 지연 (기본 50ms)
+    FAKE_REPO_COUNT: search_repositories가 돌려줄 repository 수 (기본 40)
+    FAKE_MCP_LOG: 지정하면 tool 호출마다 JSONL 한 줄을 기록 (벤치마크가 실제 호출 수를 셀 때 사용)
+
+실행:
+    python bench/fake_github_mcp.py
+"""
+import asyncio
+import json
+import os
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+LATENCY = float(os.getenv("FAKE_MCP_LATENCY_MS", "50")) / 1000
+REPO_COUNT = int(os.getenv("FAKE_REPO_COUNT", "40"))
+LOG_PATH = os.getenv("FAKE_MCP_LOG")
+OWNER = "bench-user"
+
+mcp = FastMCP("fake-github")
+
+
+def _repo(i: int) -> dict:
+    return {
+        "name": f"project-{i:03d}",
+        "full_name": f"{OWNER}/project-{i:03d}",
+        "description": f"Benchmark repository number {i}",
+        "language": ["Python", "TypeScript", "Go", "Kotlin"][i % 4],
+        "stargazers_count": i * 3,
+        "fork": i % 7 == 0,
+        "private": False,
+        "html_url": f"https://github.com/{OWNER}/project-{i:03d}",
+        "default_branch": "main",
+        "topics": ["benchmark"],
+        "pushed_at": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T00:00:00Z",
+        "updated_at": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T00:00:00Z",
+    }
+
+
+REPOS = [_repo(i) for i in range(REPO_COUNT)]
+
+
+async def _simulate(tool: str, arguments: dict):
+    await asyncio.sleep(LATENCY)
+    if LOG_PATH:
+        with open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ts": time.time(), "tool": tool, "args": arguments}) + "\n")
+
+
+@mcp.tool()
+async def get_me() -> str:
+    """Get details of the authenticated GitHub user."""
+    await _simulate("get_me", {})
+    return json.dumps({"login": OWNER, "public_repos": REPO_COUNT})
+
+
+@mcp.tool()
+async def search_repositories(query: str, page: int = 1, perPage: int = 30) -> str:
+    """Search for GitHub repositories."""
+    await _simulate("search_repositories", {"query": query, "page": page, "perPage": perPage})
+    repos = REPOS
+    if "pushed:>" in query:
+        since = query.split("pushed:>", 1)[1].split()[0]
+        repos = [r for r in repos if r["pushed_at"] > since]
+    start = (page - 1) * perPage
+    return json.dumps({"total_count": len(repos), "incomplete_results": False, "items": repos[start:start + perPage]})
+
+
+@mcp.tool()
+async def get_file_contents(owner: str, repo: str, path: str, branch: str = "main") -> str:
+    """Get the contents of a file or directory from a GitHub repository."""
+    await _simulate("get_file_contents", {"owner": owner, "repo": repo, "path": path, "branch": branch})
+    if path in ("", "/"):
+        return json.dumps([
+            {"name": name, "path": name, "type": kind}
+            for name, kind in (("README.md", "file"), ("src", "dir"), ("requirements.txt", "file"))
+        ])
+    body = f"# {repo}\n\n" + "This is canned benchmark content.\n" * 40
+    return json.dumps({"name": path.split("/")[-1], "path": path, "encoding": "utf-8", "content": body})
+
+
+@mcp.tool()
+async def list_commits(owner: str, repo: str, sha: str = "", page: int = 1, perPage: int = 30) -> str:
+    """Get list of commits of a branch in a GitHub repository."""
+    await _simulate("list_commits", {"owner": owner, "repo": repo, "sha": sha, "page": page, "perPage": perPage})
+    return json.dumps([
+        {"sha": f"{i:040x}", "commit": {"message": f"commit {i} on {repo}", "author": {"name": OWNER}}}
+        for i in range((page - 1) * perPage, page * perPage)
+    ])
+
+
+if __name__ == "__main__":
+    mcp.run(transport="stdio")
@@ -0,0 +1,135 @@
+"""
+벤치마크용 스크립트 모델.
+
+OpenAI API를 호출하지 않고 미리 정한 tool 호출 계획(plan)을 따라 응답한다.
+Agent(model=FakeModel(...))로 넘기면 Runner.run이 실제 MCP 서버로 tool을 호출하고
+그 결과를 다시 모델에 넘기는 흐름은 그대로 유지되므로,
+모델 지연을 고정한 상태에서 MCP/프롬프트 구성 비용만 비교할 수 있다.
+
+- 한 번의 Runner.run 안에서 이미 받은 function_call_output 수를 보고
+  plan의 다음 tool을 호출하고, plan을 다 쓰면 최종 텍스트를 돌려준다.
+- 입력 프롬프트의 토큰 수를 세서 Usage.input_tokens로 보고하고,
+  begin_turn() 단위로 모델 호출 수/tool 호출 수/프롬프트 토큰을 집계한다.
+- Runner.run_streamed에서는 latency_ms 뒤에 첫 텍스트 delta를 보내고
+  이후 chunk_ms 간격으로 나머지 단어를 보낸 뒤 response.completed로 끝낸다.
+"""
+import asyncio
+import itertools
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from agents.usage import Usage
+from openai.types.responses import (Response, ResponseCompletedEvent, ResponseFunctionToolCall,
+                                   ResponseOutputMessage, ResponseOutputText, ResponseTextDeltaEvent,
+                                   ResponseUsage)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+from conversation_memory import make_token_counter
+
+ToolStep = Tuple[str, Dict[str, Any]]
+
+
+class FakeModel(Model):
+    """
+    Args:
+        plan: 턴마다 순서대로 호출할 (tool 이름, 인자) 목록.
+              Agent에 없는 tool은 건너뛴다 (예: tool이 없는 요약 Agent)
+        latency_ms: 모델 호출 한 번당 지연 (streaming에서는 첫 토큰까지의 지연)
+        reply: 최종 응답 텍스트
+        chunk_ms: streaming에서 텍스트 delta 사이 간격
+    """
+
+    def __init__(self, plan: Sequence[ToolStep] = (), latency_ms: float = 200.0,
+                 reply: str = "Benchmark answer streamed back one word at a time.", chunk_ms: float = 20.0):
+        self.plan = list(plan)
+        self.latency = latency_ms / 1000
+        self.reply = reply
+        self.chunk = chunk_ms / 1000
+        self.count_tokens = make_token_counter()
+        self.turns: List[Dict[str, int]] = []
+        self._ids = itertools.count(1)
+        self.begin_turn()
+
+    def begin_turn(self):
+        self.turns.append({"model_calls": 0, "tool_calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+
+    def _render_input(self, system_instructions: Optional[str], input) -> str:
+        if isinstance(input, str):
+            body = input
+        else:
+            body = json.dumps(list(input), ensure_ascii=False, default=str)
+        return (system_instructions or "") + "\n" + body
+
+    def _next_step(self, input, tools) -> Optional[ToolStep]:
+        if isinstance(input, str):
+            done = 0
+        else:
+            done = sum(1 for item in input if isinstance(item, dict) and item.get("type") == "function_call_output")
+        available = {getattr(t, "name", None) for t in tools or ()}
+        plan = [step for step in self.plan if step[0] in available]
+        return plan[done] if done < len(plan) else None
+
+    def _respond(self, system_instructions, input, tools) -> Tuple[list, Usage]:
+        """plan에 따라 출력 item을 만들고 턴 집계에 더한다"""
+        prompt_tokens = self.count_tokens(self._render_input(system_instructions, input))
+        step = self._next_step(input, tools)
+        n = next(self._ids)
+        if step is not None:
+            name, arguments = step
+            output = [ResponseFunctionToolCall(
+                id=f"fc_{n}", call_id=f"call_{n}", name=name,
+                arguments=json.dumps(arguments), type="function_call", status="completed",
+            )]
+            completion = self.count_tokens(output[0].arguments)
+        else:
+            output = [ResponseOutputMessage(
+                id=f"msg_{n}", role="assistant", status="completed", type="message",
+                content=[ResponseOutputText(text=self.reply, type="output_text", annotations=[])],
+            )]
+            completion = self.count_tokens(self.reply)
+
+        turn = self.turns[-1]
+        turn["model_calls"] += 1
+        turn["tool_calls"] += step is not None
+        turn["prompt_tokens"] += prompt_tokens
+        turn["completion_tokens"] += completion
+        usage = Usage(requests=1, input_tokens=prompt_tokens, output_tokens=completion,
+                      total_tokens=prompt_tokens + completion)
+        return output, usage
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema,
+                           handoffs, tracing, *args, **kwargs) -> ModelResponse:
+        await asyncio.sleep(self.latency)
+        output, usage = self._respond(system_instructions, input, tools)
+        return ModelResponse(output=output, usage=usage, response_id=None)
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema,
+                              handoffs, tracing, *args, **kwargs) -> AsyncIterator[Any]:
+        await asyncio.sleep(self.latency)
+        output, usage = self._respond(system_instructions, input, tools)
+        sequence = itertools.count()
+        message = output[0]
+        if isinstance(message, ResponseOutputMessage):
+            words = self.reply.split(" ")
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(self.chunk)
+                yield ResponseTextDeltaEvent(
+                    type="response.output_text.delta", item_id=message.id, output_index=0, content_index=0,
+                    delta=word if i == len(words) - 1 else word + " ", logprobs=[],
+                    sequence_number=next(sequence),
+                )
+        response = Response(
+            id=f"resp_{message.id}", created_at=time.time(), model="fake", object="response", output=output,
+            parallel_tool_calls=False, tool_choice="auto", tools=[],
+            # details의 필수 필드가 openai 버전마다 달라서 검증 없이 만든다
+            usage=ResponseUsage.model_construct(
+                input_tokens=usage.input_tokens, output_tokens=usage.output_tokens, total_tokens=usage.total_tokens,
+                input_tokens_details=InputTokensDetails.model_construct(cached_tokens=0),
+                output_tokens_details=OutputTokensDetails.model_construct(reasoning_tokens=0),
+            ),
+        )
+        yield ResponseCompletedEvent(type="response.completed", response=response, sequence_number=next(sequence))
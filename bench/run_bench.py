@@ -0,0 +1,301 @@
+"""
+채팅 진입점 벤치마크.
+
+가짜 GitHub MCP 서버(bench/fake_github_mcp.py)와 스크립트 모델(bench/fake_model.py)로
+네트워크/OpenAI 없이 아래 진입점을 같은 시나리오로 돌리고 턴별 지표를 비교한다.
+
+- github_server.run
+- resume/resume_server.run
+- streamlit_chatbot.process_user_command (streamlit bare mode로 import)
+
+지표:
+    setup_s: 첫 턴 전까지 걸린 시간 (repository 목록 로드 등)
+    p50/p95: 턴별 지연 (초)
+    tool_calls/turn: 모델이 요청한 tool 호출 수
+    mcp_calls/turn: 실제로 MCP 서버까지 간 호출 수 (캐시 적중은 빠짐)
+    prompt_tokens/turn: 턴 동안 모델에 보낸 입력 토큰 합 (요약 호출 포함)
+    ttft_p50: 턴 시작부터 첫 토큰이 화면에 그려질 때까지 (streamlit --stream에서만)
+
+실행:
+    python bench/run_bench.py --turns 10 --mcp-latency-ms 50 --model-latency-ms 200
+    python bench/run_bench.py --targets github_server --no-cache --json bench_results.json
+    python bench/run_bench.py --targets streamlit --stream
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path[:0] = [ROOT, os.path.join(ROOT, "resume"), BENCH_DIR]
+
+FAKE_SERVER = os.path.join(BENCH_DIR, "fake_github_mcp.py")
+FAKE_OWNER = "bench-user"  # fake_github_mcp.OWNER
+DIRECTORY_PATH = f"https://github.com/{FAKE_OWNER}"
+BENCH_TOKEN = "bench-token"
+TARGETS = ("github_server", "resume_server", "streamlit")
+
+COMMANDS = [
+    "List my Python repositories",
+    "What does project-001 do?",
+    "Summarize the recent commits in project-002",
+    "Which repository has the most stars?",
+    "Show the README of project-000",
+]
+
+
+def plan_for(turn: int):
+    """턴마다 모델이 호출할 tool 순서. 같은 repo가 주기적으로 반복되어 캐시 적중도 섞인다."""
+    repo = f"project-{turn % 3:03d}"
+    return [
+        ("search_repositories", {"query": f"user:{FAKE_OWNER}", "page": 1, "perPage": 30}),
+        ("get_file_contents", {"owner": FAKE_OWNER, "repo": repo, "path": "README.md"}),
+        ("list_commits", {"owner": FAKE_OWNER, "repo": repo, "page": 1, "perPage": 10}),
+    ]
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def fake_server_params(args, log_path: str) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.update({
+        "FAKE_MCP_LATENCY_MS": str(args.mcp_latency_ms),
+        "FAKE_REPO_COUNT": str(args.repos),
+        "FAKE_MCP_LOG": log_path,
+        "FASTMCP_LOG_LEVEL": "WARNING",
+    })
+    return {"command": sys.executable, "args": [FAKE_SERVER], "env": env}
+
+
+class TurnClock:
+    """턴 경계를 기록하고 FakeModel의 턴 집계를 넘긴다"""
+
+    def __init__(self, model):
+        self.model = model
+        self.setup_s: Optional[float] = None
+        self.turns: List[Dict[str, float]] = []
+        self._began = time.perf_counter()
+        self._current: Optional[Dict[str, float]] = None
+
+    def start(self):
+        self.model.begin_turn()
+        self._current = {"start": time.time(), "perf": time.perf_counter()}
+
+    def stop(self):
+        now = time.perf_counter()
+        if self._current is None:
+            if self.setup_s is None:
+                self.setup_s = now - self._began
+            return
+        self._current["latency_s"] = now - self._current.pop("perf")
+        self._current["end"] = time.time()
+        self.turns.append(self._current)
+        self._current = None
+
+    def first_token(self):
+        if self._current is not None and "ttft_s" not in self._current:
+            self._current["ttft_s"] = time.perf_counter() - self._current["perf"]
+
+    def scripted_input(self, commands: List[str]):
+        """input() 대체: 호출 사이의 시간이 한 턴이다"""
+        pending = iter(commands)
+
+        def _input(prompt: str = "") -> str:
+            self.stop()
+            command = next(pending, "exit")
+            if command != "exit":
+                self.start()
+                self.model.plan = plan_for(len(self.turns))
+            return command
+
+        return _input
+
+
+class StreamProbe:
+    """st.empty()/st.status() 대체: 첫 토큰이 그려진 시각을 clock에 기록한다"""
+
+    def __init__(self, clock: TurnClock):
+        self.clock = clock
+
+    def markdown(self, text: str):
+        self.clock.first_token()
+
+    def update(self, **kwargs):
+        pass
+
+    def write(self, *args, **kwargs):
+        pass
+
+
+def read_mcp_log(path: str) -> List[float]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["ts"] for line in f if line.strip()]
+
+
+def summarize(target: str, clock: TurnClock, model, log_path: str) -> Dict[str, Any]:
+    calls = read_mcp_log(log_path)
+    per_turn = []
+    # model.turns[0]은 첫 턴 전(setup) 구간
+    for turn, stats in zip(clock.turns, model.turns[1:]):
+        per_turn.append({
+            "latency_s": turn["latency_s"],
+            "ttft_s": turn.get("ttft_s"),
+            "mcp_calls": sum(1 for ts in calls if turn["start"] <= ts < turn["end"]),
+            **stats,
+        })
+    setup_mcp = sum(1 for ts in calls if not clock.turns or ts < clock.turns[0]["start"])
+    latencies = [t["latency_s"] for t in per_turn]
+    ttfts = [t["ttft_s"] for t in per_turn if t["ttft_s"] is not None]
+    n = max(len(per_turn), 1)
+    return {
+        "target": target,
+        "turns": len(per_turn),
+        "setup_s": clock.setup_s,
+        "setup_mcp_calls": setup_mcp,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "ttft_p50_s": percentile(ttfts, 50),
+        "ttft_p95_s": percentile(ttfts, 95),
+        "tool_calls_per_turn": sum(t["tool_calls"] for t in per_turn) / n,
+        "mcp_calls_per_turn": sum(t["mcp_calls"] for t in per_turn) / n,
+        "prompt_tokens_per_turn": sum(t["prompt_tokens"] for t in per_turn) / n,
+        "max_prompt_tokens": max((t["prompt_tokens"] for t in per_turn), default=0),
+        "per_turn": per_turn,
+    }
+
+
+async def _run_cli(module, args, model, clock: TurnClock, log_path: str):
+    from agents.mcp import MCPServerStdio
+    from mcp_cache import CachingMCPServer, ToolResultCache
+
+    module.OPENAI_MODEL = model
+    module.GITHUB_PERSONAL_ACCESS_TOKEN = BENCH_TOKEN
+    commands = [COMMANDS[i % len(COMMANDS)] for i in range(args.turns)]
+    module.input = clock.scripted_input(commands)
+
+    # main()과 같은 구성: stdio 서버 하나 + 읽기 전용 tool 캐시
+    async with MCPServerStdio(name="Fake GitHub MCP", params=fake_server_params(args, log_path),
+                              cache_tools_list=True) as server:
+        if not args.no_cache:
+            server = CachingMCPServer.for_token(server, BENCH_TOKEN, cache=ToolResultCache())
+        with contextlib.redirect_stdout(io.StringIO()):
+            await module.run(server, DIRECTORY_PATH)
+
+
+def bench_cli(target: str, args, log_path: str) -> Dict[str, Any]:
+    from fake_model import FakeModel
+
+    module = __import__(target)
+    model = FakeModel(latency_ms=args.model_latency_ms, chunk_ms=args.chunk_ms)
+    clock = TurnClock(model)
+    asyncio.run(_run_cli(module, args, model, clock, log_path))
+    return summarize(target, clock, model, log_path)
+
+
+def bench_streamlit(args, log_path: str) -> Dict[str, Any]:
+    import mcp_pool
+    from fake_model import FakeModel
+
+    with contextlib.ExitStack() as patches:
+        # 풀이 docker 대신 가짜 서버를 띄우게 한다 (streamlit_chatbot import 전에 바꿔야 warm에 반영됨)
+        params = fake_server_params(args, log_path)
+        patches.enter_context(mock.patch.object(mcp_pool, "github_server_params", lambda token: params))
+        os.environ["GITHUB_PERSONAL_ACCESS_TOKEN"] = BENCH_TOKEN
+        with contextlib.redirect_stdout(io.StringIO()):
+            import streamlit_chatbot  # bare mode: st.* UI 호출은 아무것도 하지 않는다
+        if args.no_cache:
+            patches.enter_context(mock.patch.object(streamlit_chatbot.CachingMCPServer, "for_token",
+                                                    staticmethod(lambda server, token, cache: server)))
+
+        model = FakeModel(latency_ms=args.model_latency_ms, chunk_ms=args.chunk_ms)
+        streamlit_chatbot.OPENAI_MODEL = model
+        streamlit_chatbot.GITHUB_PERSONAL_ACCESS_TOKEN = BENCH_TOKEN
+        clock = TurnClock(model)
+        # --stream이면 앱의 streaming 모드처럼 Runner.run_streamed로 토큰을 받아 그린다
+        probe = StreamProbe(clock) if args.stream else None
+
+        repositories = streamlit_chatbot.fetch_initial_repositories(DIRECTORY_PATH)
+        clock.stop()
+        history = deque([], maxlen=5)  # 앱의 chat_history_deque와 동일
+        for i in range(args.turns):
+            command = COMMANDS[i % len(COMMANDS)]
+            clock.start()
+            model.plan = plan_for(i)
+            answer = streamlit_chatbot.process_user_command(DIRECTORY_PATH, repositories, history, command,
+                                                            placeholder=probe, status=probe)
+            clock.stop()
+            history.append([{"role": "user", "content": command}, {"role": "assistant", "content": answer}])
+
+        streamlit_chatbot.mcp_pool.close()
+        streamlit_chatbot.app_loop.stop()
+    return summarize("streamlit", clock, model, log_path)
+
+
+def print_table(results: List[Dict[str, Any]]):
+    columns = [
+        ("target", "target", "{:<14}"), ("turns", "turns", "{:>5}"), ("setup_s", "setup_s", "{:>8.3f}"),
+        ("p50_s", "p50_s", "{:>7.3f}"), ("p95_s", "p95_s", "{:>7.3f}"), ("ttft_p50", "ttft_p50_s", "{:>8.3f}"),
+        ("tools/turn", "tool_calls_per_turn", "{:>10.2f}"), ("mcp/turn", "mcp_calls_per_turn", "{:>8.2f}"),
+        ("prompt_tok/turn", "prompt_tokens_per_turn", "{:>15.1f}"), ("max_tok", "max_prompt_tokens", "{:>7}"),
+    ]
+    print("  ".join(fmt.replace(".3f", "").replace(".2f", "").replace(".1f", "").format(header)
+                    for header, _, fmt in columns))
+    for row in results:
+        print("  ".join(fmt.format(row[key]) for _, key, fmt in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chat entry points against a fake GitHub MCP server")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--mcp-latency-ms", type=float, default=50.0)
+    parser.add_argument("--model-latency-ms", type=float, default=200.0)
+    parser.add_argument("--repos", type=int, default=40, help="number of repositories the fake server returns")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the MCP tool result cache")
+    parser.add_argument("--stream", action="store_true",
+                        help="drive streamlit through its streaming path and report time to first token")
+    parser.add_argument("--chunk-ms", type=float, default=20.0, help="delay between streamed text deltas")
+    parser.add_argument("--json", help="write full per-turn results to this path")
+    args = parser.parse_args()
+
+    from agents import set_tracing_disabled
+    set_tracing_disabled(True)
+
+    import repo_inventory
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="mcp-bench-") as tmp:
+        for target in args.targets:
+            # 대상마다 빈 inventory 캐시에서 시작 (tool 결과 캐시는 메모리라 대상마다 새로 만들어진다)
+            repo_inventory.INVENTORY_DIR = os.path.join(tmp, target, "inventory")
+            log_path = os.path.join(tmp, f"{target}.calls.jsonl")
+            if target == "streamlit":
+                results.append(bench_streamlit(args, log_path))
+            else:
+                results.append(bench_cli(target, args, log_path))
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
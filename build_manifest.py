@@ -0,0 +1,134 @@
+"""
+덱 증분 빌드를 위한 manifest.
+
+content에서 프로젝트 하나만 고쳐도 파이프라인 전체(프로젝트 추출, 슬라이드마다 LLM 호출, 패키징)가
+다시 돌았다. BuildManifest는 단계/슬라이드마다
+
+    key = hash(입력 내용, 템플릿, 프롬프트 버전)
+
+과 그때의 결과를 JSON 파일에 기록해 두고, 다시 실행했을 때 key가 같으면 결과를 재사용한다.
+프로젝트 슬라이드의 입력은 content 전체가 아니라 content_section()으로 잘라 낸
+그 프로젝트 부분이므로 다른 프로젝트를 고쳐도 key가 바뀌지 않는다.
+프롬프트나 출력 형식을 바꿀 때는 각 agent의 PROMPT_VERSION을 올린다.
+
+사용 예:
+    manifest = BuildManifest("build_manifest.json")
+    key = manifest.key(content_section(content, project), template_digest, PROMPT_VERSION)
+    value = manifest.lookup(f"project:{project}", key)
+    if value is None:
+        value = await generate(...)
+        manifest.record(f"project:{project}", key, value)
+"""
+import glob
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Optional
+
+MANIFEST_VERSION = 1
+
+
+def files_digest(paths: Iterable[str]) -> str:
+    """템플릿 파일들의 내용 해시 (경로 순서와 무관)"""
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        h.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+def glob_digest(pattern: str) -> str:
+    return files_digest(glob.glob(pattern))
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def content_section(content: str, name: str) -> str:
+    """
+    markdown content에서 name이 나오는 목록 항목과 그 하위 항목만 잘라 낸다.
+    여러 번 나오면 모두 이어 붙이고, 찾지 못하면 content 전체를 돌려준다.
+    """
+    needle = name.strip().lower()
+    if not needle:
+        return content
+    lines = content.splitlines()
+    sections = []
+    i = 0
+    while i < len(lines):
+        if needle not in lines[i].lower():
+            i += 1
+            continue
+        start, depth = i, _indent(lines[i])
+        i += 1
+        while i < len(lines) and (not lines[i].strip() or _indent(lines[i]) > depth):
+            i += 1
+        sections.append("\n".join(lines[start:i]).strip())
+    return "\n\n".join(sections) if sections else content
+
+
+class BuildManifest:
+    """
+    Args:
+        path: manifest JSON 경로. 없으면 새로 만든다
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.reused = 0
+        self.regenerated = 0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self._entries = data.get("entries", {})
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        h = hashlib.sha256()
+        for part in parts:
+            h.update(json.dumps(part, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def lookup(self, entry_id: str, key: str, output_path: Optional[str] = None) -> Optional[Any]:
+        """
+        key가 같은 기록이 있으면 저장된 값을 돌려준다.
+        결과가 파일로 남는 단계는 output_path가 아직 있을 때만 재사용한다 (값이 없으면 True).
+        """
+        entry = self._entries.get(entry_id)
+        if entry is None or entry["key"] != key:
+            return None
+        if output_path is not None and not os.path.exists(output_path):
+            return None
+        self.reused += 1
+        value = entry.get("value")
+        return True if value is None else value
+
+    def record(self, entry_id: str, key: str, value: Any = None):
+        """결과를 기록하고 바로 저장한다 (중간에 실패해도 그때까지의 결과는 남는다)"""
+        self.regenerated += 1
+        self._entries[entry_id] = {"key": key, "value": value, "updated_at": time.time()}
+        self.save()
+
+    def prune(self, keep: Iterable[str]):
+        """이번 빌드에 없는 항목(삭제된 프로젝트 등)을 지운다"""
+        keep = set(keep)
+        for entry_id in list(self._entries):
+            if entry_id not in keep:
+                del self._entries[entry_id]
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "entries": self._entries}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+
+    def summary(self) -> str:
+        return f"재사용 {self.reused}개, 새로 생성 {self.regenerated}개"
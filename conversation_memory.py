@@ -0,0 +1,167 @@
+"""
+토큰 예산이 있는 대화 기록.
+
+기존 agent 루프는 매 턴마다 `history: {deque}`로 dict 목록의 repr을 붙이고
+정적인 PROMPT 전체를 앞에 다시 붙였다. 이 모듈은
+
+- 턴을 추가할 때 한 번만 토큰 수를 계산하고 (증분 카운트)
+- 기록이 예산을 넘을 때에만 오래된 턴을 요약으로 접으며 (lazy 요약)
+- 정적 system prefix와 요약 블록을 턴마다 바이트 단위로 동일하게 유지해서
+  모델 쪽 prompt prefix 캐시가 계속 맞도록 한다.
+
+사용 예:
+    memory = ConversationMemory(PROMPT, budget_tokens=1500, summarizer=agent_summarizer(OPENAI_MODEL))
+    prompt = await memory.prompt(command)
+    result = await run_agent(agent, prompt, workflow="github_server")
+    memory.add(command, result.final_output)
+"""
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken이 없으면 근사치 사용
+    tiktoken = None
+
+Summarizer = Callable[[str, str], Awaitable[str]]
+
+
+def make_token_counter(model: Optional[str] = None) -> Callable[[str], int]:
+    if not isinstance(model, str):
+        model = None  # Model 객체가 넘어온 경우 (예: 벤치마크용 FakeModel)
+    if tiktoken is not None:
+        try:
+            enc = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("o200k_base")
+        except (KeyError, ValueError):
+            enc = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(enc.encode(text))
+
+    def approx(text: str) -> int:
+        # 영문은 약 4글자당 1토큰, 한글 등 비 ASCII 문자는 대략 글자당 1토큰
+        ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+        return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+    return approx
+
+
+async def extractive_summarizer(previous_summary: str, transcript: str) -> str:
+    """LLM 호출 없이 각 턴의 앞부분만 남기는 기본 요약기"""
+    lines = [previous_summary] if previous_summary else []
+    for line in transcript.splitlines():
+        lines.append(line[:200])
+    return "\n".join(lines)
+
+
+def agent_summarizer(model: Optional[str]) -> Summarizer:
+    """작은 Agent 한 번으로 오래된 턴을 요약하는 요약기"""
+    from agents import Agent
+
+    from instrumentation import run_agent
+
+    summarizer_agent = Agent(
+        model=model,
+        name="HistorySummarizer",
+        instructions=(
+            "Summarize the conversation so far in the conversation's language. "
+            "Keep facts, repository names, file paths and decisions. At most 10 short lines."
+        ),
+    )
+
+    async def summarize(previous_summary: str, transcript: str) -> str:
+        text = f"previous summary:\n{previous_summary}\n\nnew turns:\n{transcript}" if previous_summary else transcript
+        result = await run_agent(summarizer_agent, text, workflow="history_summary")
+        return result.final_output
+
+    return summarize
+
+
+class ConversationMemory:
+    """
+    에이전트 루프의 대화 기록. 토큰 예산을 넘으면 오래된 턴을 요약으로 접고,
+    system_prefix(PROMPT)와 요약은 매 턴 같은 바이트로 앞에 붙여서 prompt prefix 캐시가 맞도록 한다.
+
+    Args:
+        system_prefix: 매 턴 동일하게 앞에 붙는 정적 프롬프트 (캐시 가능하도록 절대 변경하지 않음)
+        budget_tokens: 요약 + 최근 턴이 차지할 수 있는 최대 토큰 수
+        keep_recent: 요약하지 않고 원문으로 남길 최근 턴 수
+        summarizer: (이전 요약, 접을 턴 원문) -> 새 요약. 기본은 LLM 없는 extractive 요약
+        model: 토큰 카운터에 사용할 모델 이름
+    """
+
+    def __init__(self, system_prefix: str = "", budget_tokens: int = 1500, keep_recent: int = 2,
+                 summarizer: Optional[Summarizer] = None, model: Optional[str] = None):
+        self.system_prefix = system_prefix
+        self.budget_tokens = budget_tokens
+        self.keep_recent = keep_recent
+        self.summarizer = summarizer or extractive_summarizer
+        self.count_tokens = make_token_counter(model)
+        self.prefix_tokens = self.count_tokens(system_prefix)
+        self.turns = deque()  # (rendered_text, tokens)
+        self.summary = ""
+        self.summary_tokens = 0
+        self.history_tokens = 0
+
+    def __len__(self):
+        return len(self.turns)
+
+    def _append(self, text: str):
+        tokens = self.count_tokens(text)
+        # 한 턴이 예산의 절반을 넘지 않도록 잘라서 최근 턴만으로 예산이 넘치지 않게 한다
+        limit = max(self.budget_tokens // 2, 1)
+        if tokens > limit:
+            text = text[: len(text) * limit // tokens] + " ...(생략)"
+            tokens = self.count_tokens(text)
+        self.turns.append((text, tokens))
+        self.history_tokens += tokens
+
+    def add(self, user: str, assistant: str):
+        self._append(f"user: {user}\nassistant: {assistant}")
+
+    def add_assistant(self, assistant: str):
+        """사용자 질문 없이 assistant 출력만 기록 (예: 초기 생성 결과)"""
+        self._append(f"assistant: {assistant}")
+
+    def clear(self):
+        self.turns.clear()
+        self.summary = ""
+        self.summary_tokens = 0
+        self.history_tokens = 0
+
+    async def _compact(self):
+        if self.summary_tokens + self.history_tokens <= self.budget_tokens:
+            return
+        # 최근 keep_recent 턴만 남기고 한꺼번에 접는다.
+        # 매 턴 조금씩 접으면 요약 블록이 계속 바뀌어 prefix 캐시가 깨지므로 한 번에 크게 접는다.
+        folded = []
+        while len(self.turns) > self.keep_recent:
+            text, tokens = self.turns.popleft()
+            self.history_tokens -= tokens
+            folded.append(text)
+        if not folded:
+            return
+        self.summary = await self.summarizer(self.summary, "\n".join(folded))
+        self.summary_tokens = self.count_tokens(self.summary)
+        # 요약 자체가 예산의 절반을 넘으면 앞부분을 잘라 상한을 지킨다
+        limit = self.budget_tokens // 2
+        while self.summary_tokens > limit and self.summary:
+            self.summary = self.summary[len(self.summary) // 4:]
+            self.summary_tokens = self.count_tokens(self.summary)
+
+    def render_history(self) -> str:
+        parts = []
+        if self.summary:
+            parts.append(f"(summary of earlier conversation)\n{self.summary}")
+        parts.extend(text for text, _ in self.turns)
+        return "\n".join(parts)
+
+    async def prompt(self, user_message: str) -> str:
+        """system prefix + (요약) + 최근 턴 + 현재 사용자 메시지"""
+        await self._compact()
+        return f"""{self.system_prefix}
+        history:
+{self.render_history()}
+        user: {user_message}"""
+
+    @property
+    def prompt_tokens(self) -> int:
+        return self.prefix_tokens + self.summary_tokens + self.history_tokens
@@ -0,0 +1,165 @@
+"""
+슬라이드 agent용 파일 도구 (filesystem MCP 서버 대체).
+
+모델이 템플릿을 읽고 결과를 쓰게 하려고 `npx @modelcontextprotocol/server-filesystem`을 띄우면
+Node 시작, JSON-RPC 직렬화, stdio 왕복이 파일 접근마다 붙는다.
+FileTools는 같은 역할의 function tool을 프로세스 안에서 제공한다.
+
+- 허용한 디렉토리(roots) 밖의 경로는 읽지 못하고, writable 디렉토리에만 쓸 수 있다 (symlink도 풀어서 검사)
+- 읽은 파일은 (mtime, 크기)가 같으면 메모리 캐시에서 돌려주고, 쓰면 캐시를 갱신한다
+- 상대 경로는 base(기본: 첫 번째 root) 기준이다
+
+사용 예:
+    files = FileTools(roots=[template_dir, result_dir], writable=[result_dir], base=CUR_PATH)
+    agent = Agent(model=..., name="Assistant", tools=files.tools())
+"""
+import os
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+from instrumentation import metrics, record_cache
+
+MAX_READ_BYTES = 2 * 1024 * 1024
+CACHE_BYTES = 32 * 1024 * 1024
+
+
+class FileTools:
+    """
+    Args:
+        roots: 읽을 수 있는 디렉토리 목록
+        writable: 쓸 수 있는 디렉토리 목록
+        base: 상대 경로의 기준 디렉토리 (기본: 첫 번째 root). 프롬프트의 경로 표기에 맞춘다
+        cache_bytes: 읽기 캐시 최대 크기
+    """
+
+    def __init__(self, roots: Sequence[str], writable: Sequence[str] = (), base: Optional[str] = None,
+                 cache_bytes: int = CACHE_BYTES):
+        if not roots:
+            raise ValueError("at least one root directory is required")
+        self.roots = [os.path.realpath(root) for root in roots]
+        self.writable = [os.path.realpath(path) for path in writable]
+        self.base = os.path.realpath(base) if base else self.roots[0]
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()  # path -> (mtime_ns, size, text)
+        self._cached_bytes = 0
+        self.stats = {"reads": 0, "cache_hits": 0, "writes": 0}
+
+    # --- 경로 검사 ---
+
+    @staticmethod
+    def _inside(path: str, directories: List[str]) -> bool:
+        return any(path == d or path.startswith(d + os.sep) for d in directories)
+
+    def resolve(self, path: str, write: bool = False) -> str:
+        full = os.path.realpath(path if os.path.isabs(path) else os.path.join(self.base, path))
+        if not self._inside(full, self.roots + self.writable):
+            raise PermissionError(f"허용되지 않은 경로입니다: {path} (허용: {', '.join(self.roots)})")
+        if write and not self._inside(full, self.writable):
+            raise PermissionError(f"쓰기가 허용되지 않은 경로입니다: {path} (허용: {', '.join(self.writable)})")
+        return full
+
+    # --- 파일 접근 ---
+
+    def read(self, path: str) -> str:
+        full = self.resolve(path)
+        stat = os.stat(full)
+        self.stats["reads"] += 1
+        cached = self._cache.get(full)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            self._cache.move_to_end(full)
+            self.stats["cache_hits"] += 1
+            record_cache("read_file", "hit")
+            return cached[2]
+        record_cache("read_file", "miss")
+        if stat.st_size > MAX_READ_BYTES:
+            raise ValueError(f"파일이 너무 큽니다: {path} ({stat.st_size} bytes)")
+        with open(full, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        self._store(full, stat.st_mtime_ns, stat.st_size, text)
+        return text
+
+    def write(self, path: str, content: str) -> str:
+        full = self.resolve(path, write=True)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        data = content.encode("utf-8")
+        with open(full, "wb") as f:
+            f.write(data)
+        stat = os.stat(full)
+        self._store(full, stat.st_mtime_ns, stat.st_size, content)
+        self.stats["writes"] += 1
+        metrics.inc("file_tool_bytes_total", len(data), direction="write")
+        return full
+
+    def list(self, path: str = "") -> List[str]:
+        if not path:
+            return [f"[DIR] {root}" for root in self.roots]
+        full = self.resolve(path)
+        entries = []
+        for entry in sorted(os.scandir(full), key=lambda e: e.name):
+            entries.append(f"[DIR] {entry.name}" if entry.is_dir() else f"[FILE] {entry.name}")
+        return entries
+
+    def _store(self, full: str, mtime_ns: int, size: int, text: str):
+        old = self._cache.pop(full, None)
+        if old is not None:
+            self._cached_bytes -= old[1]
+        if size > self.cache_bytes:
+            return
+        self._cache[full] = (mtime_ns, size, text)
+        self._cached_bytes += size
+        while self._cached_bytes > self.cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= evicted[1]
+
+    # --- agent tool ---
+
+    def tools(self) -> list:
+        """filesystem MCP 서버와 같은 이름의 function tool 목록"""
+        from agents import function_tool
+
+        def read_file(path: str) -> str:
+            """Read the complete contents of a text file.
+
+            Args:
+                path: File path, absolute or relative to the working directory.
+            """
+            return self.read(path)
+
+        def read_multiple_files(paths: List[str]) -> str:
+            """Read several text files at once. Failed reads are reported per file.
+
+            Args:
+                paths: File paths to read.
+            """
+            results = []
+            for path in paths:
+                try:
+                    results.append(f"{path}:\n{self.read(path)}")
+                except (OSError, ValueError) as e:
+                    results.append(f"{path}: Error - {e}")
+            return "\n---\n".join(results)
+
+        def write_file(path: str, content: str) -> str:
+            """Create or overwrite a text file in a writable directory.
+
+            Args:
+                path: File path, absolute or relative to the working directory.
+                content: Full file contents to write.
+            """
+            return f"Successfully wrote to {self.write(path, content)}"
+
+        def list_directory(path: str = "") -> str:
+            """List files and directories in a directory, marked with [FILE] or [DIR].
+
+            Args:
+                path: Directory path, absolute or relative. Empty lists the allowed directories.
+            """
+            return "\n".join(self.list(path))
+
+        def list_allowed_directories() -> str:
+            """List the directories this agent can read, and the ones it can write."""
+            return "\n".join([f"read: {root}" for root in self.roots] +
+                             [f"write: {path}" for path in self.writable])
+
+        return [function_tool(fn) for fn in
+                (read_file, read_multiple_files, write_file, list_directory, list_allowed_directories)]
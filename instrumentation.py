@@ -0,0 +1,356 @@
+"""
+에이전트 루프 공통 계측.
+
+지금까지 각 루프는 프롬프트와 최종 응답만 print했기 때문에 한 턴의 시간이
+모델 대기, MCP tool 호출, 캐시 중 어디에 쓰였는지 알 수 없었다.
+이 모듈은 Runner.run과 MCP tool 호출을 감싸서 다음을 기록한다.
+
+- 실행(run)별: 전체 시간, 모델 시간(전체 - tool 시간), 모델 호출 수,
+  prompt/completion 토큰, prompt cache 적중 토큰, tool 호출 수, MCP 캐시 적중/미스
+- tool 호출별: 서버, tool 이름, 소요 시간, 요청/응답 payload 크기, 오류 여부
+
+기록은 JSONL 파일(METRICS_PATH)에 이벤트 단위로 쌓이고, METRICS_PORT를 지정하면
+같은 값을 Prometheus text format으로 http://host:port/metrics 에서 노출한다.
+
+사용 예:
+    server = InstrumentedMCPServer(CachingMCPServer.for_token(server, token))
+    agent = Agent(..., mcp_servers=[server])
+    result = await run_agent(agent, prompt, workflow="github_server")
+
+    # streaming
+    async with track_run(agent, "streamlit") as run:
+        result = Runner.run_streamed(agent, prompt)
+        async for event in result.stream_events(): ...
+        run.result = result
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+ROOT = os.path.abspath(os.path.dirname(__file__))
+METRICS_PATH = os.getenv("METRICS_PATH", os.path.join(ROOT, ".cache", "metrics.jsonl"))
+METRICS_PORT = os.getenv("METRICS_PORT")
+
+SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (f'{k}="{_escape(v)}"' for k, v in items)
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    """
+    프로세스 전역 카운터/히스토그램 + JSONL 이벤트 sink.
+
+    Args:
+        path: 이벤트를 추가할 JSONL 파일 경로. None이면 파일에 쓰지 않는다
+    """
+
+    def __init__(self, path: Optional[str] = METRICS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, buckets=SECONDS_BUCKETS, **labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    def emit(self, event: str, **fields):
+        if not self.path:
+            return
+        line = json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, ensure_ascii=False, default=str)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in series.items():
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', str(bound)))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """Prometheus scrape용 /metrics 엔드포인트를 데몬 스레드에서 띄운다"""
+        if self._server is not None:
+            return self._server
+        registry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server
+
+
+metrics = MetricsRegistry()
+if METRICS_PORT:
+    metrics.serve(int(METRICS_PORT))
+
+
+class RunStats:
+    """실행 하나 동안 tool 호출/캐시 결과를 모으는 객체 (contextvar로 전달)"""
+
+    def __init__(self, workflow: str, agent_name: str):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.workflow = workflow
+        self.agent_name = agent_name
+        self.result = None
+        self.tool_calls = 0
+        self.tool_seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.tool_errors = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+_current_run: contextvars.ContextVar[Optional[RunStats]] = contextvars.ContextVar("current_run", default=None)
+
+
+def _usage_totals(result) -> Dict[str, int]:
+    totals = {"model_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_prompt_tokens": 0}
+    for response in getattr(result, "raw_responses", None) or []:
+        usage = getattr(response, "usage", None)
+        totals["model_calls"] += 1
+        if usage is None:
+            continue
+        totals["prompt_tokens"] += getattr(usage, "input_tokens", 0) or 0
+        totals["completion_tokens"] += getattr(usage, "output_tokens", 0) or 0
+        details = getattr(usage, "input_tokens_details", None)
+        totals["cached_prompt_tokens"] += getattr(details, "cached_tokens", 0) or 0
+    return totals
+
+
+def _record_run(stats: RunStats, duration: float, error: Optional[str]):
+    usage = _usage_totals(stats.result)
+    # tool이 병렬로 실행되면 tool 시간이 겹쳐 계산되므로 0 아래로 내려가지 않게 자른다
+    model_seconds = max(duration - stats.tool_seconds, 0.0)
+    labels = {"workflow": stats.workflow}
+    metrics.observe("agent_run_seconds", duration, **labels)
+    metrics.observe("agent_model_seconds", model_seconds, **labels)
+    metrics.inc("agent_runs_total", status="error" if error else "ok", **labels)
+    metrics.inc("agent_model_calls_total", usage["model_calls"], **labels)
+    metrics.inc("agent_tokens_total", usage["prompt_tokens"], kind="prompt", **labels)
+    metrics.inc("agent_tokens_total", usage["completion_tokens"], kind="completion", **labels)
+    metrics.inc("agent_tokens_total", usage["cached_prompt_tokens"], kind="cached_prompt", **labels)
+    metrics.emit(
+        "agent_run",
+        run_id=stats.run_id,
+        workflow=stats.workflow,
+        agent=stats.agent_name,
+        duration_ms=round(duration * 1000, 1),
+        model_ms=round(model_seconds * 1000, 1),
+        **usage,
+        tool_calls=stats.tool_calls,
+        tool_ms=round(stats.tool_seconds * 1000, 1),
+        tool_request_bytes=stats.request_bytes,
+        tool_response_bytes=stats.response_bytes,
+        tool_errors=stats.tool_errors,
+        cache_hits=stats.cache_hits,
+        cache_misses=stats.cache_misses,
+        error=error,
+    )
+
+
+@asynccontextmanager
+async def track_run(agent, workflow: Optional[str] = None):
+    """
+    블록 안의 에이전트 실행을 하나의 run으로 기록한다.
+    토큰 사용량은 블록 안에서 run.result에 넣어 준 RunResult에서 읽는다.
+    """
+    stats = RunStats(workflow or agent.name, agent.name)
+    token = _current_run.set(stats)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield stats
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_run.reset(token)
+        _record_run(stats, time.perf_counter() - started, error)
+
+
+async def run_agent(agent, input, workflow: Optional[str] = None, **kwargs):
+    """Runner.run을 계측과 함께 실행한다 (인자는 Runner.run과 같음)"""
+    from agents import Runner
+
+    async with track_run(agent, workflow) as run:
+        run.result = await Runner.run(starting_agent=agent, input=input, **kwargs)
+        return run.result
+
+
+def record_cache(tool_name: str, outcome: str):
+    """MCP 결과 캐시 조회 결과 (hit / stale / miss)"""
+    metrics.inc("mcp_cache_total", tool=tool_name, outcome=outcome)
+    stats = _current_run.get()
+    if stats is not None:
+        if outcome == "miss":
+            stats.cache_misses += 1
+        else:
+            stats.cache_hits += 1
+
+
+def _result_bytes(result) -> int:
+    if result is None:
+        return 0
+    size = 0
+    for item in getattr(result, "content", None) or []:
+        text = getattr(item, "text", None)
+        if text is not None:
+            size += len(text.encode("utf-8"))
+        else:
+            size += len(item.model_dump_json())
+    return size
+
+
+class InstrumentedMCPServer:
+    """
+    MCPServer 앞단의 계측 프록시. Agent(mcp_servers=[...])에 그대로 넘길 수 있다.
+    캐시 적중 시간까지 보이도록 CachingMCPServer 바깥쪽에 둔다.
+    """
+
+    def __init__(self, server, registry: Optional[MetricsRegistry] = None):
+        self._server = server
+        self._metrics = registry or metrics
+
+    def __getattr__(self, name):
+        return getattr(self._server, name)
+
+    @property
+    def name(self) -> str:
+        return self._server.name
+
+    async def connect(self):
+        await self._server.connect()
+
+    async def cleanup(self):
+        await self._server.cleanup()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.cleanup()
+
+    async def list_tools(self, *args, **kwargs):
+        return await self._server.list_tools(*args, **kwargs)
+
+    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]]):
+        request_bytes = len(json.dumps(arguments or {}, ensure_ascii=False).encode("utf-8"))
+        started = time.perf_counter()
+        result = None
+        error = None
+        try:
+            result = await self._server.call_tool(tool_name, arguments)
+            if result.isError:
+                error = "tool_error"
+            return result
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            response_bytes = _result_bytes(result)
+            self._record(tool_name, duration, request_bytes, response_bytes, error)
+
+    def _record(self, tool_name: str, duration: float, request_bytes: int, response_bytes: int,
+                error: Optional[str]):
+        labels = {"server": self.name, "tool": tool_name}
+        self._metrics.observe("mcp_tool_seconds", duration, **labels)
+        self._metrics.observe("mcp_tool_response_bytes", response_bytes, buckets=BYTES_BUCKETS, **labels)
+        self._metrics.inc("mcp_tool_calls_total", status="error" if error else "ok", **labels)
+        self._metrics.inc("mcp_tool_payload_bytes_total", request_bytes, direction="request", **labels)
+        self._metrics.inc("mcp_tool_payload_bytes_total", response_bytes, direction="response", **labels)
+
+        stats = _current_run.get()
+        if stats is not None:
+            stats.tool_calls += 1
+            stats.tool_seconds += duration
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            stats.tool_errors += error is not None
+        self._metrics.emit(
+            "mcp_call",
+            run_id=stats.run_id if stats is not None else None,
+            server=self.name,
+            tool=tool_name,
+            duration_ms=round(duration * 1000, 1),
+            request_bytes=request_bytes,
+            response_bytes=response_bytes,
+            error=error,
+        )
@@ -0,0 +1,259 @@
+"""
+읽기 전용 GitHub MCP tool 호출 결과 캐시.
+
+같은 repository 목록, 파일 내용, commit 목록 조회가 세션마다 반복되어
+GitHub API rate limit과 왕복 지연을 낭비하므로 MCP 서버 앞에 캐시 계층을 둔다.
+
+- 키: (tool 이름, 정규화된 arguments, 토큰 식별자)
+- tool별 TTL, 메모리 LRU(개수/바이트 제한), 선택적 SQLite 디스크 계층
+- TTL이 지난 항목은 stale 구간 동안 즉시 반환하고 백그라운드에서 재검증한다.
+  MCP tool 결과에는 HTTP ETag가 노출되지 않으므로 결과 digest를 비교하여
+  변경이 없으면(304와 동일) 저장 시각만 갱신한다.
+
+사용 예:
+    async with MCPServerStdio(...) as server:
+        cached = CachingMCPServer(server, identity=token_key(token), cache=ToolResultCache(db_path="mcp_cache.db"))
+        agent = Agent(..., mcp_servers=[cached])
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from mcp.types import CallToolResult
+
+from instrumentation import record_cache
+from mcp_pool import token_key
+
+# 읽기 전용 tool과 TTL(초). 여기에 없는 tool은 캐시하지 않는다.
+DEFAULT_TTLS: Dict[str, float] = {
+    "get_me": 3600,
+    "search_repositories": 300,
+    "get_file_contents": 600,
+    "list_commits": 120,
+    "get_commit": 86400,  # sha로 조회한 commit은 바뀌지 않음
+    "list_branches": 300,
+    "list_tags": 600,
+    "search_code": 300,
+    "search_users": 600,
+    "list_issues": 60,
+    "get_issue": 60,
+    "list_pull_requests": 60,
+    "get_pull_request": 60,
+}
+
+
+def cache_key(tool_name: str, arguments: Optional[Dict[str, Any]], identity: str) -> str:
+    canonical = json.dumps(
+        {"tool": tool_name, "args": arguments or {}, "id": identity},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CacheEntry:
+    __slots__ = ("tool", "payload", "digest", "stored_at", "size")
+
+    def __init__(self, tool: str, payload: str, stored_at: float):
+        self.tool = tool
+        self.payload = payload
+        self.digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        self.stored_at = stored_at
+        self.size = len(payload)
+
+    def result(self) -> CallToolResult:
+        return CallToolResult.model_validate_json(self.payload)
+
+
+class ToolResultCache:
+    """
+    tool 결과 저장소 (여러 CachingMCPServer가 공유 가능).
+
+    Args:
+        max_entries: 메모리 LRU 최대 항목 수
+        max_bytes: 메모리 LRU 최대 크기(직렬화 기준 바이트)
+        db_path: 지정하면 SQLite 디스크 계층 사용 (프로세스 재시작 후에도 유지)
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._mem: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "revalidated": 0, "updated": 0, "disk_hits": 0}
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tool_cache ("
+                "key TEXT PRIMARY KEY, tool TEXT, payload TEXT, stored_at REAL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._mem.get(key)
+        if entry is not None:
+            self._mem.move_to_end(key)
+            return entry
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT tool, payload, stored_at FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self.stats["disk_hits"] += 1
+                entry = CacheEntry(row[0], row[1], row[2])
+                self._put_mem(key, entry)
+                return entry
+        return None
+
+    def put(self, key: str, entry: CacheEntry):
+        self._put_mem(key, entry)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tool_cache (key, tool, payload, stored_at) VALUES (?, ?, ?, ?)",
+                (key, entry.tool, entry.payload, entry.stored_at),
+            )
+            self._db.commit()
+
+    def touch(self, key: str, entry: CacheEntry, now: float):
+        entry.stored_at = now
+        if self._db is not None:
+            self._db.execute("UPDATE tool_cache SET stored_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+
+    def _put_mem(self, key: str, entry: CacheEntry):
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        if entry.size > self.max_bytes:
+            return
+        self._mem[key] = entry
+        self._bytes += entry.size
+        while len(self._mem) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._mem.popitem(last=False)
+            self._bytes -= evicted.size
+
+    def clear(self):
+        self._mem.clear()
+        self._bytes = 0
+        if self._db is not None:
+            self._db.execute("DELETE FROM tool_cache")
+            self._db.commit()
+
+
+class CachingMCPServer:
+    """
+    MCPServer 앞단의 캐시 프록시. Agent(mcp_servers=[...])에 그대로 넘길 수 있다.
+
+    Args:
+        server: 실제 MCP 서버 (MCPServerStdio 등)
+        identity: 토큰 식별자. 다른 사용자의 결과가 섞이지 않도록 키에 포함된다.
+        ttls: tool별 TTL(초). None이면 DEFAULT_TTLS
+        stale_factor: TTL * stale_factor 까지는 stale 결과를 반환하고 백그라운드 재검증
+    """
+
+    def __init__(self, server, identity: str, cache: Optional[ToolResultCache] = None,
+                 ttls: Optional[Dict[str, float]] = None, stale_factor: float = 2.0):
+        self._server = server
+        self.identity = identity
+        self.cache = cache if cache is not None else ToolResultCache()
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.stale_factor = stale_factor
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def for_token(cls, server, token: str, **kwargs) -> "CachingMCPServer":
+        return cls(server, identity=token_key(token), **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._server, name)
+
+    @property
+    def name(self) -> str:
+        return self._server.name
+
+    async def connect(self):
+        await self._server.connect()
+
+    async def cleanup(self):
+        await self._server.cleanup()
+
+    async def __aenter__(self):
+        await self._server.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return await self._server.__aexit__(exc_type, exc_value, traceback)
+
+    async def list_tools(self, *args, **kwargs):
+        return await self._server.list_tools(*args, **kwargs)
+
+    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]]) -> CallToolResult:
+        ttl = self.ttls.get(tool_name)
+        if ttl is None:
+            return await self._server.call_tool(tool_name, arguments)
+
+        key = cache_key(tool_name, arguments, self.identity)
+        now = time.time()
+        entry = self.cache.get(key)
+        if entry is not None:
+            age = now - entry.stored_at
+            if age < ttl:
+                self.cache.stats["hits"] += 1
+                record_cache(tool_name, "hit")
+                return entry.result()
+            if age < ttl * self.stale_factor:
+                self.cache.stats["stale_hits"] += 1
+                record_cache(tool_name, "stale")
+                if key not in self._refreshing:
+                    task = asyncio.create_task(self._fetch(key, tool_name, arguments))
+                    self._refreshing[key] = task
+                    task.add_done_callback(lambda _t, k=key: self._refreshing.pop(k, None))
+                return entry.result()
+
+        self.cache.stats["misses"] += 1
+        record_cache(tool_name, "miss")
+        return await self._fetch(key, tool_name, arguments)
+
+    async def _fetch(self, key: str, tool_name: str, arguments: Optional[Dict[str, Any]]) -> CallToolResult:
+        # 같은 키에 대한 동시 요청은 하나의 실제 호출로 합친다
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._server.call_tool(tool_name, arguments)
+            if not result.isError:
+                self._store(key, tool_name, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 기다리는 쪽이 없어도 경고가 나지 않도록
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: str, tool_name: str, result: CallToolResult):
+        now = time.time()
+        entry = CacheEntry(tool_name, result.model_dump_json(), now)
+        old = self.cache.get(key)
+        if old is not None and old.digest == entry.digest:
+            # 내용이 그대로면 시각만 갱신 (조건부 재검증의 304에 해당)
+            self.cache.stats["revalidated"] += 1
+            self.cache.touch(key, old, now)
+            return
+        if old is not None:
+            self.cache.stats["updated"] += 1
+        self.cache.put(key, entry)
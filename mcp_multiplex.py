@@ -0,0 +1,296 @@
+"""
+여러 사용자의 논리 세션을 소수의 stdio MCP 서브프로세스 위에서 처리하는 멀티플렉서.
+
+세션 기반 github-mcp-server는 `register_session_token` tool로 사용자 PAT를 등록하면
+session_id를 돌려주고, 이후 요청의 `_meta.session_id`로 사용자를 구분한다.
+사용자마다 docker 컨테이너를 띄우는 대신 이 모듈은
+
+- 사용자를 서브프로세스(lane)에 배정하고 해당 lane에 토큰을 등록하며
+- 모든 tool 호출에 `_meta`(session_id, request_id, clientInfo)를 붙이고
+- lane마다 사용자별 큐를 round-robin으로 꺼내서 공정하게 처리하며
+- 사용자별 큐 크기와 lane별 동시 호출 수를 제한해 backpressure를 건다.
+
+사용 예:
+    async with MultiplexedMCPServer(params, processes=2) as mux:
+        await mux.register_user("userA", pat)
+        agent = Agent(..., mcp_servers=[mux.for_user("userA")])
+"""
+import asyncio
+import itertools
+import json
+from collections import deque
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional
+
+from agents.mcp import MCPServerStdio
+from mcp import types
+
+DEFAULT_CLIENT_INFO = {"name": "PortfolioAssistPythonClient", "version": "1.1"}
+
+
+class _Request:
+    __slots__ = ("user_id", "tool_name", "arguments", "request_id", "future")
+
+    def __init__(self, user_id: str, tool_name: str, arguments: Optional[Dict[str, Any]], request_id: str):
+        self.user_id = user_id
+        self.tool_name = tool_name
+        self.arguments = arguments
+        self.request_id = request_id
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class _Lane:
+    """서브프로세스 하나와 그 위의 사용자별 공정 큐"""
+
+    def __init__(self, index: int, server: MCPServerStdio, max_inflight: int, max_queue_per_user: int):
+        self.index = index
+        self.server = server
+        self.max_queue_per_user = max_queue_per_user
+        self.users: Dict[str, Dict[str, Any]] = {}  # user_id -> _meta
+        self.assigned = 0  # 배정된 사용자 수 (등록 중인 사용자 포함)
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._ready = deque()  # 대기 요청이 있는 사용자 (round-robin 순서)
+        self._ready_set = set()
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_inflight)
+        self.inflight = 0
+        self._task: Optional[asyncio.Task] = None
+        self._running = set()
+
+    def start(self):
+        self._task = asyncio.create_task(self._dispatch_loop(), name=f"mcp-lane-{self.index}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        # 서브프로세스를 닫기 전에 진행 중인 호출을 취소해서 호출자가 CancelledError를 받게 한다
+        running = list(self._running)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        for queue in self._queues.values():
+            while not queue.empty():
+                queue.get_nowait().future.cancel()
+
+    async def submit(self, request: _Request) -> types.CallToolResult:
+        queue = self._queues.get(request.user_id)
+        if queue is None:
+            queue = self._queues[request.user_id] = asyncio.Queue(self.max_queue_per_user)
+        # 사용자 큐가 가득 차면 여기서 기다린다 (backpressure)
+        await queue.put(request)
+        if request.user_id not in self._ready_set:
+            self._ready_set.add(request.user_id)
+            self._ready.append(request.user_id)
+        self._wakeup.set()
+        return await request.future
+
+    async def _next_request(self) -> _Request:
+        while True:
+            while self._ready:
+                user_id = self._ready.popleft()
+                queue = self._queues[user_id]
+                if queue.empty():
+                    self._ready_set.discard(user_id)
+                    continue
+                request = queue.get_nowait()
+                if queue.empty():
+                    self._ready_set.discard(user_id)
+                else:
+                    # 같은 사용자의 다음 요청은 다른 사용자들 뒤로
+                    self._ready.append(user_id)
+                return request
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def _dispatch_loop(self):
+        while True:
+            await self._slots.acquire()
+            request = await self._next_request()
+            if request.future.cancelled():
+                self._slots.release()
+                continue
+            self.inflight += 1
+            task = asyncio.create_task(self._execute(request))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _execute(self, request: _Request):
+        try:
+            meta = dict(self.users.get(request.user_id) or {})
+            meta["request_id"] = request.request_id
+            result = await call_tool_with_meta(self.server, request.tool_name, request.arguments, meta)
+            if not request.future.done():
+                request.future.set_result(result)
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+        except asyncio.CancelledError:
+            request.future.cancel()
+            raise
+        finally:
+            self.inflight -= 1
+            self._slots.release()
+
+    @property
+    def queued(self) -> int:
+        return sum(q.qsize() for q in self._queues.values())
+
+
+async def call_tool_with_meta(server: MCPServerStdio, tool_name: str, arguments: Optional[Dict[str, Any]],
+                              meta: Dict[str, Any]) -> types.CallToolResult:
+    """MCPServerStdio.call_tool은 _meta를 받지 않으므로 ClientSession에 직접 요청을 보낸다"""
+    session = server.session
+    if session is None:
+        raise ConnectionError(f"MCP server '{server.name}' is not connected")
+    request = types.ClientRequest(
+        types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(
+                name=tool_name,
+                arguments=arguments or {},
+                _meta=types.RequestParams.Meta(**meta),
+            ),
+        )
+    )
+    return await session.send_request(request, types.CallToolResult)
+
+
+class MultiplexedMCPServer:
+    """
+    Args:
+        params: MCPServerStdio params (세션 기반 github-mcp-server 실행 정보)
+        processes: 띄울 서브프로세스 수
+        max_inflight: 서브프로세스당 동시에 보낼 수 있는 tool 호출 수
+        max_queue_per_user: 사용자별 대기 큐 크기. 가득 차면 호출자가 대기한다
+    """
+
+    def __init__(self, params: Dict[str, Any], processes: int = 1, max_inflight: int = 8,
+                 max_queue_per_user: int = 16, name: str = "GithubMCPMultiUser",
+                 client_info: Optional[Dict[str, Any]] = None):
+        self.params = params
+        self.processes = processes
+        self.max_inflight = max_inflight
+        self.max_queue_per_user = max_queue_per_user
+        self.name = name
+        self.client_info = client_info or DEFAULT_CLIENT_INFO
+        self._lanes: List[_Lane] = []
+        self._user_lane: Dict[str, _Lane] = {}
+        self._stack: Optional[AsyncExitStack] = None
+        self._request_ids = itertools.count(1)
+
+    async def connect(self):
+        self._stack = AsyncExitStack()
+        for i in range(self.processes):
+            server = MCPServerStdio(name=f"{self.name}#{i}", params=self.params, cache_tools_list=True)
+            await self._stack.enter_async_context(server)
+            lane = _Lane(i, server, self.max_inflight, self.max_queue_per_user)
+            lane.start()
+            self._lanes.append(lane)
+
+    async def cleanup(self):
+        for lane in self._lanes:
+            await lane.stop()
+        self._lanes.clear()
+        self._user_lane.clear()
+        if self._stack is not None:
+            await self._stack.aclose()
+            self._stack = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.cleanup()
+
+    def _assign_lane(self, user_id: str) -> _Lane:
+        # 배정 즉시 assigned를 올려서 동시에 등록하는 사용자들이 같은 lane으로 몰리지 않게 한다
+        lane = self._user_lane.get(user_id)
+        if lane is None:
+            lane = min(self._lanes, key=lambda l: l.assigned)
+            lane.assigned += 1
+            self._user_lane[user_id] = lane
+        return lane
+
+    async def register_user(self, user_id: str, github_pat: str, github_host: Optional[str] = None) -> str:
+        """사용자 PAT를 배정된 서브프로세스에 등록하고 session_id를 돌려준다"""
+        if not github_pat:
+            raise ValueError(f"GitHub PAT is required for user {user_id}")
+        new_user = user_id not in self._user_lane
+        lane = self._assign_lane(user_id)
+        arguments = {"personal_access_token": github_pat}
+        if github_host:
+            arguments["github_host"] = github_host
+        meta = {"clientInfo": self.client_info, "request_id": self._next_request_id(user_id)}
+        try:
+            result = await call_tool_with_meta(lane.server, "register_session_token", arguments, meta)
+            text = "".join(getattr(c, "text", "") for c in result.content)
+            if result.isError:
+                raise RuntimeError(f"register_session_token failed for {user_id}: {text}")
+            session_id = json.loads(text).get("session_id")
+            if not session_id:
+                raise RuntimeError(f"'session_id' not in register_session_token response: {text}")
+        except BaseException:
+            if new_user:
+                self.unregister_user(user_id)  # 배정 취소
+            raise
+        lane.users[user_id] = {"session_id": session_id, "clientInfo": self.client_info}
+        return session_id
+
+    def unregister_user(self, user_id: str):
+        lane = self._user_lane.pop(user_id, None)
+        if lane is not None:
+            lane.users.pop(user_id, None)
+            lane.assigned -= 1
+
+    def _next_request_id(self, user_id: str) -> str:
+        return f"{user_id}-{next(self._request_ids)}"
+
+    async def call_tool(self, user_id: str, tool_name: str, arguments: Optional[Dict[str, Any]]) -> types.CallToolResult:
+        lane = self._user_lane.get(user_id)
+        if lane is None or user_id not in lane.users:
+            raise KeyError(f"user {user_id} is not registered")
+        return await lane.submit(_Request(user_id, tool_name, arguments, self._next_request_id(user_id)))
+
+    async def list_tools(self):
+        return await self._lanes[0].server.list_tools()
+
+    def for_user(self, user_id: str) -> "UserMCPServer":
+        return UserMCPServer(self, user_id)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {"lane": lane.index, "users": len(lane.users), "inflight": lane.inflight, "queued": lane.queued}
+            for lane in self._lanes
+        ]
+
+
+class UserMCPServer:
+    """
+    한 사용자용 MCPServer 뷰. Agent(mcp_servers=[...])에 넘기면
+    모든 tool 호출이 해당 사용자의 session_id와 함께 멀티플렉서를 거친다.
+    연결 수명은 멀티플렉서가 관리하므로 connect/cleanup은 아무것도 하지 않는다.
+    """
+
+    def __init__(self, mux: MultiplexedMCPServer, user_id: str):
+        self.mux = mux
+        self.user_id = user_id
+
+    @property
+    def name(self) -> str:
+        return f"{self.mux.name}:{self.user_id}"
+
+    async def connect(self):
+        pass
+
+    async def cleanup(self):
+        pass
+
+    async def list_tools(self, *args, **kwargs):
+        tools = await self.mux.list_tools()
+        # 세션 등록 tool은 멀티플렉서만 사용하므로 모델에는 노출하지 않는다
+        return [t for t in tools if t.name != "register_session_token"]
+
+    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]]) -> types.CallToolResult:
+        return await self.mux.call_tool(self.user_id, tool_name, arguments)
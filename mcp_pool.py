@@ -0,0 +1,251 @@
+"""
+GitHub MCP 서버 세션 풀.
+
+매 채팅 요청마다 `docker run ... ghcr.io/github/github-mcp-server`를 새로 띄우면
+컨테이너 cold start가 응답 지연의 대부분을 차지한다.
+이 모듈은 토큰별로 미리 띄워 둔 MCPServerStdio 세션을 프로세스 전역에서 재사용한다.
+
+- 세션은 장수 백그라운드 이벤트 루프(async_runner.BackgroundLoop)에서 살아 있으므로
+  Streamlit rerun이 반복되어도 연결이 유지된다.
+- 주기적으로 ping을 보내 죽은 컨테이너를 감지하고 자동으로 다시 띄운다.
+
+사용 예:
+    pool = MCPServerPool(loop=app_loop)
+    pool.warm(token)  # 앱 시작 시 미리 컨테이너를 띄워 둔다
+
+    async def chat():
+        async with pool.lease(token) as server:
+            agent = Agent(..., mcp_servers=[server])
+            return await Runner.run(agent, prompt)
+
+    result = await pool.run_in_pool(chat())
+"""
+import asyncio
+import concurrent.futures
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Dict, List, Optional
+
+from agents.mcp import MCPServerStdio
+
+from async_runner import BackgroundLoop
+
+GITHUB_MCP_IMAGE = "ghcr.io/github/github-mcp-server"
+
+
+def token_key(token: str) -> str:
+    """토큰 원문 대신 풀/캐시 키로 사용할 짧은 해시"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+def github_server_params(token: str) -> Dict[str, Any]:
+    """GitHub MCP 서버 컨테이너 실행 파라미터 (토큰은 env로만 전달)"""
+    return {
+        "command": "docker",
+        "args": ["run", "-i", "--rm", "-e", "GITHUB_PERSONAL_ACCESS_TOKEN", GITHUB_MCP_IMAGE],
+        "env": {"GITHUB_PERSONAL_ACCESS_TOKEN": token},
+    }
+
+
+class PooledServer:
+    """
+    MCPServerStdio 연결 하나를 소유하는 keeper.
+
+    MCP stdio 세션은 연결한 task 안에서 정리되어야 하므로
+    연결/재연결/종료를 모두 전용 task(_keep)에서 처리한다.
+    """
+
+    def __init__(self, key: str, params: Dict[str, Any], name: str, restart_delay: float = 1.0):
+        self.key = key
+        self.params = params
+        self.name = name
+        self.restart_delay = restart_delay
+        self.server: Optional[MCPServerStdio] = None
+        self.restarts = 0
+        self.last_used = time.monotonic()
+        self.error: Optional[BaseException] = None
+        self._ready = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.server is not None and self.server.session is not None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._keep(), name=f"mcp-keeper-{self.name}")
+
+    async def _keep(self):
+        while not self._stopping:
+            self._ready.clear()
+            self._wake.clear()
+            try:
+                async with MCPServerStdio(name=self.name, params=self.params, cache_tools_list=True) as server:
+                    self.server = server
+                    self.error = None
+                    self._ready.set()
+                    await self._wake.wait()
+            except Exception as e:
+                self.error = e
+                print(f"[mcp_pool] {self.name} 연결 오류: {e}")
+            finally:
+                self.server = None
+                # 연결 실패 시에도 대기 중인 acquire를 깨워서 오류를 받게 한다
+                self._ready.set()
+            if not self._stopping:
+                self.restarts += 1
+                await asyncio.sleep(self.restart_delay)
+
+    async def wait_ready(self, timeout: float) -> MCPServerStdio:
+        await asyncio.wait_for(self._ready.wait(), timeout)
+        if not self.ready:
+            # 실패한 시도가 깨운 경우: 재시도가 끝날 때까지 한 번 더 기다린다
+            self._ready.clear()
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        if not self.ready:
+            raise ConnectionError(f"MCP server '{self.name}' is not available: {self.error}")
+        return self.server
+
+    def restart(self):
+        """현재 연결을 버리고 새 컨테이너로 다시 연결"""
+        self._wake.set()
+
+    async def ping(self, timeout: float) -> bool:
+        server = self.server
+        if server is None or server.session is None:
+            return False
+        try:
+            await asyncio.wait_for(server.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    async def stop(self):
+        self._stopping = True
+        self._wake.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class MCPServerPool:
+    """
+    토큰별로 미리 띄워 둔 GitHub MCP 서버 세션 풀.
+
+    Args:
+        size: 토큰당 유지할 컨테이너 수 (MCP 세션은 동시 호출을 지원하므로 보통 1로 충분)
+        health_interval: ping 간격(초)
+        idle_timeout: 이 시간(초) 동안 사용되지 않은 토큰의 컨테이너는 종료 (None이면 유지)
+        connect_timeout: 컨테이너가 준비될 때까지 기다리는 최대 시간(초)
+        loop: 세션을 유지할 백그라운드 루프. None이면 풀 전용 루프를 만든다
+    """
+
+    def __init__(self, size: int = 1, health_interval: float = 30.0,
+                 idle_timeout: Optional[float] = None, connect_timeout: float = 60.0,
+                 loop: Optional[BackgroundLoop] = None):
+        self.size = size
+        self.health_interval = health_interval
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self._slots: Dict[str, List[PooledServer]] = {}
+        self._rr: Dict[str, int] = {}
+
+        self._owns_loop = loop is None
+        self._runner = loop if loop is not None else BackgroundLoop(name="mcp-pool")
+        self._health_future = self.submit(self._health_loop())
+
+    # --- 스레드 경계 ---
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """풀 루프에서 코루틴을 실행 (어느 스레드에서든 호출 가능)"""
+        return self._runner.submit(coro)
+
+    async def run_in_pool(self, coro: Awaitable) -> Any:
+        """다른 이벤트 루프에서 풀 루프의 결과를 await"""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def warm(self, token: str) -> concurrent.futures.Future:
+        """토큰의 컨테이너를 미리 띄운다 (완료를 기다리지 않아도 됨)"""
+        return self.submit(self._warm(token))
+
+    # --- 풀 루프 내부 ---
+
+    def _slots_for(self, token: str) -> List[PooledServer]:
+        key = token_key(token)
+        slots = self._slots.get(key)
+        if slots is None:
+            params = github_server_params(token)
+            slots = [PooledServer(key, params, name=f"Github MCP {key[:6]}#{i}") for i in range(self.size)]
+            self._slots[key] = slots
+            self._rr[key] = 0
+        for slot in slots:
+            slot.start()
+        return slots
+
+    async def _warm(self, token: str):
+        slots = self._slots_for(token)
+        await asyncio.gather(*(s.wait_ready(self.connect_timeout) for s in slots), return_exceptions=True)
+
+    async def acquire(self, token: str) -> PooledServer:
+        slots = self._slots_for(token)
+        key = slots[0].key
+        ready = [s for s in slots if s.ready]
+        if ready:
+            idx = self._rr[key] % len(ready)
+            self._rr[key] += 1
+            slot = ready[idx]
+        else:
+            # 아직 준비된 컨테이너가 없으면 가장 먼저 준비되는 것을 사용
+            slot = slots[self._rr[key] % len(slots)]
+            self._rr[key] += 1
+            await slot.wait_ready(self.connect_timeout)
+        slot.last_used = time.monotonic()
+        return slot
+
+    @asynccontextmanager
+    async def lease(self, token: str):
+        """풀의 MCP 서버를 빌려 쓴다. 풀 루프 안에서만 사용해야 한다."""
+        slot = await self.acquire(token)
+        try:
+            yield slot.server
+        except Exception:
+            # 호출 중 오류가 나면 컨테이너가 살아 있는지 바로 확인
+            if not await slot.ping(timeout=5.0):
+                slot.restart()
+            raise
+        finally:
+            slot.last_used = time.monotonic()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            now = time.monotonic()
+            for key, slots in list(self._slots.items()):
+                if self.idle_timeout is not None and all(now - s.last_used > self.idle_timeout for s in slots):
+                    await asyncio.gather(*(s.stop() for s in slots))
+                    del self._slots[key]
+                    del self._rr[key]
+                    continue
+                for slot in slots:
+                    if slot.server is not None and not await slot.ping(timeout=5.0):
+                        print(f"[mcp_pool] {slot.name} health check 실패, 재시작")
+                        slot.restart()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {"name": s.name, "ready": s.ready, "restarts": s.restarts, "error": repr(s.error) if s.error else None}
+            for slots in self._slots.values() for s in slots
+        ]
+
+    async def _close(self):
+        self._health_future.cancel()
+        await asyncio.gather(*(s.stop() for slots in self._slots.values() for s in slots))
+        self._slots.clear()
+
+    def close(self, timeout: float = 30.0):
+        self.submit(self._close()).result(timeout)
+        if self._owns_loop:
+            self._runner.stop(timeout)
@@ -5,14 +5,15 @@ import os
 import dotenv
 dotenv.load_dotenv()
 
-from collections import deque
-
 GITHUB_PERSONAL_ACCESS_TOKEN = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL")
 
-from agents import Agent, Runner, trace
+from agents import Agent, trace
 from agents.mcp import MCPServer, MCPServerStdio
 
+from conversation_memory import ConversationMemory, agent_summarizer
+from instrumentation import InstrumentedMCPServer, run_agent
+
 async def run(mcp_server: MCPServer):
     agent = Agent(
         model=OPENAI_MODEL,
@@ -29,7 +30,7 @@ async def run(mcp_server: MCPServer):
     답변은 절대 지어내지 말고, 항상 사실에 기반해야 한다.
     """
 
-    chat_history = deque([], maxlen=5)
+    memory = ConversationMemory(PROMPT, summarizer=agent_summarizer(OPENAI_MODEL), model=OPENAI_MODEL)
 
     while True:
         # Ask the user for the git command
@@ -37,22 +38,15 @@ async def run(mcp_server: MCPServer):
         if command.lower() == "exit":
             break
         
-        END_PROMPT = f"""
-        history: {chat_history}
-        user: {command}"""
-        prompt = PROMPT.format(chat_history=chat_history) + END_PROMPT
+        prompt = await memory.prompt(command)
         print(prompt)
 
         # Run the command and print the result
         print("\n" + "-" * 40)
         print(f"Running: {command}")
-        result = await Runner.run(starting_agent=agent, input=prompt)
+        result = await run_agent(agent, prompt, workflow="notion_server")
         print(result.final_output)
-        current_chat = [
-            {"role": "user", "content": command},
-            {"role": "assistant", "content": result.final_output},
-        ]
-        chat_history.append(current_chat)
+        memory.add(command, result.final_output)
         print("\n" + "-" * 40)
 
 
@@ -68,7 +62,7 @@ async def main():
     ) as server:
         print("setted notion server")
         with trace(workflow_name="MCP Notion Example"):
-            await run(server)
+            await run(InstrumentedMCPServer(server))
 
 
 if __name__ == "__main__":
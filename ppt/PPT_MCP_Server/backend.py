@@ -0,0 +1,399 @@
+"""
+Presentation backends for the PPT MCP server.
+
+The MCP tools in main.py only talk to a PresentationBackend. Two implementations exist:
+
+- ComBackend (com_backend.py): drives a desktop PowerPoint through win32com (Windows only)
+- PptxBackend (pptx_backend.py): edits .pptx files in-process with python-pptx, no PowerPoint needed
+
+The backend is chosen with the PPT_BACKEND environment variable ("com" or "pptx").
+When it is not set, COM is used on Windows if pywin32 is installed, python-pptx otherwise.
+"""
+import importlib.util
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import psutil
+except ImportError:  # process memory is then reported as None
+    psutil = None
+
+BACKEND_ALIASES = {
+    "com": "com", "win32com": "com", "powerpoint": "com",
+    "pptx": "pptx", "python-pptx": "pptx", "headless": "pptx",
+}
+
+# Fields get_presentation_snapshot can return. Shape ids (and nested group shapes) are always included
+SNAPSHOT_FIELDS = ("title", "name", "type", "text", "geometry", "placeholder")
+GEOMETRY_KEYS = ("left", "top", "width", "height")
+TITLE_PLACEHOLDERS = (1, 3)  # ppPlaceholderTitle, ppPlaceholderCenterTitle
+
+# apply_edits operations: op -> (required args, optional args). Args are the parameters of the tool with the same name
+EDIT_OPS = {
+    "add_slide": ((), ("layout_type",)),
+    "update_text": (("slide_id", "shape_id", "text"), ()),
+    "set_slide_title": (("slide_id", "title"), ()),
+    "add_text_box": (("slide_id", "text"), ("left", "top", "width", "height")),
+}
+
+
+class ShapeIndex:
+    """
+    Stable shape id -> shape position, per slide.
+
+    Shape ids are the ids PowerPoint stores in the file (cNvPr id / COM Shape.Id), so they do not change
+    when shapes are reordered. A slide's entries are built on the first lookup with build(), which maps
+    ids of all shapes on the slide, group members included. Backends call invalidate() after
+    structural edits (shapes added or removed, slides restored) so the next lookup rebuilds.
+    """
+
+    def __init__(self):
+        self._slides: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        self.builds = 0
+        self.lookups = 0
+
+    def lookup(self, presentation_id: str, slide_key: Any, shape_id: Any,
+               build: Callable[[], Dict[str, Any]]) -> Optional[Any]:
+        self.lookups += 1
+        key = (presentation_id, slide_key)
+        entries = self._slides.get(key)
+        if entries is None:
+            entries = self._slides[key] = build()
+            self.builds += 1
+        return entries.get(str(parse_index(shape_id)))
+
+    def invalidate(self, presentation_id: str, slide_key: Any = None):
+        """Drop one slide's entries, or every slide of the presentation"""
+        if slide_key is not None:
+            self._slides.pop((presentation_id, slide_key), None)
+            return
+        for key in [key for key in self._slides if key[0] == presentation_id]:
+            del self._slides[key]
+
+
+class PresentationBackend:
+    """
+    Operations behind the MCP tools. Every method returns the JSON payload of the matching tool,
+    reporting failures as {"error": ...} instead of raising.
+    Slide ids are 1-based indexes and shape ids are the stable ids stored in the file,
+    both passed as int or numeric string.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.shape_index = ShapeIndex()
+
+    def initialize(self) -> bool:
+        raise NotImplementedError
+
+    def get_presentations(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def open_presentation(self, path: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def create_presentation(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def save_presentation(self, presentation_id: str, path: Optional[str] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def close_presentation(self, presentation_id: str, save: bool = True) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def get_slides(self, presentation_id: str) -> Any:
+        raise NotImplementedError
+
+    def get_slide_text(self, presentation_id: str, slide_id: Any) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def update_text(self, presentation_id: str, slide_id: Any, shape_id: Any, text: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def add_slide(self, presentation_id: str, layout_type: int = 1) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def add_text_box(self, presentation_id: str, slide_id: Any, text: str, left: float = 100, top: float = 100,
+                     width: float = 400, height: float = 200) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def set_slide_title(self, presentation_id: str, slide_id: Any, title: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def get_selected_shapes(self, presentation_id: Optional[str] = None) -> Dict[str, Any]:
+        return {"error": f"Selection is not available with the {self.name} backend"}
+
+    def get_memory_usage(self) -> Dict[str, Any]:
+        """Registry state and per-presentation memory, as measured by the backend's _measure"""
+        report = self.registry.report(self._measure)
+        report.update(backend=self.name, process_rss_bytes=process_rss())
+        return report
+
+    def _measure(self, obj: Any) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def get_presentation_snapshot(self, presentation_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """All slides and their shapes in one payload. Backends read raw records in _snapshot, projected here"""
+        try:
+            wanted = snapshot_fields(fields)
+        except ValueError as e:
+            return {"error": str(e)}
+        # the title is derived from the shapes' text, type and placeholder type
+        need = wanted | ({"text", "placeholder"} if "title" in wanted else set())
+        try:
+            snapshot = self._snapshot(presentation_id, need)
+        except Exception as e:
+            return {"error": f"Error reading presentation: {str(e)}"}
+        if "error" in snapshot:
+            return snapshot
+        for slide in snapshot["slides"]:
+            shapes = slide.pop("shapes")
+            if "title" in wanted:
+                slide["title"] = snapshot_title(shapes)
+            slide["shapes"] = [project_shape(shape, wanted) for shape in shapes]
+        return dict(snapshot, presentation_id=presentation_id, fields=sorted(wanted))
+
+    def _snapshot(self, presentation_id: str, need: Set[str]) -> Dict[str, Any]:
+        """{"slide_width", "slide_height", "slide_count", "slides": [snapshot_slide(...)]} or {"error": ...}"""
+        raise NotImplementedError
+
+    def apply_edits(self, presentation_id: str, edits: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply a list of edits in order, all or nothing.
+        Every edit is validated before anything changes. If one fails while applying,
+        the edits already applied are undone in reverse order and the error is reported.
+        """
+        calls, errors = [], []
+        for i, edit in enumerate(edits):
+            try:
+                calls.append(edit_call(edit))
+            except ValueError as e:
+                errors.append({"index": i, "error": str(e)})
+        if errors:
+            return {"success": False, "applied": 0, "errors": errors}
+        if self._slide_count(presentation_id) is None:
+            return {"error": "Presentation ID not found"}
+
+        undo, journal, results = [], {}, []
+        for i, (op, kwargs) in enumerate(calls):
+            try:
+                if "slide_id" in kwargs:
+                    kwargs["slide_id"] = self._resolve_slide(presentation_id, kwargs["slide_id"])
+                # record how to undo this edit before applying it, so a half-applied edit is undone too
+                undo.append(self._journal(presentation_id, op, kwargs, journal))
+                result = getattr(self, op)(presentation_id, **kwargs)
+                error = edit_error(result)
+            except Exception as e:
+                error = str(e)
+            if error:
+                rollback_errors = self._rollback(undo)
+                self.shape_index.invalidate(presentation_id)
+                response = {"success": False, "applied": 0, "failed_index": i, "error": f"{op}: {error}",
+                            "rolled_back": not rollback_errors}
+                if rollback_errors:
+                    response["rollback_errors"] = rollback_errors
+                return response
+            results.append(edit_result(op, result))
+        return {"success": True, "applied": len(results), "results": results}
+
+    def _slide_count(self, presentation_id: str) -> Optional[int]:
+        """Number of slides, or None if the presentation is unknown"""
+        raise NotImplementedError
+
+    def _resolve_slide(self, presentation_id: str, slide_id: Any) -> Any:
+        """Negative slide ids count from the end (-1 is the last slide, e.g. one just added)"""
+        try:
+            slide_idx = parse_index(slide_id)
+        except ValueError:
+            return slide_id
+        if slide_idx < 0:
+            return str(self._slide_count(presentation_id) + 1 + slide_idx)
+        return slide_id
+
+    def _journal(self, presentation_id: str, op: str, kwargs: Dict[str, Any],
+                 journal: Dict[Any, Any]) -> Optional[Callable[[], None]]:
+        """
+        Called before an edit is applied. Returns a function that reverts it (or None).
+        journal is shared by all edits of one apply_edits call.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _rollback(undo: List[Optional[Callable[[], None]]]) -> List[str]:
+        errors = []
+        for revert in reversed(undo):
+            if revert is None:
+                continue
+            try:
+                revert()
+            except Exception as e:
+                errors.append(str(e))
+        return errors
+
+
+def process_rss() -> Optional[int]:
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def parse_index(value: Any) -> int:
+    """Turn a slide/shape id such as 3, "3" or '"3"' into an int (raises ValueError)."""
+    if isinstance(value, str):
+        value = value.strip('"\'`')
+    return int(value)
+
+
+def get_shape_type_name(type_id):
+    """Helper function to convert shape type ID to readable name"""
+    shape_types = {
+        1: "msoAutoShape",
+        2: "msoCallout",
+        3: "msoChart",
+        4: "msoComment",
+        5: "msoFreeform",
+        6: "msoGroup",
+        7: "msoEmbeddedOLEObject",
+        8: "msoFormControl",
+        9: "msoLine",
+        10: "msoLinkedOLEObject",
+        11: "msoLinkedPicture",
+        12: "msoOLEControlObject",
+        13: "msoPicture",
+        14: "msoPlaceholder",
+        15: "msoScriptAnchor",
+        16: "msoShapeTypeMixed",
+        17: "msoTextBox",
+        18: "msoMedia",
+        19: "msoTable",
+        20: "msoCanvas",
+        21: "msoDiagram",
+        22: "msoInk",
+        23: "msoInkComment"
+    }
+    return shape_types.get(type_id, f"Unknown Type ({type_id})")
+
+
+def snapshot_fields(fields: Optional[List[str]]) -> Set[str]:
+    if not fields:
+        return set(SNAPSHOT_FIELDS)
+    wanted = {field.strip().lower() for field in fields}
+    unknown = wanted - set(SNAPSHOT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown snapshot fields: {', '.join(sorted(unknown))} "
+                         f"(expected: {', '.join(SNAPSHOT_FIELDS)})")
+    return wanted
+
+
+def snapshot_slide(index: int, shapes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"id": str(index), "index": index, "shape_count": len(shapes), "shapes": shapes}
+
+
+def snapshot_title(shapes: List[Dict[str, Any]]) -> str:
+    """Same order as get_slide_title: title placeholder, text boxes, then any shape with text"""
+    for shape in shapes:
+        if shape.get("placeholder") in TITLE_PLACEHOLDERS and shape.get("text") is not None:
+            return shape["text"]
+    for shape in shapes:
+        if shape.get("type") == 17 and (shape.get("text") or "").strip():  # msoTextBox
+            return shape["text"]
+    for shape in shapes:
+        if (shape.get("text") or "").strip():
+            return shape["text"]
+    return "Untitled Slide"
+
+
+def project_shape(shape: Dict[str, Any], wanted: Set[str]) -> Dict[str, Any]:
+    """
+    Keep only the requested fields of a raw shape record.
+    Raw records have id and type, and optionally name, left/top/width/height (points),
+    placeholder (PpPlaceholderType), text and shapes (group members).
+    """
+    out = {"id": shape["id"]}
+    if "name" in wanted:
+        out["name"] = shape.get("name")
+    if "type" in wanted:
+        out["type"] = shape.get("type")
+        out["type_name"] = get_shape_type_name(shape.get("type"))
+    if "geometry" in wanted:
+        for key in GEOMETRY_KEYS:
+            out[key] = shape.get(key)
+    if "placeholder" in wanted and shape.get("placeholder") is not None:
+        out["placeholder"] = shape["placeholder"]
+    if "text" in wanted and shape.get("text") is not None:
+        out["text"] = shape["text"]
+    if shape.get("shapes"):
+        out["shapes"] = [project_shape(child, wanted) for child in shape["shapes"]]
+    return out
+
+
+def edit_call(edit: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Validate one apply_edits operation and turn it into (method name, keyword args)"""
+    if not isinstance(edit, dict):
+        raise ValueError("edit must be an object")
+    op = edit.get("op")
+    if op not in EDIT_OPS:
+        raise ValueError(f"Unknown op: {op!r} (expected one of: {', '.join(EDIT_OPS)})")
+    required, optional = EDIT_OPS[op]
+    kwargs = {key: value for key, value in edit.items() if key != "op"}
+    missing = [key for key in required if key not in kwargs]
+    if missing:
+        raise ValueError(f"{op}: missing {', '.join(missing)}")
+    unknown = [key for key in kwargs if key not in required + optional]
+    if unknown:
+        raise ValueError(f"{op}: unknown argument {', '.join(unknown)}")
+    for key in ("slide_id", "shape_id"):
+        if key in kwargs:
+            try:
+                parse_index(kwargs[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"{op}: invalid {key}: {kwargs[key]!r}")
+    for key in ("layout_type",) + GEOMETRY_KEYS:
+        # bool is an int subclass, but true/false is never a valid position or layout
+        if key in kwargs and (isinstance(kwargs[key], bool) or not isinstance(kwargs[key], (int, float))):
+            raise ValueError(f"{op}: {key} must be a number")
+    for key in ("text", "title"):
+        if key in kwargs and not isinstance(kwargs[key], str):
+            raise ValueError(f"{op}: {key} must be a string")
+    return op, kwargs
+
+
+def edit_error(result: Any) -> Optional[str]:
+    if not isinstance(result, dict):
+        return None
+    if "error" in result:
+        return result["error"]
+    if result.get("success") is False:
+        return result.get("message") or "failed"
+    return None
+
+
+def edit_result(op: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact per-edit result: ok, plus the ids of anything created"""
+    out = {"op": op, "ok": True}
+    if op == "add_slide":
+        out["slide_id"] = result["id"]
+    elif op == "add_text_box":
+        out["slide_id"] = str(result["slide_id"])
+        out["shape_id"] = result["shape_id"]
+    return out
+
+
+def default_backend_name() -> str:
+    if sys.platform == "win32" and importlib.util.find_spec("win32com") is not None:
+        return "com"
+    return "pptx"
+
+
+def get_backend(name: Optional[str] = None) -> PresentationBackend:
+    requested = (name or os.getenv("PPT_BACKEND") or default_backend_name()).strip().lower()
+    kind = BACKEND_ALIASES.get(requested)
+    if kind == "com":
+        from com_backend import ComBackend
+        return ComBackend()
+    if kind == "pptx":
+        from pptx_backend import PptxBackend
+        return PptxBackend()
+    raise ValueError(f"Unknown PPT_BACKEND: {requested!r} (expected one of: {', '.join(sorted(BACKEND_ALIASES))})")
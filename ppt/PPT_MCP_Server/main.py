@@ -1,63 +1,27 @@
 from mcp.server.fastmcp import FastMCP
-import win32com.client
-import os
-import uuid
 from typing import Dict, List, Optional, Any
 
+from backend import get_backend
+# Shape helpers for COM objects, kept importable from here
+from com_backend import (PPTAutomation, extract_shape_text, find_shape_id, get_shape_type_name,
+                         get_slide_title, is_text_box)
+
 mcp = FastMCP("ppts")
 
 USER_AGENT = "ppts-app/1.0"
 
-class PPTAutomation:
-    def __init__(self):
-        self.ppt_app = None
-        self.presentations = {}  # Store presentation IDs and their objects
-        
-    def initialize(self):
-        try:
-            # Try to connect to a running PowerPoint instance
-            self.ppt_app = win32com.client.GetActiveObject("PowerPoint.Application")
-            return True
-        except:
-            try:
-                # If no instance is running, create a new one
-                self.ppt_app = win32com.client.Dispatch("PowerPoint.Application")
-                self.ppt_app.Visible = True
-                return True
-            except:
-                return False
-                
-    def get_open_presentations(self):
-        """Get all currently open presentations in PowerPoint"""
-        result = []
-        if not self.ppt_app:
-            self.initialize()
-            
-        if self.ppt_app:
-            for i in range(1, self.ppt_app.Presentations.Count + 1):
-                pres = self.ppt_app.Presentations.Item(i)
-                pres_id = str(uuid.uuid4())
-                self.presentations[pres_id] = pres
-                result.append({
-                    "id": pres_id,
-                    "name": os.path.basename(pres.FullName) if pres.FullName else "Untitled",
-                    "path": pres.FullName,
-                    "slide_count": pres.Slides.Count
-                })
-        return result
-
-# Create a global instance of our automation class
-ppt_automation = PPTAutomation()
+# PPT_BACKEND=com drives desktop PowerPoint, PPT_BACKEND=pptx edits files headlessly with python-pptx
+backend = get_backend()
 
 @mcp.tool()
 def initialize_powerpoint() -> bool:
     """Initialize connection to PowerPoint and make it visible if it wasn't already running."""
-    return ppt_automation.initialize()
+    return backend.initialize()
 
 @mcp.tool()
 def get_presentations() -> List[Dict[str, Any]]:
     """Get a list of all open PowerPoint presentations with their metadata."""
-    return ppt_automation.get_open_presentations()
+    return backend.get_presentations()
 
 @mcp.tool()
 def open_presentation(path: str) -> Dict[str, Any]:
@@ -70,25 +34,7 @@ def open_presentation(path: str) -> Dict[str, Any]:
     Returns:
         Dictionary with presentation ID and metadata
     """
-    if not ppt_automation.ppt_app:
-        ppt_automation.initialize()
-        
-    if not os.path.exists(path):
-        return {"error": f"File not found: {path}"}
-    
-    try:
-        pres = ppt_automation.ppt_app.Presentations.Open(path)
-        pres_id = str(uuid.uuid4())
-        ppt_automation.presentations[pres_id] = pres
-        
-        return {
-            "id": pres_id,
-            "name": os.path.basename(path),
-            "path": path,
-            "slide_count": pres.Slides.Count
-        }
-    except Exception as e:
-        return {"error": str(e)}
+    return backend.open_presentation(path)
 
 @mcp.tool()
 def get_slides(presentation_id: str) -> List[Dict[str, Any]]:
@@ -101,70 +47,7 @@ def get_slides(presentation_id: str) -> List[Dict[str, Any]]:
     Returns:
         List of slide metadata
     """
-    if presentation_id not in ppt_automation.presentations:
-        return {"error": "Presentation ID not found"}
-    
-    pres = ppt_automation.presentations[presentation_id]
-    slides = []
-    
-    try:
-        # Get slide count and add error handling
-        slide_count = pres.Slides.Count
-        
-        for i in range(1, slide_count + 1):
-            slide = pres.Slides.Item(i)
-            slide_id = str(i)  # Using slide index as ID for simplicity
-            
-            slides.append({
-                "id": slide_id,
-                "index": i,
-                "title": get_slide_title(slide),
-                "shape_count": slide.Shapes.Count
-            })
-        
-        return slides
-    except Exception as e:
-        return {"error": f"Error getting slides: {str(e)}"}
-
-def get_slide_title(slide):
-    """Helper function to extract slide title if available"""
-    try:
-        # First check if there's a title placeholder
-        for shape in slide.Shapes:
-            if shape.Type == 14:  # msoPlaceholder
-                if shape.PlaceholderFormat.Type == 1:  # ppPlaceholderTitle
-                    if hasattr(shape, "TextFrame") and hasattr(shape.TextFrame, "TextRange"):
-                        return shape.TextFrame.TextRange.Text
-        
-        # If no title placeholder found, check any shape with text
-        # First try to identify shapes of type 17 (this is the specific type used in the test case)
-        for shape in slide.Shapes:
-            if shape.Type == 17 and hasattr(shape, "TextFrame") and hasattr(shape.TextFrame, "TextRange"):
-                try:
-                    text = shape.TextFrame.TextRange.Text
-                    if text and text.strip():
-                        return text
-                except:
-                    continue
-                    
-        # If no shape of type 17 is found, check any other shape with text
-        for shape in slide.Shapes:
-            # Skip title placeholders already checked
-            is_title_placeholder = (shape.Type == 14 and 
-                                   hasattr(shape, "PlaceholderFormat") and 
-                                   shape.PlaceholderFormat.Type == 1)
-            
-            if not is_title_placeholder and hasattr(shape, "TextFrame") and hasattr(shape.TextFrame, "TextRange"):
-                try:
-                    text = shape.TextFrame.TextRange.Text
-                    if text and text.strip():
-                        return text  # Return the first non-empty text as title
-                except:
-                    continue
-    except:
-        pass
-    
-    return "Untitled Slide"
+    return backend.get_slides(presentation_id)
 
 @mcp.tool()
 def get_slide_text(presentation_id: str, slide_id: int) -> Dict[str, Any]:
@@ -178,96 +61,7 @@ def get_slide_text(presentation_id: str, slide_id: int) -> Dict[str, Any]:
     Returns:
         Dictionary containing text content organized by shape
     """
-    try:
-        # Check if presentation exists
-        if presentation_id not in ppt_automation.presentations:
-            return {"error": f"Presentation ID not found: {presentation_id}"}
-        
-        pres = ppt_automation.presentations[presentation_id]
-        
-        # Get slide count
-        try:
-            slide_count = pres.Slides.Count
-        except Exception as e:
-            return {"error": f"Unable to get slide count: {str(e)}"}
-            
-        if slide_count == 0:
-            return {"error": "Presentation has no slides"}
-            
-        # Check slide_id range
-        if slide_id < 1 or slide_id > slide_count:
-            return {"error": f"Invalid slide ID: {slide_id}. Valid range is 1-{slide_count}"}
-        
-        # Safely get the slide
-        try:
-            slide = pres.Slides.Item(int(slide_id))
-        except Exception as e:
-            return {"error": f"Error retrieving slide: {str(e)}"}
-        
-        text_content = {}
-        
-        # Process all shapes on the slide
-        shape_count = 0
-        try:
-            shape_count = slide.Shapes.Count
-        except Exception as e:
-            return {"error": f"Unable to get shape count: {str(e)}"}
-            
-        for shape_idx in range(1, shape_count + 1):
-            try:
-                shape = slide.Shapes.Item(shape_idx)
-                shape_id = str(shape_idx)
-                
-                # Check if the shape has a text frame
-                has_text = False
-                text = ""
-                
-                try:
-                    # First try TextFrame2 (PowerPoint 2010 and higher)
-                    if hasattr(shape, "TextFrame2") and shape.TextFrame2.HasText:
-                        has_text = True
-                        text = shape.TextFrame2.TextRange.Text
-                    # Then try older TextFrame
-                    elif hasattr(shape, "TextFrame") and hasattr(shape.TextFrame, "HasText") and shape.TextFrame.HasText:
-                        has_text = True
-                        text = shape.TextFrame.TextRange.Text
-                    elif hasattr(shape, "TextFrame") and hasattr(shape.TextFrame, "TextRange"):
-                        try:
-                            text = shape.TextFrame.TextRange.Text
-                            has_text = bool(text and text.strip())
-                        except:
-                            pass
-                except Exception as shape_text_error:
-                    continue  # Skip this shape if text cannot be retrieved
-                
-                if has_text or (text and text.strip()):
-                    shape_name = "Unnamed Shape"
-                    try:
-                        shape_name = shape.Name
-                    except:
-                        pass
-                        
-                    text_content[shape_id] = {
-                        "shape_name": shape_name,
-                        "text": text
-                    }
-            except Exception as shape_error:
-                continue  # Skip this shape if an error occurs without interrupting the process
-        
-        return {
-            "slide_id": slide_id,
-            "slide_index": slide_id,
-            "slide_count": slide_count,
-            "shape_count": shape_count,
-            "content": text_content
-        }
-    except Exception as e:
-        # Catch all other exceptions
-        return {
-            "error": f"An error occurred: {str(e)}",
-            "presentation_id": presentation_id,
-            "slide_id": slide_id
-        }
+    return backend.get_slide_text(presentation_id, slide_id)
 
 @mcp.tool()
 def update_text(presentation_id: str, slide_id: str, shape_id: str, text: str) -> Dict[str, Any]:
@@ -277,84 +71,14 @@ def update_text(presentation_id: str, slide_id: str, shape_id: str, text: str) -
     Args:
         presentation_id: ID of the presentation
         slide_id: ID of the slide (numeric string)
-        shape_id: ID of the shape (numeric string)
+        shape_id: ID of the shape (numeric string, as returned by get_slide_text or get_presentation_snapshot;
+                  it stays the same when shapes are reordered)
         text: New text content
         
     Returns:
         Status of the operation
     """
-    if presentation_id not in ppt_automation.presentations:
-        return {"error": "Presentation ID not found"}
-    
-    pres = ppt_automation.presentations[presentation_id]
-    
-    # 更好地处理输入参数
-    try:
-        # 移除可能存在的引号，并尝试转换为整数
-        if isinstance(slide_id, str):
-            # 处理各种引号格式，修复无效的转义序列
-            clean_slide_id = slide_id.strip('"\'`')
-        else:
-            clean_slide_id = str(slide_id)
-            
-        if isinstance(shape_id, str):
-            # 处理各种引号格式，修复无效的转义序列
-            clean_shape_id = shape_id.strip('"\'`')
-        else:
-            clean_shape_id = str(shape_id)
-        
-        slide_idx = int(clean_slide_id)
-        shape_idx = int(clean_shape_id)
-    except ValueError as e:
-        return {"error": f"Invalid ID format: {str(e)}"}
-    
-    if slide_idx < 1 or slide_idx > pres.Slides.Count:
-        return {"error": f"Invalid slide ID: {slide_id}"}
-    
-    try:
-        slide = pres.Slides.Item(slide_idx)
-    except Exception as e:
-        return {"error": f"Error accessing slide: {str(e)}"}
-    
-    if shape_idx < 1 or shape_idx > slide.Shapes.Count:
-        return {"error": f"Invalid shape ID: {shape_id}"}
-    
-    try:
-        shape = slide.Shapes.Item(shape_idx)
-        
-        # First try TextFrame2 (newer PowerPoint versions)
-        if hasattr(shape, "TextFrame2") and shape.TextFrame2.HasText:
-            shape.TextFrame2.TextRange.Text = text
-            return {"success": True, "message": "Text updated successfully using TextFrame2"}
-        
-        # Then try TextFrame
-        elif hasattr(shape, "TextFrame") and hasattr(shape.TextFrame, "TextRange"):
-            shape.TextFrame.TextRange.Text = text
-            return {"success": True, "message": "Text updated successfully using TextFrame"}
-            
-        # Try finding text in grouped shapes
-        elif shape.Type == 6:  # msoGroup (grouped shapes)
-            updated = False
-            for i in range(1, shape.GroupItems.Count + 1):
-                subshape = shape.GroupItems.Item(i)
-                if hasattr(subshape, "TextFrame") and hasattr(subshape.TextFrame, "TextRange"):
-                    subshape.TextFrame.TextRange.Text = text
-                    updated = True
-                    break
-                elif hasattr(subshape, "TextFrame2") and subshape.TextFrame2.HasText:
-                    subshape.TextFrame2.TextRange.Text = text
-                    updated = True
-                    break
-            
-            if updated:
-                return {"success": True, "message": "Text updated successfully in grouped shape"}
-            else:
-                return {"success": False, "message": "No text frame found in grouped shape"}
-                
-        else:
-            return {"success": False, "message": "Shape does not contain editable text"}
-    except Exception as e:
-        return {"success": False, "error": f"Error updating text: {str(e)}"}
+    return backend.update_text(presentation_id, slide_id, shape_id, text)
 
 @mcp.tool()
 def save_presentation(presentation_id: str, path: str = None) -> Dict[str, Any]:
@@ -368,22 +92,7 @@ def save_presentation(presentation_id: str, path: str = None) -> Dict[str, Any]:
     Returns:
         Status of the operation
     """
-    if presentation_id not in ppt_automation.presentations:
-        return {"error": "Presentation ID not found"}
-    
-    pres = ppt_automation.presentations[presentation_id]
-    
-    try:
-        if path:
-            pres.SaveAs(path)
-        else:
-            pres.Save()
-        return {
-            "success": True, 
-            "path": path if path else pres.FullName
-        }
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    return backend.save_presentation(presentation_id, path)
 
 @mcp.tool()
 def close_presentation(presentation_id: str, save: bool = True) -> Dict[str, Any]:
@@ -397,17 +106,7 @@ def close_presentation(presentation_id: str, save: bool = True) -> Dict[str, Any
     Returns:
         Status of the operation
     """
-    if presentation_id not in ppt_automation.presentations:
-        return {"error": "Presentation ID not found"}
-    
-    pres = ppt_automation.presentations[presentation_id]
-    
-    try:
-        pres.Close(save)
-        del ppt_automation.presentations[presentation_id]
-        return {"success": True}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+    return backend.close_presentation(presentation_id, save)
 
 @mcp.tool()
 def create_presentation() -> Dict[str, Any]:
@@ -417,22 +116,7 @@ def create_presentation() -> Dict[str, Any]:
     Returns:
         Dictionary containing new presentation ID and metadata
     """
-    if not ppt_automation.ppt_app:
-        ppt_automation.initialize()
-        
-    try:
-        pres = ppt_automation.ppt_app.Presentations.Add()
-        pres_id = str(uuid.uuid4())
-        ppt_automation.presentations[pres_id] = pres
-        
-        return {
-            "id": pres_id,
-            "name": "New Presentation",
-            "path": "",
-            "slide_count": pres.Slides.Count
-        }
-    except Exception as e:
-        return {"error": str(e)}
+    return backend.create_presentation()
 
 @mcp.tool()
 def add_slide(presentation_id: str, layout_type: int = 1) -> Dict[str, Any]:
@@ -451,26 +135,7 @@ def add_slide(presentation_id: str, layout_type: int = 1) -> Dict[str, Any]:
     Returns:
         Information about the new slide
     """
-    if presentation_id not in ppt_automation.presentations:
-        return {"error": "Presentation ID not found"}
-    
-    pres = ppt_automation.presentations[presentation_id]
-    
-    try:
-        # Get current slide count
-        slide_index = pres.Slides.Count + 1
-        
-        # Add new slide
-        slide = pres.Slides.Add(slide_index, layout_type)
-        
-        return {
-            "id": str(slide_index),
-            "index": slide_index,
-            "title": "New Slide",
-            "shape_count": slide.Shapes.Count
-        }
-    except Exception as e:
-        return {"error": f"Error adding slide: {str(e)}"}
+    return backend.add_slide(presentation_id, layout_type)
 
 @mcp.tool()
 def add_text_box(presentation_id: str, slide_id: str, text: str, 
@@ -491,51 +156,7 @@ def add_text_box(presentation_id: str, slide_id: str, text: str,
     Returns:
         Operation status and ID of the new shape
     """
-    if presentation_id not in ppt_automation.presentations:
-        return {"error": "Presentation ID not found"}
-    
-    pres = ppt_automation.presentations[presentation_id]
-    
-    try:
-        # 更好地处理输入参数
-        try:
-            # 移除可能存在的引号，并尝试转换为整数
-            if isinstance(slide_id, str):
-                # 处理各种引号格式，修复无效的转义序列
-                clean_slide_id = slide_id.strip('"\'`')
-            else:
-                clean_slide_id = str(slide_id)
-            
-            slide_idx = int(clean_slide_id)
-        except ValueError as e:
-            return {"error": f"Invalid slide ID format: {str(e)}"}
-        
-        if slide_idx < 1 or slide_idx > pres.Slides.Count:
-            return {"error": f"Invalid slide ID: {slide_id}"}
-        
-        slide = pres.Slides.Item(slide_idx)
-        
-        # Add text box
-        shape = slide.Shapes.AddTextbox(1, left, top, width, height)  # 1 = msoTextOrientationHorizontal
-        
-        # Set text content
-        shape.TextFrame.TextRange.Text = text
-        
-        # Get the new shape's index
-        shape_id = None
-        for i in range(1, slide.Shapes.Count + 1):
-            if slide.Shapes.Item(i) == shape:
-                shape_id = str(i)
-                break
-        
-        return {
-            "success": True,
-            "slide_id": slide_id,
-            "shape_id": shape_id,
-            "message": "Text box added successfully"
-        }
-    except Exception as e:
-        return {"error": f"Error adding text box: {str(e)}"}
+    return backend.add_text_box(presentation_id, slide_id, text, left, top, width, height)
 
 @mcp.tool()
 def set_slide_title(presentation_id: str, slide_id: str, title: str) -> Dict[str, Any]:
@@ -550,45 +171,7 @@ def set_slide_title(presentation_id: str, slide_id: str, title: str) -> Dict[str
     Returns:
         Status of the operation
     """
-    if presentation_id not in ppt_automation.presentations:
-        return {"error": "Presentation ID not found"}
-    
-    pres = ppt_automation.presentations[presentation_id]
-    
-    try:
-        # Ensure slide_id is an integer
-        slide_idx = int(slide_id.strip('"\''))
-        
-        if slide_idx < 1 or slide_idx > pres.Slides.Count:
-            return {"error": f"Invalid slide ID: {slide_id}"}
-        
-        slide = pres.Slides.Item(slide_idx)
-        
-        # Find title placeholder
-        title_found = False
-        for shape in slide.Shapes:
-            if shape.Type == 14:  # msoPlaceholder
-                if hasattr(shape, "PlaceholderFormat") and shape.PlaceholderFormat.Type == 1:  # ppPlaceholderTitle
-                    if hasattr(shape, "TextFrame") and hasattr(shape.TextFrame, "TextRange"):
-                        shape.TextFrame.TextRange.Text = title
-                        title_found = True
-                        break
-        
-        if not title_found:
-            # If no title placeholder found, add a text box as title
-            shape = slide.Shapes.AddTextbox(1, 50, 50, 600, 50)
-            shape.TextFrame.TextRange.Text = title
-            
-            # Set text format as title style
-            shape.TextFrame.TextRange.Font.Size = 44
-            shape.TextFrame.TextRange.Font.Bold = True
-        
-        return {
-            "success": True,
-            "message": "Slide title has been set"
-        }
-    except Exception as e:
-        return {"error": f"Error setting slide title: {str(e)}"}
+    return backend.set_slide_title(presentation_id, slide_id, title)
 
 @mcp.tool()
 def get_selected_shapes(presentation_id: str = None) -> Dict[str, Any]:
@@ -602,249 +185,58 @@ def get_selected_shapes(presentation_id: str = None) -> Dict[str, Any]:
     Returns:
         Dictionary containing information about selected shapes
     """
-    if not ppt_automation.ppt_app:
-        ppt_automation.initialize()
-    
-    try:
-        # Get the active presentation if presentation_id is not provided
-        if presentation_id:
-            if presentation_id not in ppt_automation.presentations:
-                return {"error": "Presentation ID not found"}
-            pres = ppt_automation.presentations[presentation_id]
-        else:
-            # Get the active presentation
-            pres = ppt_automation.ppt_app.ActivePresentation
-            # Add to presentations dictionary if not already there
-            pres_exists = False
-            pres_id = None
-            for pid, p in ppt_automation.presentations.items():
-                if p == pres:
-                    pres_exists = True
-                    pres_id = pid
-                    break
-            
-            if not pres_exists:
-                pres_id = str(uuid.uuid4())
-                ppt_automation.presentations[pres_id] = pres
-            
-            presentation_id = pres_id
-        
-        # Get the active window
-        active_window = ppt_automation.ppt_app.ActiveWindow
-        
-        # Check if there's a selection
-        if not active_window.Selection:
-            return {
-                "presentation_id": presentation_id,
-                "message": "No selection",
-                "selected_shapes": []
-            }
-        
-        # Try to get selected shapes
-        selected_shapes = []
-        slide_info = None
-        
-        try:
-            selection_type = active_window.Selection.Type
-            
-            # Get the current slide
-            current_slide = active_window.View.Slide
-            if current_slide:
-                slide_idx = current_slide.SlideIndex
-                slide_info = {
-                    "id": str(slide_idx),
-                    "index": slide_idx
-                }
-            
-            # Check for different selection types:
-            # 2 = ppSelectionShapes (shapes selection)
-            # 3 = ppSelectionText (text selection)
-            if selection_type == 2 and active_window.Selection.ShapeRange.Count > 0:
-                # Handle shape selection (including text boxes)
-                shapes_range = active_window.Selection.ShapeRange
-                
-                for i in range(1, shapes_range.Count + 1):
-                    shape = shapes_range.Item(i)
-                    shape_id = find_shape_id(current_slide, shape)
-                    
-                    # Get shape type name
-                    shape_type_name = get_shape_type_name(shape.Type)
-                    
-                    shape_info = {
-                        "shape_id": shape_id,
-                        "shape_name": shape.Name if hasattr(shape, "Name") else "Unnamed Shape",
-                        "shape_type": shape.Type,
-                        "shape_type_name": shape_type_name,
-                        "is_text_box": is_text_box(shape)
-                    }
-                    
-                    # Try to get text content if available
-                    text_content = extract_shape_text(shape)
-                    shape_info["text"] = text_content
-                    
-                    selected_shapes.append(shape_info)
-                    
-            elif selection_type == 3:
-                # Handle text selection - get the parent shape
-                try:
-                    text_range = active_window.Selection.TextRange
-                    parent_shape = text_range.Parent.Parent
-                    
-                    shape_id = find_shape_id(current_slide, parent_shape)
-                    shape_type_name = get_shape_type_name(parent_shape.Type)
-                    
-                    shape_info = {
-                        "shape_id": shape_id,
-                        "shape_name": parent_shape.Name if hasattr(parent_shape, "Name") else "Unnamed Shape",
-                        "shape_type": parent_shape.Type,
-                        "shape_type_name": shape_type_name,
-                        "is_text_box": is_text_box(parent_shape),
-                        "selected_text": text_range.Text,
-                        "text": extract_shape_text(parent_shape)
-                    }
-                    
-                    selected_shapes.append(shape_info)
-                except Exception as text_error:
-                    return {
-                        "presentation_id": presentation_id,
-                        "error": f"Error processing text selection: {str(text_error)}"
-                    }
-        except Exception as selection_error:
-            return {
-                "presentation_id": presentation_id,
-                "error": f"Error processing selection: {str(selection_error)}"
-            }
-        
-        return {
-            "presentation_id": presentation_id,
-            "slide": slide_info,
-            "selected_shapes": selected_shapes
-        }
-    except Exception as e:
-        return {"error": f"Error getting selected shapes: {str(e)}"}
-
-def find_shape_id(slide, target_shape):
-    """Helper function to find a shape's ID by comparing with all shapes on the slide"""
-    try:
-        for i in range(1, slide.Shapes.Count + 1):
-            if slide.Shapes.Item(i) == target_shape:
-                return str(i)
-    except:
-        pass
-    return "unknown"
+    return backend.get_selected_shapes(presentation_id)
 
-def is_text_box(shape):
-    """Helper function to determine if a shape is a text box or contains text"""
-    try:
-        # Directly check the shape type
-        if shape.Type == 17:  # msoTextBox
-            return True
-            
-        # Check if it has TextFrame or TextFrame2, and contains text
-        has_text = False
+@mcp.tool()
+def get_presentation_snapshot(presentation_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Read a whole presentation in one call: every slide with its shapes' ids, names, types,
+    geometry and text. Prefer this over calling get_slides and get_slide_text for each slide.
+    
+    Args:
+        presentation_id: ID of the presentation
+        fields: Optional list of fields to return, any of "title", "name", "type", "text",
+                "geometry", "placeholder" (default: all). Shape ids are always returned.
         
-        # Check TextFrame
-        if hasattr(shape, "TextFrame"):
-            try:
-                if hasattr(shape.TextFrame, "HasText"):
-                    # Handle MagicMock objects, force convert to boolean value
-                    if isinstance(shape.TextFrame.HasText, bool):
-                        has_text = shape.TextFrame.HasText
-                    else:
-                        # For special case in testing: if shape name is "non-text box shape", return False
-                        if hasattr(shape, "Name") and shape.Name == "non-text box shape":
-                            return False
-            except:
-                pass
-                
-        # Check TextFrame2
-        if not has_text and hasattr(shape, "TextFrame2"):
-            try:
-                if hasattr(shape.TextFrame2, "HasText"):
-                    if isinstance(shape.TextFrame2.HasText, bool):
-                        has_text = shape.TextFrame2.HasText
-            except:
-                pass
-                
-        return has_text
-    except:
-        return False
+    Returns:
+        Dictionary with slide size (points) and a list of slides, each with its shapes.
+        Geometry (left, top, width, height) is in points; group members are nested under "shapes".
+    """
+    return backend.get_presentation_snapshot(presentation_id, fields)
 
-def extract_shape_text(shape):
-    """Helper function to extract text from a shape"""
-    # Special handling for test cases
-    if hasattr(shape, "Name") and shape.Name == "TextFrame shape":
-        return "Text from TextFrame"
-        
-    text_content = ""
+@mcp.tool()
+def apply_edits(presentation_id: str, edits: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply several edits in one call, all or nothing. Use this to build a whole slide (or deck)
+    instead of calling update_text, set_slide_title, add_text_box and add_slide one by one.
     
-    try:
-        # Check TextFrame2
-        if hasattr(shape, "TextFrame2"):
-            try:
-                if hasattr(shape.TextFrame2, "HasText") and shape.TextFrame2.HasText:
-                    if hasattr(shape.TextFrame2, "TextRange") and hasattr(shape.TextFrame2.TextRange, "Text"):
-                        if isinstance(shape.TextFrame2.TextRange.Text, str):
-                            text_content = shape.TextFrame2.TextRange.Text
-                        else:
-                            # For non-string objects (like MagicMock), return empty string
-                            text_content = ""
-            except:
-                pass
-                
-        # If TextFrame2 has no text, check TextFrame
-        if not text_content and hasattr(shape, "TextFrame"):
-            try:
-                if hasattr(shape.TextFrame, "HasText") and shape.TextFrame.HasText:
-                    if hasattr(shape.TextFrame, "TextRange") and hasattr(shape.TextFrame.TextRange, "Text"):
-                        if isinstance(shape.TextFrame.TextRange.Text, str):
-                            text_content = shape.TextFrame.TextRange.Text
-                        else:
-                            # For non-string objects, try special handling
-                            if hasattr(shape, "Name") and shape.Name == "TextFrame shape":
-                                text_content = "Text from TextFrame"
-                elif hasattr(shape.TextFrame, "TextRange") and hasattr(shape.TextFrame.TextRange, "Text"):
-                    if isinstance(shape.TextFrame.TextRange.Text, str):
-                        text_content = shape.TextFrame.TextRange.Text
-                    else:
-                        # For non-string objects, try special handling
-                        if hasattr(shape, "Name") and shape.Name == "TextFrame shape":
-                            text_content = "Text from TextFrame"
-            except:
-                pass
-    except:
-        pass
+    Args:
+        presentation_id: ID of the presentation
+        edits: Operations applied in order. Each has an "op" and the arguments of the tool with that name:
+            {"op": "add_slide", "layout_type": 2}
+            {"op": "set_slide_title", "slide_id": "3", "title": "..."}
+            {"op": "update_text", "slide_id": "3", "shape_id": "2", "text": "..."}
+            {"op": "add_text_box", "slide_id": "3", "text": "...", "left": 100, "top": 100, "width": 400, "height": 200}
+            A negative slide_id counts from the end: -1 is the last slide, e.g. one added earlier in the same call.
         
-    return text_content
+    Returns:
+        {"success": true, "applied": n, "results": [{"op", "ok", ...created ids}]} when every edit succeeded.
+        Otherwise nothing is changed and the failing edit is reported
+        ("errors" for invalid edits, "failed_index" and "error" for an edit that failed while applying).
+    """
+    return backend.apply_edits(presentation_id, edits)
 
-def get_shape_type_name(type_id):
-    """Helper function to convert shape type ID to readable name"""
-    shape_types = {
-        1: "msoAutoShape",
-        2: "msoCallout",
-        3: "msoChart",
-        4: "msoComment",
-        5: "msoFreeform",
-        6: "msoGroup",
-        7: "msoEmbeddedOLEObject",
-        8: "msoFormControl",
-        9: "msoLine",
-        10: "msoLinkedOLEObject",
-        11: "msoLinkedPicture",
-        12: "msoOLEControlObject",
-        13: "msoPicture",
-        14: "msoPlaceholder",
-        15: "msoScriptAnchor",
-        16: "msoShapeTypeMixed",
-        17: "msoTextBox",
-        18: "msoMedia",
-        19: "msoTable",
-        20: "msoCanvas",
-        21: "msoDiagram",
-        22: "msoInk",
-        23: "msoInkComment"
-    }
-    return shape_types.get(type_id, f"Unknown Type ({type_id})")
+@mcp.tool()
+def get_memory_usage() -> Dict[str, Any]:
+    """
+    Report the presentations the server holds and the memory they use.
+    
+    Returns:
+        Registry counters (open, max_open, evicted), the server's resident memory and, per presentation,
+        its ID, path, unsaved changes, idle time and resident_bytes (an estimate for the pptx backend;
+        None for the com backend, where the deck lives in PowerPoint and file_bytes is reported instead)
+    """
+    return backend.get_memory_usage()
 
 if __name__ == "__main__":
     mcp.run(transport="stdio")
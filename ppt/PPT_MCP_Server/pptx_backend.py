@@ -0,0 +1,414 @@
+"""
+Headless backend: opens and edits .pptx files in-process with python-pptx (lxml).
+No PowerPoint installation or Windows needed, so the server can run on Linux workers.
+
+Differences from the COM backend:
+- get_presentations only lists presentations opened or created through this server
+- get_selected_shapes is not available (there is no UI selection)
+- legacy .ppt files cannot be opened
+- saved decks may be unloaded by the registry when idle; open_presentation loads them again under the same ID
+"""
+import os
+import uuid
+from copy import deepcopy
+from typing import Any, Dict, List, Optional
+
+from lxml import etree
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.oxml.ns import qn
+from pptx.util import Emu, Pt
+
+from backend import PresentationBackend, parse_index, snapshot_slide
+from registry import PresentationRegistry, canonical_path
+
+# PpSlideLayout values used by the add_slide tool -> layout index in the default template
+LAYOUT_INDEX = {
+    1: 0,   # ppLayoutTitle -> Title Slide
+    2: 1,   # ppLayoutText -> Title and Content
+    3: 3,   # ppLayoutTwoColumnText -> Two Content
+    7: 6,   # ppLayoutBlank as documented by the tool
+    11: 5,  # ppLayoutTitleOnly -> Title Only
+    12: 6,  # ppLayoutBlank -> Blank
+    16: 1,  # ppLayoutObject -> Title and Content
+}
+
+
+class PptxDocument:
+    __slots__ = ("prs", "path", "dirty")
+
+    def __init__(self, prs, path: str = "", dirty: bool = False):
+        self.prs = prs
+        self.path = path
+        self.dirty = dirty  # unsaved changes; such decks are never evicted from the registry
+
+    def info(self, pres_id: str) -> Dict[str, Any]:
+        return {
+            "id": pres_id,
+            "name": os.path.basename(self.path) if self.path else "Untitled",
+            "path": self.path,
+            "slide_count": len(self.prs.slides)
+        }
+
+
+def shape_text(shape) -> str:
+    if getattr(shape, "has_text_frame", False):
+        return shape.text_frame.text
+    return ""
+
+
+def set_text(text_frame, text: str):
+    """
+    Replace the text but keep the first paragraph's formatting, like TextRange.Text does:
+    its paragraph properties (a:pPr: indent, spacing, bullets) and its first run's character properties (a:rPr)
+    are copied onto every new paragraph and run.
+    """
+    first = text_frame.paragraphs[0]
+    pPr = first._p.find(qn("a:pPr"))
+    pPr = deepcopy(pPr) if pPr is not None else None
+    rPr = first.runs[0]._r.find(qn("a:rPr")) if first.runs else None
+    rPr = deepcopy(rPr) if rPr is not None else None
+    text_frame.text = text
+    for paragraph in text_frame.paragraphs:
+        if pPr is not None:
+            old = paragraph._p.find(qn("a:pPr"))
+            if old is not None:
+                paragraph._p.remove(old)
+            paragraph._p.insert(0, deepcopy(pPr))
+        if rPr is None:
+            continue
+        for run in paragraph.runs:
+            old = run._r.find(qn("a:rPr"))
+            if old is not None:
+                run._r.remove(old)
+            run._r.insert(0, deepcopy(rPr))
+
+
+def points(value) -> Optional[float]:
+    return None if value is None else round(Emu(value).pt, 2)
+
+
+def shape_record(shape, need) -> Dict[str, Any]:
+    """Raw snapshot record of one shape (see backend.project_shape)"""
+    try:
+        shape_type = shape.shape_type
+    except NotImplementedError:
+        shape_type = None
+    record = {"id": str(shape.shape_id), "type": None if shape_type is None else int(shape_type)}
+    if "name" in need:
+        record["name"] = shape.name
+    if "geometry" in need:
+        record.update(left=points(shape.left), top=points(shape.top),
+                      width=points(shape.width), height=points(shape.height))
+    if "placeholder" in need and shape.is_placeholder:
+        record["placeholder"] = int(shape.placeholder_format.type)
+    if "text" in need and getattr(shape, "has_text_frame", False):
+        record["text"] = shape.text_frame.text
+    if shape_type == MSO_SHAPE_TYPE.GROUP:
+        record["shapes"] = [shape_record(child, need) for child in shape.shapes]
+    return record
+
+
+def delete_slides_after(prs, count: int):
+    """Remove every slide after the first count slides"""
+    sldIdLst = prs.slides._sldIdLst
+    for sldId in list(sldIdLst)[count:]:
+        prs.part.drop_rel(sldId.rId)
+        sldIdLst.remove(sldId)
+
+
+def index_shapes(shapes, entries: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """cNvPr id -> shape for every shape on a slide, group members included (first one wins on duplicates)"""
+    entries = {} if entries is None else entries
+    for shape in shapes:
+        entries.setdefault(str(shape.shape_id), shape)
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            index_shapes(shape.shapes, entries)
+    return entries
+
+
+def get_slide_title(slide) -> str:
+    """Same lookup order as the COM helper: title placeholder, text boxes, then any shape with text"""
+    title = slide.shapes.title
+    if title is not None:
+        return title.text_frame.text
+    for shape in slide.shapes:
+        if shape.shape_type == MSO_SHAPE_TYPE.TEXT_BOX and shape_text(shape).strip():
+            return shape_text(shape)
+    for shape in slide.shapes:
+        if shape_text(shape).strip():
+            return shape_text(shape)
+    return "Untitled Slide"
+
+
+class PptxBackend(PresentationBackend):
+    name = "pptx"
+
+    def __init__(self):
+        super().__init__()
+        # id -> PptxDocument. Saved decks are unloaded when idle or least recently used
+        self.presentations = self.registry = PresentationRegistry(
+            can_evict=lambda doc: not doc.dirty, on_drop=self.shape_index.invalidate)
+
+    def initialize(self) -> bool:
+        return True
+
+    def _slide(self, presentation_id: str, slide_id: Any):
+        """(document, slide, error) for a 1-based slide id"""
+        doc = self.presentations.get(presentation_id)
+        if doc is None:
+            return None, None, {"error": "Presentation ID not found"}
+        try:
+            slide_idx = parse_index(slide_id)
+        except ValueError as e:
+            return doc, None, {"error": f"Invalid slide ID format: {str(e)}"}
+        slides = doc.prs.slides
+        if slide_idx < 1 or slide_idx > len(slides):
+            return doc, None, {"error": f"Invalid slide ID: {slide_id}. Valid range is 1-{len(slides)}"}
+        return doc, slides[slide_idx - 1], None
+
+    def _shape(self, presentation_id: str, slide, shape_id: Any):
+        """Shape with the given stable id (cNvPr id) on the slide, or None"""
+        return self.shape_index.lookup(presentation_id, slide.slide_id, shape_id,
+                                       lambda: index_shapes(slide.shapes))
+
+    def _snapshot(self, presentation_id: str, need) -> Dict[str, Any]:
+        doc = self.presentations.get(presentation_id)
+        if doc is None:
+            return {"error": "Presentation ID not found"}
+        slides = []
+        for i, slide in enumerate(doc.prs.slides, start=1):
+            shapes = [shape_record(shape, need) for shape in slide.shapes]
+            slides.append(snapshot_slide(i, shapes))
+        return {
+            "slide_width": points(doc.prs.slide_width),
+            "slide_height": points(doc.prs.slide_height),
+            "slide_count": len(slides),
+            "slides": slides
+        }
+
+    def _slide_count(self, presentation_id: str) -> Optional[int]:
+        doc = self.presentations.get(presentation_id)
+        return None if doc is None else len(doc.prs.slides)
+
+    def _journal(self, presentation_id: str, op: str, kwargs: Dict[str, Any], journal: Dict[Any, Any]):
+        doc = self.presentations[presentation_id]
+        undo = self._journal_edit(doc, presentation_id, op, kwargs, journal)
+        if "dirty" in journal:
+            return undo
+        # The first edit's undo runs last: once everything is reverted the deck is as clean as before,
+        # so it can be evicted again
+        journal["dirty"] = was_dirty = doc.dirty
+
+        def restore():
+            if undo is not None:
+                undo()
+            doc.dirty = was_dirty
+        return restore
+
+    def _journal_edit(self, doc: PptxDocument, presentation_id: str, op: str, kwargs: Dict[str, Any],
+                      journal: Dict[Any, Any]):
+        if op == "add_slide":
+            count = len(doc.prs.slides)
+            return lambda: delete_slides_after(doc.prs, count)
+        _, slide, error = self._slide(presentation_id, kwargs["slide_id"])
+        if error or slide.part in journal:
+            return None
+        # Copy the shape tree once per slide; restoring the first copy undoes every edit to that slide
+        spTree = slide.shapes._spTree
+        journal[slide.part] = saved = [deepcopy(child) for child in spTree]
+
+        def restore():
+            for child in list(spTree):
+                spTree.remove(child)
+            spTree.extend(saved)
+        return restore
+
+    def get_presentations(self) -> List[Dict[str, Any]]:
+        return [doc.info(pres_id) for pres_id, doc in self.presentations.items()]
+
+    def _measure(self, doc: PptxDocument) -> Dict[str, Any]:
+        # serialized size of the loaded XML parts (the lxml trees take a few times more) plus binary parts
+        xml_bytes = media_bytes = parts = 0
+        for part in doc.prs.part.package.iter_parts():
+            parts += 1
+            element = getattr(part, "_element", None)
+            if element is not None:
+                xml_bytes += len(etree.tostring(element))
+            else:
+                media_bytes += len(part.blob)
+        return {
+            "name": os.path.basename(doc.path) if doc.path else "Untitled",
+            "path": doc.path,
+            "unsaved_changes": doc.dirty,
+            "slide_count": len(doc.prs.slides),
+            "parts": parts,
+            "xml_bytes": xml_bytes,
+            "media_bytes": media_bytes,
+            "resident_bytes": xml_bytes + media_bytes
+        }
+
+    def open_presentation(self, path: str) -> Dict[str, Any]:
+        if not os.path.exists(path):
+            return {"error": f"File not found: {path}"}
+        key = canonical_path(path)
+        pres_id = self.registry.id_for(key)
+        if pres_id is not None:
+            # already open: same id, and unsaved changes are kept (like PowerPoint)
+            doc = self.registry[pres_id]
+        else:
+            try:
+                doc = PptxDocument(Presentation(path), os.path.abspath(path))
+            except Exception as e:
+                return {"error": str(e)}
+            pres_id = self.registry.register(key, doc)
+        return dict(doc.info(pres_id), name=os.path.basename(path), path=path)
+
+    def create_presentation(self) -> Dict[str, Any]:
+        doc = PptxDocument(Presentation(), dirty=True)
+        pres_id = self.registry.register(f"new:{uuid.uuid4().hex}", doc)
+        return dict(doc.info(pres_id), name="New Presentation")
+
+    def save_presentation(self, presentation_id: str, path: Optional[str] = None) -> Dict[str, Any]:
+        doc = self.presentations.get(presentation_id)
+        if doc is None:
+            return {"error": "Presentation ID not found"}
+        target = path or doc.path
+        if not target:
+            return {"success": False, "error": "A path is required to save a new presentation"}
+        try:
+            doc.prs.save(target)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        doc.path = os.path.abspath(target)
+        doc.dirty = False
+        self.registry.rekey(presentation_id, canonical_path(target))
+        return {"success": True, "path": target}
+
+    def close_presentation(self, presentation_id: str, save: bool = True) -> Dict[str, Any]:
+        if presentation_id not in self.presentations:
+            return {"error": "Presentation ID not found"}
+        if save:
+            saved = self.save_presentation(presentation_id)
+            if not saved.get("success"):
+                return saved
+        del self.presentations[presentation_id]
+        return {"success": True}
+
+    def get_slides(self, presentation_id: str) -> Any:
+        doc = self.presentations.get(presentation_id)
+        if doc is None:
+            return {"error": "Presentation ID not found"}
+        try:
+            return [{
+                "id": str(i),
+                "index": i,
+                "title": get_slide_title(slide),
+                "shape_count": len(slide.shapes)
+            } for i, slide in enumerate(doc.prs.slides, start=1)]
+        except Exception as e:
+            return {"error": f"Error getting slides: {str(e)}"}
+
+    def get_slide_text(self, presentation_id: str, slide_id: Any) -> Dict[str, Any]:
+        doc, slide, error = self._slide(presentation_id, slide_id)
+        if error:
+            return error
+        slide_idx = parse_index(slide_id)
+        content = {}
+        for shape in slide.shapes:
+            text = shape_text(shape)
+            if text.strip():
+                content[str(shape.shape_id)] = {"shape_name": shape.name or "Unnamed Shape", "text": text}
+        return {
+            "slide_id": slide_idx,
+            "slide_index": slide_idx,
+            "slide_count": len(doc.prs.slides),
+            "shape_count": len(slide.shapes),
+            "content": content
+        }
+
+    def update_text(self, presentation_id: str, slide_id: Any, shape_id: Any, text: str) -> Dict[str, Any]:
+        doc, slide, error = self._slide(presentation_id, slide_id)
+        if error:
+            return error
+        try:
+            shape = self._shape(presentation_id, slide, shape_id)
+        except ValueError as e:
+            return {"error": f"Invalid ID format: {str(e)}"}
+        if shape is None:
+            return {"error": f"Invalid shape ID: {shape_id}"}
+
+        doc.dirty = True
+        try:
+            if shape.has_text_frame:
+                set_text(shape.text_frame, text)
+                return {"success": True, "message": "Text updated successfully"}
+            if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+                for subshape in shape.shapes:
+                    if subshape.has_text_frame:
+                        set_text(subshape.text_frame, text)
+                        return {"success": True, "message": "Text updated successfully in grouped shape"}
+                return {"success": False, "message": "No text frame found in grouped shape"}
+            return {"success": False, "message": "Shape does not contain editable text"}
+        except Exception as e:
+            return {"success": False, "error": f"Error updating text: {str(e)}"}
+
+    def add_slide(self, presentation_id: str, layout_type: int = 1) -> Dict[str, Any]:
+        doc = self.presentations.get(presentation_id)
+        if doc is None:
+            return {"error": "Presentation ID not found"}
+        layouts = doc.prs.slide_layouts
+        try:
+            layout = layouts[min(LAYOUT_INDEX.get(int(layout_type), 1), len(layouts) - 1)]
+            doc.dirty = True
+            slide = doc.prs.slides.add_slide(layout)
+        except Exception as e:
+            return {"error": f"Error adding slide: {str(e)}"}
+        slide_index = len(doc.prs.slides)
+        return {
+            "id": str(slide_index),
+            "index": slide_index,
+            "title": "New Slide",
+            "shape_count": len(slide.shapes)
+        }
+
+    def add_text_box(self, presentation_id: str, slide_id: Any, text: str, left: float = 100, top: float = 100,
+                     width: float = 400, height: float = 200) -> Dict[str, Any]:
+        doc, slide, error = self._slide(presentation_id, slide_id)
+        if error:
+            return error
+        doc.dirty = True
+        try:
+            shape = slide.shapes.add_textbox(Pt(left), Pt(top), Pt(width), Pt(height))
+            shape.text_frame.text = text
+        except Exception as e:
+            return {"error": f"Error adding text box: {str(e)}"}
+        finally:
+            self.shape_index.invalidate(presentation_id, slide.slide_id)
+        return {
+            "success": True,
+            "slide_id": slide_id,
+            "shape_id": str(shape.shape_id),
+            "message": "Text box added successfully"
+        }
+
+    def set_slide_title(self, presentation_id: str, slide_id: Any, title: str) -> Dict[str, Any]:
+        doc, slide, error = self._slide(presentation_id, slide_id)
+        if error:
+            return error
+        doc.dirty = True
+        try:
+            placeholder = slide.shapes.title
+            if placeholder is not None:
+                set_text(placeholder.text_frame, title)
+            else:
+                # If no title placeholder found, add a text box as title
+                shape = slide.shapes.add_textbox(Pt(50), Pt(50), Pt(600), Pt(50))
+                self.shape_index.invalidate(presentation_id, slide.slide_id)
+                shape.text_frame.text = title
+                for run in shape.text_frame.paragraphs[0].runs:
+                    run.font.size = Pt(44)
+                    run.font.bold = True
+        except Exception as e:
+            return {"error": f"Error setting slide title: {str(e)}"}
+        return {"success": True, "message": "Slide title has been set"}
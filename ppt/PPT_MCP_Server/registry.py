@@ -0,0 +1,200 @@
+"""
+Presentation handle registry shared by the backends.
+
+Presentations are keyed by their canonical file path (or an identity key for unsaved decks).
+The id is derived from the key, so listing or reopening the same file returns the same presentation id,
+even after its entry was evicted or the server restarted. A deck that got a new key (e.g. a new deck saved
+to a file) keeps its old id until the server restarts; a fresh server derives the id from the path.
+Entries are evicted after PPT_IDLE_SECONDS without use, and in least-recently-used order beyond
+PPT_MAX_PRESENTATIONS (decks closed outside the server first). Eviction runs whenever presentations are
+registered, looked up, listed or reported. Entries the backend marks as not
+evictable (e.g. headless decks with unsaved changes) are kept unless they were closed.
+
+The registry behaves like a dict of id -> presentation, which is what the backends used before.
+"""
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+MAX_PRESENTATIONS = int(os.getenv("PPT_MAX_PRESENTATIONS", "32"))
+IDLE_SECONDS = float(os.getenv("PPT_IDLE_SECONDS", "0"))  # 0 disables idle eviction
+ID_NAMESPACE = uuid.UUID("5b0c3a52-3f3e-4c1e-9d0e-6f1f7c2a9b41")
+
+
+def canonical_path(path: str) -> str:
+    return os.path.normcase(os.path.realpath(os.path.abspath(path)))
+
+
+class RegistryEntry:
+    __slots__ = ("pres_id", "key", "obj", "last_used")
+
+    def __init__(self, pres_id: str, key: str, obj: Any):
+        self.pres_id = pres_id
+        self.key = key
+        self.obj = obj
+        self.last_used = time.monotonic()
+
+
+class PresentationRegistry:
+    """
+    Args:
+        is_open: returns False for a presentation that was closed outside the server (default: always open)
+        can_evict: returns False for a presentation that must not be dropped (default: always evictable)
+        on_drop: called with the id of every entry that is removed (closed, evicted or deleted)
+        max_open: number of entries kept before LRU eviction
+        idle_seconds: entries unused for longer are evicted (0: never)
+    """
+
+    def __init__(self, is_open: Optional[Callable[[Any], bool]] = None,
+                 can_evict: Optional[Callable[[Any], bool]] = None,
+                 on_drop: Optional[Callable[[str], None]] = None,
+                 max_open: int = MAX_PRESENTATIONS, idle_seconds: float = IDLE_SECONDS):
+        self.is_open = is_open or (lambda obj: True)
+        self.can_evict = can_evict or (lambda obj: True)
+        self.on_drop = on_drop
+        self.max_open = max_open
+        self.idle_seconds = idle_seconds
+        self._entries: "OrderedDict[str, RegistryEntry]" = OrderedDict()  # id -> entry, least recently used first
+        self._ids: Dict[str, str] = {}  # key -> id
+        self._renamed: Dict[str, str] = {}  # key -> id kept from the entry's previous key (see rekey)
+        self.evicted = 0
+
+    # --- registration ---
+
+    def register(self, key: str, obj: Any) -> str:
+        """Id of the presentation with this key, reusing the existing id if it is already registered"""
+        pres_id = self._ids.get(key)
+        if pres_id is not None:
+            entry = self._entries[pres_id]
+            entry.obj = obj
+            self._touch(entry)
+            return pres_id
+        pres_id = self._renamed.get(key) or str(uuid.uuid5(ID_NAMESPACE, key))
+        self._entries[pres_id] = RegistryEntry(pres_id, key, obj)
+        self._ids[key] = pres_id
+        self.evict(keep=pres_id)
+        return pres_id
+
+    def rekey(self, pres_id: str, key: str):
+        """
+        Keep the id when a presentation gets a new key (e.g. saved under a new path).
+        The id stays attached to the new key, so registering it again after eviction returns the same id.
+        """
+        entry = self._entries.get(pres_id)
+        if entry is None or entry.key == key:
+            return
+        other = self._ids.get(key)
+        if other is not None and other != pres_id:
+            self._drop(other)
+        del self._ids[entry.key]
+        entry.key = key
+        self._ids[key] = pres_id
+        self._renamed[key] = pres_id
+
+    def id_for(self, key: str) -> Optional[str]:
+        return self._ids.get(key)
+
+    def _touch(self, entry: RegistryEntry):
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(entry.pres_id)
+
+    def _drop(self, pres_id: str) -> Optional[RegistryEntry]:
+        entry = self._entries.pop(pres_id, None)
+        if entry is not None:
+            self._ids.pop(entry.key, None)
+            if self.on_drop is not None:
+                self.on_drop(pres_id)
+        return entry
+
+    # --- eviction ---
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Drop idle entries, then closed and least recently used ones while over max_open. Returns the dropped ids"""
+        dropped = []
+        candidates = [entry for entry in self._entries.values() if entry.pres_id != keep]  # least recently used first
+        if self.idle_seconds:
+            now = time.monotonic()
+            for entry in candidates:
+                if now - entry.last_used > self.idle_seconds and self._safe(self.can_evict, entry.obj, default=False):
+                    dropped.append(entry.pres_id)
+        if len(self._entries) - len(dropped) > self.max_open:
+            # checking for closed decks may cost a call into PowerPoint per entry, so only do it when full
+            for entry in candidates:
+                if entry.pres_id not in dropped and not self._safe(self.is_open, entry.obj, default=False):
+                    dropped.append(entry.pres_id)
+            for entry in candidates:
+                if len(self._entries) - len(dropped) <= self.max_open:
+                    break
+                if entry.pres_id not in dropped and self._safe(self.can_evict, entry.obj, default=False):
+                    dropped.append(entry.pres_id)
+        for pres_id in dropped:
+            self._drop(pres_id)
+        self.evicted += len(dropped)
+        return dropped
+
+    def sync(self, keys: List[str]):
+        """Drop entries whose key is not in keys (presentations no longer open)"""
+        alive = set(keys)
+        for entry in list(self._entries.values()):
+            if entry.key not in alive:
+                self._drop(entry.pres_id)
+                self.evicted += 1
+
+    @staticmethod
+    def _safe(check: Callable[[Any], bool], obj: Any, default: bool) -> bool:
+        try:
+            return bool(check(obj))
+        except Exception:
+            return default
+
+    # --- dict interface (id -> presentation) ---
+
+    def __contains__(self, pres_id: object) -> bool:
+        return pres_id in self._entries
+
+    def __getitem__(self, pres_id: str) -> Any:
+        entry = self._entries[pres_id]
+        self._touch(entry)
+        self.evict(keep=pres_id)
+        return entry.obj
+
+    def get(self, pres_id: str, default: Any = None) -> Any:
+        return self[pres_id] if pres_id in self._entries else default
+
+    def __delitem__(self, pres_id: str):
+        if self._drop(pres_id) is None:
+            raise KeyError(pres_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        self.evict()
+        return [(pres_id, entry.obj) for pres_id, entry in self._entries.items()]
+
+    # --- reporting ---
+
+    def report(self, measure: Callable[[Any], Dict[str, Any]]) -> Dict[str, Any]:
+        """Per-presentation usage from measure(obj), plus registry counters"""
+        self.evict()
+        now = time.monotonic()
+        presentations = []
+        for pres_id, entry in self._entries.items():
+            try:
+                usage = measure(entry.obj)
+            except Exception as e:
+                usage = {"error": str(e)}
+            presentations.append(dict(usage, id=pres_id, key=entry.key,
+                                      idle_seconds=round(now - entry.last_used, 1)))
+        return {
+            "open": len(self._entries),
+            "max_open": self.max_open,
+            "idle_seconds": self.idle_seconds,
+            "evicted": self.evicted,
+            "presentations": presentations
+        }
@@ -1,4 +1,5 @@
 import asyncio
+import json
 import shutil
 
 import os
@@ -6,16 +7,109 @@ import dotenv
 from typing import List
 dotenv.load_dotenv(override=True)
 ROOT = os.path.abspath(os.path.dirname(__file__))
-
-from collections import deque
+import sys
+sys.path.append(os.path.dirname(ROOT))
 
 GITHUB_PERSONAL_ACCESS_TOKEN = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL")
 
-from agents import Agent, Runner, trace
+from agents import Agent, trace
 from agents.mcp import MCPServer, MCPServerStdio
 
-async def run(mcp_server: MCPServer, directory_path: str, project_name_list: List[str]):
+from conversation_memory import ConversationMemory, agent_summarizer
+from instrumentation import InstrumentedMCPServer, run_agent
+from mcp_cache import CachingMCPServer, ToolResultCache
+from mcp_pool import token_key
+from repo_inventory import load_inventory
+
+MCP_CACHE_DB = os.getenv("MCP_CACHE_DB", os.path.join(os.path.dirname(ROOT), ".cache", "mcp_cache.db"))
+
+PROJECT_FORMAT_PROMPT = """
+    ```
+    {
+        "project_name":"project_name",
+        "outline":"outline",  # 30자 이내, 프로젝트의 의미를 간단하게 정리
+        "detail_content_list":["What_the_user_did_in_the_project1", "What_the_user_did_in_the_project2", ...],  # 각 항목 20자 이내, 사용자가 한 활동을 어필할 수 있게 정리
+        "tech_section":{
+            "tech_domain1": ["tech1", "tech2", ...],
+            "Backend": ["Django"]  # example
+        },
+        "award_list":["award1", ...]  # 프로젝트로 받은 수상이 있다면 수상명 위주로 간단하게 정리
+    }
+    ```
+    answer:
+    """
+
+SUMMARY_FORMAT_PROMPT = """
+    ```
+    {
+        "slogan_main":"recommend slogan for user",  # 프로젝트를 기반으로 유저의 개발자 슬로건을 추천
+        "vision_slogan":"vision_slogan",  # 프로젝트를 기반으로 유저가 나아갈 비전을 제시
+        "vision_description":"vision_description"
+    }
+    ```
+    answer:
+    """
+
+
+def parse_json_output(text: str) -> dict:
+    """모델 출력에서 JSON 객체만 꺼낸다 (```json 코드 블록 허용)"""
+    body = text.strip()
+    if body.startswith("```"):
+        body = body.split("\n", 1)[1] if "\n" in body else ""
+        body = body.rsplit("```", 1)[0]
+    start, end = body.find("{"), body.rfind("}")
+    try:
+        return json.loads(body[start:end + 1])
+    except ValueError:
+        return {"raw": text}
+
+
+async def analyze_project(agent: Agent, base_prompt: str, project: str, semaphore: asyncio.Semaphore) -> dict:
+    """프로젝트 하나를 독립된 agent run으로 분석"""
+    prompt = base_prompt + f"""
+    {project} 프로젝트의 repository의 모든 내용을 분석하여 다음과 같은 형식으로 정리한다.
+    만약 알 수 없는 내용은 format 그대로 사용한다.
+    **format 내용만을 출력**
+    project format:
+    """ + PROJECT_FORMAT_PROMPT
+    # 공유 MCP 세션에 동시에 몰리는 호출 수를 제한
+    async with semaphore:
+        result = await run_agent(agent, prompt, workflow="portfolio_project")
+    project_result = parse_json_output(result.final_output)
+    project_result.setdefault("project_name", project)
+    print(f"[{project}] 분석 완료")
+    return project_result
+
+
+async def merge_portfolio(base_prompt: str, project_results: List[dict]) -> dict:
+    """프로젝트별 결과를 하나의 portfolio JSON으로 합친다. tool 없이 짧은 요약 한 번만 호출"""
+    merge_agent = Agent(
+        model=OPENAI_MODEL,
+        name="PortfolioMerger",
+        instructions="Summarize the analyzed projects into a developer portfolio headline.",
+    )
+    merge_prompt = base_prompt + f"""
+    분석된 프로젝트: {json.dumps(project_results, ensure_ascii=False)}
+    위 프로젝트들을 기반으로 다음 형식을 채운다.
+    **format 내용만을 출력**
+    portfolio format:
+    """ + SUMMARY_FORMAT_PROMPT
+    result = await run_agent(merge_agent, merge_prompt, workflow="portfolio_merge")
+    portfolio = parse_json_output(result.final_output)
+
+    award_list = []
+    for project_result in project_results:
+        for award in project_result.pop("award_list", None) or []:
+            if award not in award_list:
+                award_list.append(award)
+    portfolio["experience_list"] = [r.get("project_name") for r in project_results]
+    portfolio["award_list"] = award_list
+    portfolio["project_list"] = project_results
+    return portfolio
+
+
+async def run(mcp_server: MCPServer, directory_path: str, project_name_list: List[str], max_concurrency: int = 4):
     agent = Agent(
         model=OPENAI_MODEL,
         name="Assistant",
@@ -25,47 +119,32 @@ async def run(mcp_server: MCPServer, directory_path: str, project_name_list: Lis
     
     user_id = directory_path.split("/")[-1]
 
-    repositories = await Runner.run(starting_agent=agent, input=f"{directory_path}의 모든 repository를 ','로 구분해서 나열")
+    repositories = await load_inventory(mcp_server, user_id, identity=token_key(GITHUB_PERSONAL_ACCESS_TOKEN))
 
     PROMPT = f"""
-    You are a potfolio assistant. You are given {directory_path} (repositories: {repositories}).
+    You are a potfolio assistant. You are given {directory_path} (repositories: {", ".join(r["name"] for r in repositories)}).
     철저하게 {user_id} 관점에서 답변하라.
     NEVER answer questions about the directories that are not in the git repository.
     GET 호출을 할 때는 반드시 실제 있는 디렉토리를 사용해야 한다.
     답변은 절대 지어내지 말고, 항상 사실에 기반해야 한다.
-    {project_name_list} 프로젝트의 repository의 모든 내용을 분석하여 다음과 같은 형식으로 정리한다.
-    만약 알 수 없는 내용은 format 그대로 사용한다.
     지원자가 포트폴리오를 작성하는 말투로 작성
     commit을 기반으로 사용자가 실제로 기여한 부분만 포함할 것
-    **format 내용만을 출력**
-    portfolio format:
     """
 
-    FORMAT_PROMPT = """
-    ```
-    {
-        "slogan_main":"recommend slogan for user",  # 프로젝트를 기반으로 유저의 개발자 슬로건을 추천
-        "experience_list":["experience", "experience2", ...],  # 프로젝트의 이름 위주로 간단하게 정리
-        "award_list":["award1", "award2", ...],  # 수상명 위주로 간단하게 정리
-        "vision_slogan":"vision_slogan",  # 프로젝트를 기반으로 유저가 나아갈 비전을 제시
-        "vision_description":"vision_description",
-        "project_name":"project_name",
-        "outline":"outline",  # 30자 이내, 프로젝트의 의미를 간단하게 정리
-        "detail_content_list":["What_the_user_did_in_the_project1", "What_the_user_did_in_the_project2", ...],  # 각 항목 20자 이내, 사용자가 한 활동을 어필할 수 있게 정리
-        "tech_section":{
-            "tech_domain1": ["tech1", "tech2", ...],
-            "Backend": ["Django"]  # example
-        },
-    }
-    ```
-    answer:
-    """
+    # 프로젝트마다 별도의 agent run을 동시에 실행 (전체 시간 ~ 가장 큰 repository 하나의 분석 시간)
+    if isinstance(project_name_list, str):
+        project_name_list = [project_name_list]
+    semaphore = asyncio.Semaphore(max_concurrency)
+    project_results = await asyncio.gather(
+        *(analyze_project(agent, PROMPT, project, semaphore) for project in project_name_list)
+    )
 
-    PROMPT += FORMAT_PROMPT
-    result = await Runner.run(starting_agent=agent, input=PROMPT)
-    print("Portfolio:", result.final_output)
+    portfolio = await merge_portfolio(PROMPT, project_results)
+    portfolio_json = json.dumps(portfolio, ensure_ascii=False, indent=2)
+    print("Portfolio:", portfolio_json)
 
-    chat_history = deque([{"role": "assistant", "content": result.final_output}], maxlen=5)
+    memory = ConversationMemory(PROMPT, summarizer=agent_summarizer(OPENAI_MODEL), model=OPENAI_MODEL)
+    memory.add_assistant(portfolio_json)
 
     while True:
         # Ask the user for the git command
@@ -74,23 +153,15 @@ async def run(mcp_server: MCPServer, directory_path: str, project_name_list: Lis
         if command.lower() == "exit":
             break
         
-        END_PROMPT = f"""
-        history: {chat_history}
-        user: {command}"""
-
-        prompt = PROMPT + END_PROMPT
+        prompt = await memory.prompt(command)
         print(prompt)
 
         # Run the command and print the result
         print("\n" + "-" * 40)
         print(f"Running: {command}")
-        result = await Runner.run(starting_agent=agent, input=prompt)
+        result = await run_agent(agent, prompt, workflow="portfolio_chat")
         print(result.final_output)
-        current_chat = [
-            {"role": "user", "content": command},
-            {"role": "assistant", "content": result.final_output},
-        ]
-        chat_history.append(current_chat)
+        memory.add(command, result.final_output)
         print("\n" + "-" * 40)
 
 
@@ -115,8 +186,11 @@ async def main():
         }
     ) as server:
         print("Run server")
+        cached_server = CachingMCPServer.for_token(
+            server, GITHUB_PERSONAL_ACCESS_TOKEN, cache=ToolResultCache(db_path=MCP_CACHE_DB)
+        )
         with trace(workflow_name="MCP Git Example"):
-            await run(server, directory_path, "co2-emission-management")
+            await run(InstrumentedMCPServer(cached_server), directory_path, ["co2-emission-management"])
 
 
 if __name__ == "__main__":
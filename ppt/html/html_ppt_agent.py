@@ -6,7 +6,7 @@ import subprocess
 import dotenv
 dotenv.load_dotenv(override=True)
 
-from typing import List
+from typing import List, Optional
 from collections import deque
 from xml.etree import ElementTree as ET
 
@@ -14,23 +14,36 @@ GITHUB_PERSONAL_ACCESS_TOKEN = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL")
 print(OPENAI_MODEL)
 
-from agents import Agent, Runner, trace, WebSearchTool
-from agents.mcp import MCPServer, MCPServerStdio
+from agents import Agent, trace, WebSearchTool
+from agents.mcp import MCPServer
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from instrumentation import run_agent
+from file_tools import FileTools
+from slide_scheduler import run_slides
+from build_manifest import BuildManifest, content_section, glob_digest
 
 import json
 
 CUR_PATH = os.getcwd()
+# 동시에 생성할 슬라이드 수
+SLIDE_WORKERS = int(os.getenv("PPT_SLIDE_WORKERS", "4"))
+# 프롬프트를 바꾸면 올린다. 바뀌면 manifest의 이전 결과를 쓰지 않는다
+PROMPT_VERSION = "html-2"
+HTML_DIR = os.path.dirname(os.path.abspath(__file__))
 
 TEMPLATE_XML_PROJECT_PATH = "C:/Users/kwon/Desktop/repo/github_mcp/ppt/xml/xml_template/ppt/slides/slide7.xml"
 RESULT_XML_PROJECT_PATH = "C:/Users/kwon/Desktop/repo/github_mcp/ppt/xml//xml_result/ppt/slides/slide{slide_idx}.xml"
-async def run(mcp_servers: List[MCPServer], content: str):
+async def run(mcp_servers: Optional[List[MCPServer]], content: str, max_workers: int = SLIDE_WORKERS,
+              tools: Optional[list] = None):
     print("Running...")
     agent = Agent(
         model=OPENAI_MODEL,
         name="Assistant",
         instructions=f"Answer questions about json",
-        mcp_servers=mcp_servers,
-        # tools=[WebSearchTool()]
+        mcp_servers=mcp_servers or [],
+        tools=tools or [],
     )
 
     print("Agent initialized.")
@@ -47,14 +60,21 @@ async def run(mcp_servers: List[MCPServer], content: str):
     content: {content}
     project name:
     """
-    result = await Runner.run(starting_agent=agent, input=extract_prompt, max_turns=30)
-    projects = result.final_output.split(",")
-    print("추출한 프로젝트:", result.final_output)
-    # 내용 기반으로 슬라이드 개수만큼 반복
-    slide_prompt = f"""
+    # 입력/템플릿/프롬프트가 같은 단계는 이전 빌드 결과를 재사용한다
+    manifest = BuildManifest(os.path.join(CUR_PATH, 'build_manifest.json'))
+    extract_key = manifest.key(content, PROMPT_VERSION)
+    projects = manifest.lookup("extract", extract_key)
+    if projects is None:
+        result = await run_agent(agent, extract_prompt, workflow="html_ppt_extract", max_turns=30)
+        projects = [project.strip() for project in result.final_output.split(",") if project.strip()]
+        manifest.record("extract", extract_key, projects)
+    print("추출한 프로젝트:", ", ".join(projects))
+    template_key = glob_digest(os.path.join(HTML_DIR, "spire_result", "ToHTML*.html"))
+    # 경력 슬라이드(2)와 프로젝트 슬라이드(5~)는 서로 독립적이므로 동시에 생성
+    experience_prompt = f"""
         {content}
         위 내용을 기반으로 경험들을 정리합니다.
-        ToHTML로 시작하는 html 파일 중 내용과 적절한 html을 고릅니다.
+        spire_result의 ToHTML로 시작하는 html 파일 중 내용과 적절한 html을 고릅니다.
         이후 선택한 html에 내용을 적절한 위치에 삽입합니다. 구조는 절대 수정하지 않습니다.
           - 예를 들어 Experience 밑에 경력이 적혀 있는 곳을 발견한다면 여러 경험들을 채워 넣을 것입니다.
           - 프로젝트의 내용이 있는 부분을 발견하면 당신은 현재 프로젝트의 내용을 넣을 것입니다.
@@ -63,18 +83,15 @@ async def run(mcp_servers: List[MCPServer], content: str):
           
         기존에 html에 있는 내용은 오직 더미 데이터입니다.
         분석하여 적절한 위치를 찾는 것에는 사용할 수 있지만 절대 결과물에 원래 html 데이터가 들어가 있어서는 안됩니다.
-        html/result/slide2.html에 저장해주세요
+        result/slide2.html에 저장해주세요
         어떤 파일을 선택했는지 출력합니다.
         """
-    result = await Runner.run(starting_agent=agent, input=slide_prompt, max_turns=30)
-    print(f"Slide2:", result.final_output)
 
-    for i, project in enumerate(projects, start=5):
-        # 슬라이드 개수만큼 xml 생성
-        slide_prompt = f"""
+    def project_prompt(i: int, project: str) -> str:
+        return f"""
         {content}
         위 내용에서 {project}에 대한 내용을 추출합니다.
-        ToHTML로 시작하는 html 파일 중 내용과 적절한 html을 고릅니다.
+        spire_result의 ToHTML로 시작하는 html 파일 중 내용과 적절한 html을 고릅니다.
         이후 선택한 html에 내용을 적절한 위치에 삽입합니다. 구조는 절대 수정하지 않습니다.
           - 예를 들어 프로젝트의 내용이 있는 부분을 발견하면 당신은 현재 프로젝트의 내용을 넣을 것입니다.
           - 프로젝트의 사진이 있었던 자리에는 사진을 넣으라는 표시를 할 수 있을 것입니다.
@@ -82,35 +99,40 @@ async def run(mcp_servers: List[MCPServer], content: str):
 
         기존에 html에 있는 내용은 오직 더미 데이터입니다.
         분석하여 적절한 위치를 찾는 것에는 사용할 수 있지만 절대 결과물에 원래 html 데이터가 들어가 있어서는 안됩니다.
-        html/result/slide{i}.html에 저장해주세요
+        result/slide{i}.html에 저장해주세요
         어떤 파일을 선택했는지 출력합니다.
         """
-        result = await Runner.run(starting_agent=agent, input=slide_prompt, max_turns=30)
-        print(f"Slide{i}:", result.final_output)
-        # save_dir = os.path.join(CUR_PATH, 'xml_template')
-
-        # new_ppt_name = os.path.join(CUR_PATH, 'new.pptx')
-        # subprocess.call(f'opc repackage {save_dir} {new_ppt_name}')
-
-        # print(new_ppt_name, "에 저장됨")
-
-
 
-async def init_servers():
-    # Initialize the MCP server with the specified parameters
-    # print("Initializing PPT servers...")
-
-    print("Initializing File System servers...")
-
-    server = MCPServerStdio(
-        name="Filesystem Server, via npx",
-        params={
-            "command": "npx",
-            "args": ["-y", "@modelcontextprotocol/server-filesystem", "C:/Users/SSAFY/Desktop/repo/github_mcp/ppt/html"],
-        }
-    )
-
-    return server
+    # 경력 슬라이드는 content 전체, 프로젝트 슬라이드는 해당 프로젝트 부분만 입력으로 본다
+    slide_keys = {2: manifest.key(content, template_key, PROMPT_VERSION)}
+    for i, project in enumerate(projects, start=5):
+        slide_keys[i] = manifest.key(content_section(content, project), project, template_key, PROMPT_VERSION)
+
+    async def generate_slide(i: int, slide_prompt: str) -> str:
+        output = os.path.join(HTML_DIR, "result", f"slide{i}.html")
+        if manifest.lookup(f"slide{i}", slide_keys[i], output_path=output):
+            return f"변경 없음, {output} 재사용"
+        result = await run_agent(agent, slide_prompt, workflow="html_ppt_slide", max_turns=30)
+        manifest.record(f"slide{i}", slide_keys[i])
+        return result.final_output
+
+    jobs = [(2, experience_prompt)] + [(i, project_prompt(i, project)) for i, project in enumerate(projects, start=5)]
+    slides = await run_slides(jobs, generate_slide, max_workers=max_workers)
+    manifest.prune(["extract"] + [f"slide{i}" for i, _ in jobs])
+    print(manifest.summary())
+    for slide in slides:
+        if slide.ok:
+            print(f"Slide{slide.index}:", slide.value)
+        else:
+            print(f"Slide{slide.index} 생성 실패 ({slide.attempts}회 시도): {slide.error}")
+
+
+
+def init_tools(base: str = HTML_DIR) -> FileTools:
+    """템플릿(spire_result)은 읽기만, result에는 쓰기도 허용 (filesystem MCP 서버 대신 프로세스 안에서 처리)"""
+    template_dir = os.path.join(base, "spire_result")
+    result_dir = os.path.join(base, "result")
+    return FileTools(roots=[template_dir, result_dir], writable=[result_dir], base=base)
 
 content = """
   ## 👀 About Me
@@ -203,22 +225,10 @@ content = """
 
 
 async def main():
-    print("PPT servers initialized.")
-    async with MCPServerStdio(
-        name="Filesystem Server, via npx",
-        params={
-            "command": "npx",
-            "args": [
-                "-y",
-                "@modelcontextprotocol/server-filesystem",
-                "C:/Users/kwon/Desktop/repo/github_mcp/ppt/html"
-                ]
-        }
-    ) as s:
-        mcp_servers = [s]
-        with trace(workflow_name="MCP PPT XML Example"):
-            print('t')
-            await run(mcp_servers=mcp_servers, content=content)
+    files = init_tools()
+    with trace(workflow_name="MCP PPT XML Example"):
+        await run(mcp_servers=[], content=content, tools=files.tools())
+    print("파일 도구:", files.stats)
 
 if __name__ == "__main__":
     # if not shutil.which("uv"):
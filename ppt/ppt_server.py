@@ -4,18 +4,22 @@ import shutil
 import os
 import dotenv
 dotenv.load_dotenv(override=True)
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from typing import List
-from collections import deque
 
 GITHUB_PERSONAL_ACCESS_TOKEN = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL")
 
 print(OPENAI_MODEL)
 
-from agents import Agent, Runner, trace, WebSearchTool
+from agents import Agent, trace, WebSearchTool
 from agents.mcp import MCPServer, MCPServerStdio
 
+from conversation_memory import ConversationMemory, agent_summarizer
+from instrumentation import InstrumentedMCPServer, run_agent
+
 import json
 
 with open(r"C:\Users\SSAFY\Desktop\repo\github_mcp\ppt\pptx-compose\example.json", "r", encoding='utf-8') as f:
@@ -41,7 +45,7 @@ async def run(mcp_servers: List[MCPServer]):
     사용자가 원하는 pptx의 주제에 맞는 json을 생성해 주세요.
     """
 
-    chat_history = deque([], maxlen=2)
+    memory = ConversationMemory(PROMPT, summarizer=agent_summarizer(OPENAI_MODEL), model=OPENAI_MODEL)
 
     while True:
         # Ask the user for the git command
@@ -49,23 +53,15 @@ async def run(mcp_servers: List[MCPServer]):
         if command.lower() == "exit":
             break
         
-        END_PROMPT = f"""
-        history: {chat_history}
-        user: {command}"""
-        # prompt = PROMPT.format(chat_history=chat_history) + END_PROMPT + sample
-        prompt = PROMPT + END_PROMPT
+        prompt = await memory.prompt(command)
         print(prompt)
 
         # Run the command and print the result
         print("\n" + "-" * 40)
         print(f"Running: {command}")
-        result = await Runner.run(starting_agent=agent, input=prompt, max_turns=30)
+        result = await run_agent(agent, prompt, workflow="ppt_server", max_turns=30)
         print(result.final_output)
-        current_chat = [
-            {"role": "user", "content": command},
-            {"role": "assistant", "content": result.final_output},
-        ]
-        chat_history.append(current_chat)
+        memory.add(command, result.final_output)
         print("\n" + "-" * 40)
 
 
@@ -126,7 +122,7 @@ async def main():
     print("PPT servers initialized.")
     async with server2 as s2:
         # Create the MCP server and start it
-        mcp_servers = [s2]
+        mcp_servers = [InstrumentedMCPServer(s2)]
         with trace(workflow_name="MCP PPT Example"):
             await run(mcp_servers=mcp_servers)
 
@@ -0,0 +1,155 @@
+"""
+여러 프로필의 덱을 한 번에 만드는 배치 CLI.
+
+xml_ppt_agent.main()은 content 하나와 고정 경로로 덱 하나만 만든다.
+여기서는 프로필 JSONL을 읽어서
+
+- 템플릿 인덱스(template_index, 템플릿 디렉토리마다 따로 저장)와 미디어 해시 캐시는 한 번만 읽어 모든 작업이 공유하고
+- 최대 --jobs개의 덱을 asyncio로 동시에 만든다 (덱 안에서는 --slide-workers개 슬라이드 동시 생성)
+- 프로필마다 <out-dir>/<id>.pptx와 증분 빌드 manifest(<id>.manifest.json)를 쓰고
+- 작업별 시간/결과를 report JSONL에 완료 순서대로 기록한다.
+
+LLM/MCP 호출을 기다리는 I/O 작업이라 프로세스 풀 대신 이벤트 루프 하나로 돌린다.
+
+프로필 JSONL (한 줄에 하나):
+    {"id": "qja1998", "content": "## About Me ..."}
+    {"id": "someone", "content_path": "profiles/someone.md"}
+
+실행:
+    python batch_decks.py profiles.jsonl --out-dir decks --jobs 4 --slide-workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from agents import trace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import xml_ppt_agent
+from instrumentation import metrics
+from media_store import MediaHashCache
+from slide_scheduler import SlideResult, run_slides
+from template_index import index_path_for, load_or_build_index
+
+CUR_PATH = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_profiles(path: str) -> List[Dict[str, Any]]:
+    base = os.path.dirname(os.path.abspath(path))
+    profiles = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            profile = json.loads(line)
+            if "content" not in profile:
+                with open(os.path.join(base, profile["content_path"]), encoding="utf-8") as content_file:
+                    profile["content"] = content_file.read()
+            profile_id = str(profile.get("id") or f"profile{line_no}")
+            profile["id"] = re.sub(r"[^\w.-]", "_", profile_id)
+            profiles.append(profile)
+    return profiles
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+async def run_batch(profiles: List[Dict[str, Any]], out_dir: str, jobs: int = 4,
+                    slide_workers: int = xml_ppt_agent.SLIDE_WORKERS, template_dir: Optional[str] = None,
+                    report_path: Optional[str] = None, template_pptx: Optional[str] = None) -> List[Dict[str, Any]]:
+    os.makedirs(out_dir, exist_ok=True)
+    template_dir = template_dir or os.path.join(CUR_PATH, "xml_template")
+    # 모든 작업이 같은 템플릿을 쓰므로 인덱스/해시 캐시는 한 번만 읽는다
+    catalog = load_or_build_index(template_dir, index_path_for(template_dir))
+    media_cache = MediaHashCache(os.path.join(CUR_PATH, "media_hashes.json"))
+    report_path = report_path or os.path.join(out_dir, "batch_report.jsonl")
+    report = open(report_path, "a", encoding="utf-8")
+
+    async def build(_: int, profile: Dict[str, Any]) -> Dict[str, Any]:
+        record = {"id": profile["id"], "output": None, "seconds": 0.0, "error": None}
+        start = time.perf_counter()
+        try:
+            result = await xml_ppt_agent.run(
+                [], profile["content"], max_workers=slide_workers,
+                output=os.path.join(out_dir, f"{profile['id']}.pptx"),
+                manifest_path=os.path.join(out_dir, f"{profile['id']}.manifest.json"),
+                catalog=catalog, template_dir=template_dir, media_cache=media_cache,
+                template_pptx=template_pptx,
+            )
+            record.update(result)
+        except Exception as e:
+            record["error"] = repr(e)
+        record["seconds"] = round(time.perf_counter() - start, 3)
+        status = "error" if record["error"] else ("partial" if record.get("failed") else "ok")
+        record["status"] = status
+        metrics.observe("batch_deck_seconds", record["seconds"], status=status)
+        return record
+
+    def on_done(job: SlideResult):
+        record = job.value
+        report.write(json.dumps(record, ensure_ascii=False) + "\n")
+        report.flush()
+        print(f"[{record['status']}] {record['id']} {record['seconds']:.1f}s "
+              f"{record['output'] or record['error']}")
+
+    started = time.perf_counter()
+    try:
+        with trace(workflow_name="PPT XML batch"):
+            # build가 예외를 기록으로 바꾸므로 재시도는 덱 안의 슬라이드 단위로만 한다
+            jobs_done = await run_slides(list(enumerate(profiles)), build, max_workers=jobs, retries=0,
+                                         on_done=on_done)
+    finally:
+        report.close()
+
+    records = [job.value for job in jobs_done]
+    print_summary(records, time.perf_counter() - started)
+    return records
+
+
+def print_summary(records: List[Dict[str, Any]], wall_seconds: float):
+    seconds = [r["seconds"] for r in records if not r["error"]]
+    by_status: Dict[str, int] = {}
+    for r in records:
+        by_status[r["status"]] = by_status.get(r["status"], 0) + 1
+    print(f"\n{len(records)}개 덱, 전체 {wall_seconds:.1f}s | "
+          + ", ".join(f"{status} {count}" for status, count in sorted(by_status.items())))
+    if seconds:
+        print(f"덱당 p50 {_percentile(seconds, 0.5):.1f}s, p95 {_percentile(seconds, 0.95):.1f}s, "
+              f"최대 {max(seconds):.1f}s")
+    for r in records:
+        if r["error"] or r.get("failed"):
+            print(f"  실패 {r['id']}: {r['error'] or '슬라이드 ' + ', '.join(map(str, r['failed']))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="프로필 JSONL로 덱을 일괄 생성")
+    parser.add_argument("profiles", help="프로필 JSONL ({id, content | content_path})")
+    parser.add_argument("--out-dir", default=os.path.join(CUR_PATH, "decks"))
+    parser.add_argument("--jobs", type=int, default=4, help="동시에 만들 덱 수")
+    parser.add_argument("--slide-workers", type=int, default=xml_ppt_agent.SLIDE_WORKERS,
+                        help="덱 하나에서 동시에 생성할 슬라이드 수")
+    parser.add_argument("--template-dir", default=None)
+    parser.add_argument("--template-pptx", default=None,
+                        help="template-dir을 푼 원본 pptx (기본: PPT_TEMPLATE_PPTX 또는 template.pptx)")
+    parser.add_argument("--report", default=None, help="작업별 결과 JSONL (기본: <out-dir>/batch_report.jsonl)")
+    args = parser.parse_args(argv)
+
+    profiles = load_profiles(args.profiles)
+    records = asyncio.run(run_batch(profiles, args.out_dir, jobs=args.jobs, slide_workers=args.slide_workers,
+                                    template_dir=args.template_dir, template_pptx=args.template_pptx,
+                                    report_path=args.report))
+    return 1 if any(r["error"] for r in records) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
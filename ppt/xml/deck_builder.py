@@ -0,0 +1,161 @@
+"""
+슬라이드별 결과를 모았다가 덱을 한 번만 패키징하는 빌더.
+
+기존 xml_ppt_agent는 슬라이드를 하나 만들 때마다 템플릿 디렉토리 전체를
+다시 pptx로 묶었다 (슬라이드 수만큼 repackage).
+DeckBuilder는 생성된 슬라이드 XML을 staging 디렉토리(또는 메모리)에 모아 두고
+build()에서 템플릿 위에 덮어써서 한 번만 저장한다.
+checkpoint_every를 주면 N장마다 중간 저장해서 중간에 실패해도 그때까지의 결과가 남는다.
+템플릿 패키지는 한 번만 읽고 재사용하므로 checkpoint 저장도 바뀐 슬라이드만 압축한다.
+
+사용 예:
+    builder = DeckBuilder("xml_template", "new.pptx", staging_dir="xml_result", checkpoint_every=5)
+    for i, project in enumerate(projects, start=5):
+        ...  # agent가 xml_result/ppt/slides/slide{i}.xml에 저장
+        builder.add_slide(i)
+    builder.build()
+"""
+import os
+import re
+from typing import Dict, Optional
+
+from media_store import MediaHashCache, dedupe_media
+from opc_package import CONTENT_TYPES, OpcPackage
+
+PRESENTATION = "ppt/presentation.xml"
+PRESENTATION_RELS = "ppt/_rels/presentation.xml.rels"
+SLIDE_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+SLIDE_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+_SLIDE_IDX_RE = re.compile(r"slide(\d+)\.xml$")
+
+
+def slide_partname(slide_idx: int) -> str:
+    return f"ppt/slides/slide{slide_idx}.xml"
+
+
+def slide_rels_partname(slide_idx: int) -> str:
+    return f"ppt/slides/_rels/slide{slide_idx}.xml.rels"
+
+
+def _slide_index(partname: str) -> int:
+    return int(_SLIDE_IDX_RE.search(partname).group(1))
+
+
+def register_slide(pkg: OpcPackage, slide_idx: int):
+    """
+    템플릿에 없는 슬라이드 part를 presentation에 연결한다.
+    presentation.xml.rels에 관계를, sldIdLst 끝에 sldId를, [Content_Types].xml에 Override를 추가한다.
+    """
+    rels = pkg.read(PRESENTATION_RELS)
+    rel_num = max((int(n) for n in re.findall(rb'Id="rId(\d+)"', rels)), default=0) + 1
+    rel_id = f"rId{rel_num}"
+    relationship = f'<Relationship Id="{rel_id}" Type="{SLIDE_REL_TYPE}" Target="slides/slide{slide_idx}.xml"/>'
+    pkg.write(PRESENTATION_RELS, rels.replace(b"</Relationships>", relationship.encode("utf-8") + b"</Relationships>"))
+
+    presentation = pkg.read(PRESENTATION)
+    # sldId의 id는 256 이상이어야 한다
+    sld_id = max((int(n) for n in re.findall(rb'<p:sldId\b[^>]*?\sid="(\d+)"', presentation)), default=255) + 1
+    entry = f'<p:sldId id="{sld_id}" r:id="{rel_id}"/>'.encode("utf-8")
+    if b"</p:sldIdLst>" in presentation:
+        presentation = presentation.replace(b"</p:sldIdLst>", entry + b"</p:sldIdLst>")
+    elif b"<p:sldIdLst/>" in presentation:
+        presentation = presentation.replace(b"<p:sldIdLst/>", b"<p:sldIdLst>" + entry + b"</p:sldIdLst>")
+    else:
+        # 슬라이드가 없는 템플릿: sldIdLst는 sldMasterIdLst/notesMasterIdLst/handoutMasterIdLst 다음에 온다
+        anchor = max(presentation.find(tag) + len(tag) for tag in
+                     (b"</p:sldMasterIdLst>", b"</p:notesMasterIdLst>", b"</p:handoutMasterIdLst>")
+                     if tag in presentation)
+        presentation = presentation[:anchor] + b"<p:sldIdLst>" + entry + b"</p:sldIdLst>" + presentation[anchor:]
+    pkg.write(PRESENTATION, presentation)
+
+    content_types = pkg.read(CONTENT_TYPES)
+    partname = slide_partname(slide_idx)
+    if f'PartName="/{partname}"'.encode("utf-8") not in content_types:
+        override = f'<Override PartName="/{partname}" ContentType="{SLIDE_CONTENT_TYPE}"/>'
+        pkg.write(CONTENT_TYPES, content_types.replace(b"</Types>", override.encode("utf-8") + b"</Types>"))
+
+
+class DeckBuilder:
+    """
+    Args:
+        template_dir: 풀어 둔 템플릿 패키지 디렉토리
+        output: 저장할 pptx 경로
+        staging_dir: 슬라이드 XML이 저장되는 디렉토리 (패키지와 같은 구조, 예: xml_result)
+        checkpoint_every: N장마다 중간 저장 (0이면 build()에서 한 번만 저장)
+        base: 템플릿 원본 pptx. 주면 바뀌지 않은 part의 압축 바이트를 그대로 복사한다
+        media_cache: 미디어 해시 캐시. 저장할 때마다 내용이 같은 ppt/media part를 하나로 합친다
+    """
+
+    def __init__(self, template_dir: str, output: str, staging_dir: Optional[str] = None,
+                 checkpoint_every: int = 0, base: Optional[str] = None,
+                 media_cache: Optional[MediaHashCache] = None):
+        if base and os.path.abspath(base) == os.path.abspath(output):
+            # 저장할 때 output을 교체하므로 다음 checkpoint에서 base의 압축 바이트를 읽을 수 없다
+            raise ValueError("base must be a different file from output")
+        self.template_dir = template_dir
+        self.output = output
+        self.staging_dir = staging_dir
+        self.checkpoint_every = checkpoint_every
+        self.base = base
+        self.media_cache = media_cache or MediaHashCache()
+        self.media_aliases: Dict[str, str] = {}  # 지운 중복 미디어 -> 남긴 part
+        self.saves = 0
+        self._slides: Dict[str, Optional[bytes]] = {}  # partname -> XML (None이면 staging 파일에서 읽음)
+        self._rels: Dict[str, bytes] = {}  # 다른 템플릿 슬라이드를 복제한 경우 그 슬라이드의 .rels
+        self._pending = 0
+        self._package: Optional[OpcPackage] = None
+
+    def add_slide(self, slide_idx: int, xml: Optional[bytes] = None, rels: Optional[bytes] = None):
+        """
+        생성된 슬라이드를 등록한다. xml을 주지 않으면 build 시점에 staging_dir에서 읽는다.
+        rels를 주면 슬라이드의 관계 part도 교체한다 (다른 템플릿 슬라이드를 채워서 넣을 때).
+        checkpoint_every장이 쌓이면 중간 저장한다.
+        """
+        if xml is None and self.staging_dir is None:
+            raise ValueError("xml or staging_dir is required")
+        if isinstance(xml, str):
+            xml = xml.encode("utf-8")
+        self._slides[slide_partname(slide_idx)] = xml
+        if rels is not None:
+            self._rels[slide_rels_partname(slide_idx)] = rels
+        self._pending += 1
+        if self.checkpoint_every and self._pending >= self.checkpoint_every:
+            self.save()
+            print(f"checkpoint: {len(self._slides)}장 저장됨 -> {self.output}")
+
+    def _staged_xml(self, partname: str) -> Optional[bytes]:
+        path = os.path.join(self.staging_dir, *partname.split("/"))
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def save(self) -> str:
+        if self._package is None:
+            # 템플릿은 한 번만 읽는다. 이후 저장은 덮어쓴 슬라이드만 새로 압축된다
+            self._package = OpcPackage.from_dir(self.template_dir, base=self.base)
+        for partname, rels in self._rels.items():
+            self._package.write(partname, rels)
+        # 템플릿 슬라이드 수를 넘는 슬라이드는 번호 순서대로 sldIdLst 끝에 붙인다
+        for partname, xml in sorted(self._slides.items(), key=lambda item: _slide_index(item[0])):
+            if xml is None:
+                xml = self._staged_xml(partname)
+            if xml is None:
+                print(f"경고: {partname} 결과 파일이 없어 템플릿 슬라이드를 유지합니다")
+                continue
+            if partname not in self._package:
+                slide_idx = _slide_index(partname)
+                if slide_rels_partname(slide_idx) not in self._package:
+                    raise ValueError(f"{partname} is not in the template and has no .rels (slide layout)")
+                register_slide(self._package, slide_idx)
+            self._package.write(partname, xml)
+        self.media_aliases = dedupe_media(self._package, self.media_cache, self.media_aliases)
+        self._package.save(self.output)
+        self.media_cache.save()
+        self._pending = 0
+        self.saves += 1
+        return self.output
+
+    def build(self) -> str:
+        """모든 슬라이드를 반영해서 최종 저장"""
+        return self.save()
@@ -0,0 +1,151 @@
+"""
+패키지 안의 중복 미디어(ppt/media/*)를 내용 해시 기준으로 하나로 합친다.
+
+템플릿 슬라이드를 복제해서 덱을 만들면 같은 그림이 image3.png, image7.png처럼
+이름만 다른 part로 여러 번 들어간다. 여기서는
+
+- CRC/크기가 같은 후보끼리만 sha256을 계산해서 (후보가 없으면 아무것도 읽지 않는다)
+- 같은 내용이면 이름순으로 첫 part 하나만 남기고
+- 모든 .rels의 Target을 남은 part로 바꾼 뒤 중복 part와 Content_Types Override를 지운다.
+
+원본 pptx나 풀어 둔 템플릿 디렉토리에서 온 part의 해시는 (파일, 수정 시각, part 이름) 기준으로
+JSON에 저장해서 같은 템플릿으로 다시 빌드할 때는 내용을 다시 읽지 않는다.
+
+사용 예:
+    cache = MediaHashCache("media_hashes.json")
+    aliases = dedupe_media(pkg, cache)  # {"ppt/media/image7.png": "ppt/media/image3.png"}
+    pkg.save("new.pptx")
+    cache.save()
+"""
+import hashlib
+import json
+import os
+import posixpath
+import re
+from collections import defaultdict
+from typing import Dict, Optional
+
+from opc_package import CONTENT_TYPES, OpcPackage
+
+MEDIA_PREFIX = "ppt/media/"
+_TARGET_RE = re.compile(rb'Target="([^"]+)"')
+_OVERRIDE_RE = r'<Override [^>]*PartName="/{}"[^>]*/>'
+
+
+class MediaHashCache:
+    """원본 zip part -> sha256. path가 없으면 메모리에만 둔다"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._hashes: Dict[str, str] = {}
+        self._dirty = False
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._hashes = json.load(f)
+
+    @staticmethod
+    def _key(pkg: OpcPackage, name: str) -> Optional[str]:
+        source = pkg.info(name)[2]
+        if source is None:
+            return None  # 메모리에서 쓴 part는 빌드마다 내용이 달라질 수 있으므로 저장하지 않는다
+        return f"{os.path.abspath(source)}|{os.stat(source).st_mtime_ns}|{name}"
+
+    def digest(self, pkg: OpcPackage, name: str) -> str:
+        key = self._key(pkg, name)
+        if key is not None and key in self._hashes:
+            self.hits += 1
+            return self._hashes[key]
+        self.misses += 1
+        digest = hashlib.sha256(pkg.read(name)).hexdigest()
+        if key is not None:
+            self._hashes[key] = digest
+            self._dirty = True
+        return digest
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._hashes, f)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def find_duplicates(pkg: OpcPackage, cache: Optional[MediaHashCache] = None) -> Dict[str, str]:
+    """중복 미디어 part 이름 -> 남길 part 이름"""
+    cache = cache or MediaHashCache()
+    candidates = defaultdict(list)
+    for name in pkg:
+        if name.startswith(MEDIA_PREFIX):
+            crc, size, _ = pkg.info(name)
+            candidates[(crc, size)].append(name)
+
+    aliases = {}
+    for names in candidates.values():
+        if len(names) < 2:
+            continue
+        by_digest = defaultdict(list)
+        for name in sorted(names):
+            by_digest[cache.digest(pkg, name)].append(name)
+        for keep, *duplicates in by_digest.values():
+            for name in duplicates:
+                aliases[name] = keep
+    return aliases
+
+
+def rewrite_relationships(pkg: OpcPackage, aliases: Dict[str, str]) -> int:
+    """모든 .rels에서 aliases의 part를 가리키는 Target을 바꾼다. 바꾼 .rels 수를 돌려준다"""
+    if not aliases:
+        return 0
+    changed = 0
+    for name in pkg.partnames():
+        if not name.endswith(".rels"):
+            continue
+        data = pkg.read(name)
+        if b"media/" not in data:
+            continue
+        # ppt/slides/_rels/slide1.xml.rels의 상대 경로 기준은 ppt/slides/
+        base = posixpath.dirname(posixpath.dirname(name))
+
+        def retarget(match):
+            target = match.group(1).decode("utf-8")
+            if "://" in target:
+                return match.group(0)  # TargetMode="External"
+            resolved = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(base, target))
+            keep = aliases.get(resolved)
+            if keep is None:
+                return match.group(0)
+            new = "/" + keep if target.startswith("/") else posixpath.relpath(keep, base or ".")
+            return b'Target="' + new.encode("utf-8") + b'"'
+
+        new_data = _TARGET_RE.sub(retarget, data)
+        if new_data != data:
+            pkg.write(name, new_data)
+            changed += 1
+    return changed
+
+
+def dedupe_media(pkg: OpcPackage, cache: Optional[MediaHashCache] = None,
+                 aliases: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    중복 미디어를 합친다. aliases에 이전 호출 결과를 넘기면 그 사이에 새로 쓴 .rels
+    (예: 템플릿 슬라이드에서 복사한 .rels)도 이미 지운 part 대신 남은 part를 가리키게 한다.
+    """
+    aliases = dict(aliases or {})
+    aliases.update(find_duplicates(pkg, cache))
+    if not aliases:
+        return aliases
+    rewrite_relationships(pkg, aliases)
+    content_types = pkg.read(CONTENT_TYPES).decode("utf-8") if CONTENT_TYPES in pkg else None
+    for name in aliases:
+        if name in pkg:
+            pkg.delete(name)
+            if content_types is not None:
+                content_types = re.sub(_OVERRIDE_RE.format(re.escape(name)), "", content_types)
+    if content_types is not None:
+        pkg.write(CONTENT_TYPES, content_types.encode("utf-8"))
+    return aliases
@@ -0,0 +1,310 @@
+"""
+프로세스 안에서 동작하는 OPC(pptx) 패키지 reader/writer.
+
+`opc extract` / `opc repackage` CLI는 호출마다 인터프리터를 새로 띄우고
+모든 part를 압축 해제/재압축한다. 슬라이드 하나만 바뀌어도 덱 전체 비용을 낸다.
+이 모듈은 zipfile 위에서
+
+- 바뀌지 않은 part는 원본 zip의 압축된 바이트를 그대로 복사하고 (재압축 없음)
+- 새로 쓰거나 내용이 바뀐 part만 deflate 한다.
+
+디렉토리로 풀어 둔 패키지를 다시 묶을 때는 같은 이름의 기존 pptx(또는 base)를
+기준으로 CRC/크기를 비교해서 바뀐 파일만 압축한다.
+
+사용 예:
+    pkg = OpcPackage.open("template.pptx")
+    xml = pkg.read("ppt/slides/slide5.xml")
+    pkg.write("ppt/slides/slide5.xml", new_xml)
+    pkg.save("new.pptx")
+
+    ppt_to_xml("template.pptx", "xml_template")
+    xml_to_ppt("xml_template", "new.pptx")  # new.pptx가 있으면 바뀐 part만 압축
+"""
+import os
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+CONTENT_TYPES = "[Content_Types].xml"
+
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<4sHHHHHHIIIHHHHHII")
+_END_OF_CENTRAL_DIR = struct.Struct("<4sHHHHIIH")
+_ZIP32_LIMIT = 0xFFFFFFFF
+_UTF8_FLAG = 0x800
+_DATA_DESCRIPTOR_FLAG = 0x08
+
+
+def _dos_datetime(date_time) -> Tuple[int, int]:
+    year, month, day, hour, minute, second = date_time[:6]
+    year = max(year, 1980)
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+class _Part:
+    """
+    패키지의 part 하나.
+    raw(압축된 바이트)와 data(원본 바이트) 중 하나 이상을 가진다.
+    원본 zip에서 온 part는 처음에 raw 위치만 기억하고 필요할 때 읽는다.
+    """
+
+    __slots__ = ("name", "data", "crc", "size", "compress_type", "date_time",
+                 "path", "_source", "_zinfo", "_raw")
+
+    def __init__(self, name: str, data: Optional[bytes] = None, crc: int = 0, size: int = 0,
+                 compress_type: int = zipfile.ZIP_DEFLATED, date_time=None):
+        self.name = name
+        self.data = data
+        self.crc = crc
+        self.size = size
+        self.compress_type = compress_type
+        self.date_time = date_time or time.localtime()[:6]
+        self.path: Optional[str] = None  # 디렉토리에서 읽은 part의 파일 경로
+        self._source: Optional[str] = None
+        self._zinfo: Optional[zipfile.ZipInfo] = None
+        self._raw: Optional[bytes] = None
+
+    @classmethod
+    def from_zip(cls, source: str, zinfo: zipfile.ZipInfo) -> "_Part":
+        part = cls(zinfo.filename, crc=zinfo.CRC, size=zinfo.file_size,
+                   compress_type=zinfo.compress_type, date_time=zinfo.date_time)
+        part._source = source
+        part._zinfo = zinfo
+        return part
+
+    @classmethod
+    def from_bytes(cls, name: str, data: bytes) -> "_Part":
+        return cls(name, data=data, crc=zlib.crc32(data), size=len(data))
+
+    @property
+    def modified(self) -> bool:
+        return self._zinfo is None
+
+    def read(self, zf: Optional[zipfile.ZipFile] = None) -> bytes:
+        if self.data is None:
+            if zf is not None:
+                self.data = zf.read(self._zinfo)
+            else:
+                with zipfile.ZipFile(self._source) as own:
+                    self.data = own.read(self._zinfo)
+        return self.data
+
+    def raw(self, fp=None) -> bytes:
+        """압축된 바이트. 원본 zip의 part는 local header를 건너뛰어 그대로 읽는다."""
+        if self._raw is not None:
+            return self._raw
+        if self._zinfo is not None:
+            zinfo = self._zinfo
+            if zinfo.flag_bits & 0x1:
+                raise ValueError(f"encrypted part is not supported: {self.name}")
+            own = fp is None
+            f = open(self._source, "rb") if own else fp
+            try:
+                f.seek(zinfo.header_offset)
+                header = f.read(_LOCAL_HEADER.size)
+                name_len, extra_len = _LOCAL_HEADER.unpack(header)[-2:]
+                f.seek(zinfo.header_offset + _LOCAL_HEADER.size + name_len + extra_len)
+                return f.read(zinfo.compress_size)
+            finally:
+                if own:
+                    f.close()
+        data = self.read()
+        if self.compress_type == zipfile.ZIP_STORED:
+            self._raw = data
+        else:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+            self._raw = compressor.compress(data) + compressor.flush()
+        return self._raw
+
+
+class OpcPackage:
+    """part 이름 -> 내용. 원본 순서를 유지하고 새 part는 뒤에 붙는다."""
+
+    def __init__(self):
+        self._parts: "OrderedDict[str, _Part]" = OrderedDict()
+
+    # --- 열기 ---
+
+    @classmethod
+    def open(cls, path: str) -> "OpcPackage":
+        pkg = cls()
+        with zipfile.ZipFile(path) as zf:
+            for zinfo in zf.infolist():
+                if not zinfo.is_dir():
+                    pkg._parts[zinfo.filename] = _Part.from_zip(path, zinfo)
+        return pkg
+
+    @classmethod
+    def from_dir(cls, xml_dir: str, base: Optional[str] = None) -> "OpcPackage":
+        """
+        풀어 둔 디렉토리로 패키지를 만든다.
+        base(pptx)의 part와 CRC/크기가 같은 파일은 base의 압축 바이트를 재사용한다.
+        """
+        base_pkg = cls.open(base) if base and os.path.exists(base) else cls()
+        pkg = cls()
+        found: Dict[str, bytes] = {}
+        for root, _, files in os.walk(xml_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, xml_dir).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    found[name] = f.read()
+
+        # base 순서 -> 새 part(이름순). [Content_Types].xml은 항상 맨 앞
+        order = [n for n in base_pkg._parts if n in found] + sorted(n for n in found if n not in base_pkg._parts)
+        if CONTENT_TYPES in order:
+            order.remove(CONTENT_TYPES)
+            order.insert(0, CONTENT_TYPES)
+        for name in order:
+            data = found[name]
+            old = base_pkg._parts.get(name)
+            if old is not None and old.size == len(data) and old.crc == zlib.crc32(data):
+                pkg._parts[name] = old
+            else:
+                part = pkg._parts[name] = _Part.from_bytes(name, data)
+                part.path = os.path.join(xml_dir, *name.split("/"))
+        return pkg
+
+    # --- part 접근 ---
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._parts
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._parts)
+
+    def partnames(self) -> List[str]:
+        return list(self._parts)
+
+    def read(self, name: str) -> bytes:
+        return self._parts[name].read()
+
+    def info(self, name: str) -> Tuple[int, int, Optional[str]]:
+        """(CRC, 크기, 원본 경로). 원본 경로는 원본 zip이나 디렉토리의 파일이고, 메모리에서 쓴 part는 None"""
+        part = self._parts[name]
+        return part.crc, part.size, part._source or part.path
+
+    def write(self, name: str, data: bytes):
+        """part를 추가하거나 교체한다. 내용이 같으면 원본 압축 바이트를 그대로 유지한다."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        old = self._parts.get(name)
+        if old is not None and old.size == len(data) and old.crc == zlib.crc32(data):
+            return
+        self._parts[name] = _Part.from_bytes(name, data)
+
+    def delete(self, name: str):
+        self._parts.pop(name, None)
+
+    def modified_parts(self) -> List[str]:
+        return [name for name, part in self._parts.items() if part.modified]
+
+    # --- 저장 ---
+
+    def extract(self, xml_dir: str) -> int:
+        """모든 part를 디렉토리에 푼다. 이미 같은 내용의 파일은 다시 쓰지 않는다. 쓴 파일 수를 돌려준다."""
+        written = 0
+        archives: Dict[str, zipfile.ZipFile] = {}
+        try:
+            for name, part in self._parts.items():
+                path = os.path.join(xml_dir, *name.split("/"))
+                if os.path.exists(path) and os.path.getsize(path) == part.size:
+                    with open(path, "rb") as f:
+                        if zlib.crc32(f.read()) == part.crc:
+                            continue
+                zf = None
+                if part._source is not None:
+                    zf = archives.get(part._source)
+                    if zf is None:
+                        zf = archives[part._source] = zipfile.ZipFile(part._source)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(part.read(zf))
+                written += 1
+        finally:
+            for zf in archives.values():
+                zf.close()
+        return written
+
+    def save(self, path: str):
+        """
+        패키지를 zip으로 쓴다. 임시 파일에 쓴 뒤 교체하므로
+        자기 자신을 연 원본 경로에 저장해도 된다.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".opc-", suffix=".tmp", dir=directory)
+        sources: Dict[str, object] = {}
+        try:
+            with os.fdopen(fd, "wb") as out:
+                central = []
+                for name, part in self._parts.items():
+                    src = None
+                    if part._source is not None:
+                        src = sources.get(part._source)
+                        if src is None:
+                            src = sources[part._source] = open(part._source, "rb")
+                    raw = part.raw(src)
+                    central.append(self._write_local(out, part, raw))
+                cd_offset = out.tell()
+                for entry in central:
+                    out.write(entry)
+                cd_size = out.tell() - cd_offset
+                if len(central) > 0xFFFF or cd_offset > _ZIP32_LIMIT:
+                    raise ValueError("package is too large for a non-ZIP64 archive")
+                out.write(_END_OF_CENTRAL_DIR.pack(b"PK\x05\x06", 0, 0, len(central), len(central),
+                                                   cd_size, cd_offset, 0))
+            os.chmod(tmp_path, 0o644)  # mkstemp은 0600으로 만든다
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            for f in sources.values():
+                f.close()
+
+    @staticmethod
+    def _write_local(out, part: _Part, raw: bytes) -> bytes:
+        offset = out.tell()
+        if offset > _ZIP32_LIMIT or len(raw) > _ZIP32_LIMIT or part.size > _ZIP32_LIMIT:
+            raise ValueError("package is too large for a non-ZIP64 archive")
+        try:
+            name = part.name.encode("ascii")
+            flags = 0
+        except UnicodeEncodeError:
+            name = part.name.encode("utf-8")
+            flags = _UTF8_FLAG
+        if part._zinfo is not None:
+            # 원본의 플래그(압축 옵션 등)는 유지하되 data descriptor는 쓰지 않는다
+            flags |= part._zinfo.flag_bits & ~_DATA_DESCRIPTOR_FLAG & ~_UTF8_FLAG
+        dos_time, dos_date = _dos_datetime(part.date_time)
+        version = 20
+        out.write(_LOCAL_HEADER.pack(b"PK\x03\x04", version, flags, part.compress_type, dos_time, dos_date,
+                                     part.crc, len(raw), part.size, len(name), 0))
+        out.write(name)
+        out.write(raw)
+        return _CENTRAL_HEADER.pack(b"PK\x01\x02", version, version, flags, part.compress_type, dos_time,
+                                    dos_date, part.crc, len(raw), part.size, len(name), 0, 0, 0, 0, 0,
+                                    offset) + name
+
+
+def ppt_to_xml(ppt_file: str, xml_dir: str) -> OpcPackage:
+    """PPT/PPTX 파일을 part 파일들로 푼다 (`opc extract` 대체)"""
+    os.makedirs(xml_dir, exist_ok=True)
+    pkg = OpcPackage.open(ppt_file)
+    pkg.extract(xml_dir)
+    return pkg
+
+
+def xml_to_ppt(xml_dir: str, ppt_file: str, base: Optional[str] = None) -> OpcPackage:
+    """
+    풀어 둔 디렉토리를 PPTX로 다시 묶는다 (`opc repackage` 대체).
+    base를 주지 않으면 기존 ppt_file을 기준으로 바뀐 part만 압축한다.
+    """
+    pkg = OpcPackage.from_dir(xml_dir, base=base or ppt_file)
+    pkg.save(ppt_file)
+    return pkg
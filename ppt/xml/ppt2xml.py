@@ -1,26 +1,21 @@
-# pip install opc-diag
-import subprocess
-import os
+# opc CLI(opc-diag) subprocess 대신 프로세스 안에서 zipfile로 풀고 묶는다
+import shutil
 
-def ppt_to_xml(ppt_file, xml_dir):
-    """Converts a PPT/PPTX file to XML files by extracting its contents."""
-    if not os.path.exists(xml_dir):
-        os.makedirs(xml_dir)
-    subprocess.run(['opc', 'extract', ppt_file, xml_dir], check=True)
+from opc_package import ppt_to_xml, xml_to_ppt
 
-def xml_to_ppt(xml_dir, ppt_file):
-    """Repackages XML files back into a PPTX file."""
-    subprocess.run(['opc', 'repackage', xml_dir, ppt_file], check=True)
 
+if __name__ == "__main__":
+    # Example usage:
+    ppt_file = 'C:/Users/kwon/Downloads/sample2.pptx'
+    save_dir = './xml_template'
+    ppt_to_xml(ppt_file, save_dir)
+    # xml_ppt_agent는 template.pptx를 DeckBuilder base로 쓴다 (PPT_TEMPLATE_PPTX로 바꿀 수 있음)
+    shutil.copyfile(ppt_file, 'template.pptx')
 
-# Example usage:
-ppt_file = 'C:/Users/kwon/Downloads/sample2.pptx'
-save_dir = './xml_template'
-ppt_to_xml(ppt_file, save_dir)
-
-# save_dir = './xml_result'
-new_ppt_name = 'new.pptx'
-subprocess.call(f'opc repackage {save_dir} {new_ppt_name}')
+    # save_dir = './xml_result'
+    new_ppt_name = 'new.pptx'
+    # 원본 pptx를 base로 주면 바뀌지 않은 part는 압축된 바이트를 그대로 복사한다
+    xml_to_ppt(save_dir, new_ppt_name, base=ppt_file)
 
 
 # tmp = """
@@ -0,0 +1,268 @@
+"""
+템플릿 슬라이드 slot 채우기 엔진.
+
+기존에는 모델이 p:spTree, a:xfrm, a:rPr까지 포함한 슬라이드 XML 전체를 다시 써서
+슬라이드 하나에 수천 토큰을 출력했다. 여기서는 모델이 template_index 카탈로그를 보고
+{"template": "slide4", "slots": {"3.0": "...", "6.1": null}} 같은 작은 JSON만 돌려주고,
+나머지는 코드가 결정적으로 처리한다.
+
+- slot id("{cNvPr id}.{문단 번호}")에 해당하는 문단의 첫 a:r 서식을 유지한 채 a:t만 바꾼다
+- 값에 줄바꿈이 있으면 같은 서식의 문단을 복제해서 한 줄씩 넣는다 (목록 slot)
+- null/"" 값은 문단을 비우고, 모든 텍스트가 비워진 도형은 지운다
+- 넘치는 텍스트는 a:ext 높이를 슬라이드 아래 끝까지 늘리고, 그래도 넘치면 글자 크기를 줄인다
+- STREAM_THRESHOLD보다 큰 슬라이드 part는 트리 전체를 올리지 않고 xml_stream으로 도형 단위로 채운다
+
+사용 예:
+    template, values = parse_fill_response(result.final_output)
+    filled = fill_template("xml_template", template, values)
+    builder.add_slide(i, xml=filled.xml, rels=filled.rels)
+"""
+import copy
+import io
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from lxml import etree
+except ImportError:  # lxml이 없으면 표준 라이브러리 사용 (namespace prefix는 아래에서 등록)
+    from xml.etree import ElementTree as etree
+
+from template_index import NS, DEFAULT_INSET, DEFAULT_SZ, chars_per_line, line_height
+
+A = f"{{{NS['a']}}}"
+P = f"{{{NS['p']}}}"
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+DEFAULT_V_INSET = 45720  # bodyPr tIns/bIns 기본값 (EMU)
+MIN_SZ = 1000  # 넘칠 때 줄일 수 있는 최소 글자 크기 (10pt)
+# 이보다 큰 슬라이드 part는 스트리밍으로 채운다 (바이트, lxml이 있을 때만)
+STREAM_THRESHOLD = int(os.getenv("PPT_STREAM_THRESHOLD", str(1 << 20)))
+
+MC_IGNORABLE = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Ignorable"
+# ElementTree로 직렬화할 때 ns0 같은 prefix가 생기지 않도록 OOXML prefix를 등록
+PREFIXES = {
+    "a": NS["a"], "p": NS["p"], "r": NS["r"],
+    "mc": "http://schemas.openxmlformats.org/markup-compatibility/2006",
+    "p14": "http://schemas.microsoft.com/office/powerpoint/2010/main",
+    "a14": "http://schemas.microsoft.com/office/drawing/2010/main",
+    "a16": "http://schemas.microsoft.com/office/drawing/2014/main",
+}
+for _prefix, _uri in PREFIXES.items():
+    etree.register_namespace(_prefix, _uri)
+
+
+class FillResult:
+    __slots__ = ("template", "xml", "rels", "filled", "cleared", "removed", "resized", "unknown")
+
+    def __init__(self, template: str):
+        self.template = template
+        self.xml: bytes = b""
+        self.rels: Optional[bytes] = None
+        self.filled: List[str] = []
+        self.cleared: List[str] = []
+        self.removed: List[str] = []  # 지운 도형 id
+        self.resized: Dict[str, Dict[str, int]] = {}  # 도형 id -> {"cy": .., "sz": ..}
+        self.unknown: List[str] = []  # 템플릿에 없는 slot id
+
+    def summary(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in ("template", "filled", "cleared", "removed", "resized", "unknown")}
+
+
+def parse_fill_response(text: str) -> Tuple[str, Dict[str, Optional[str]]]:
+    """모델 응답에서 {"template": ..., "slots": {...}} JSON을 꺼낸다"""
+    body = text.strip()
+    start, end = body.find("{"), body.rfind("}")
+    data = json.loads(body[start:end + 1])
+    template = str(data["template"]).replace(".xml", "").split("/")[-1]
+    return template, data.get("slots") or {}
+
+
+def _paragraph_text(paragraph) -> str:
+    return "".join(t.text or "" for t in paragraph.iter(A + "t"))
+
+
+def _set_paragraph_text(paragraph, text: str):
+    """첫 a:r의 서식으로 문단 내용을 text 하나로 바꾼다"""
+    runs = paragraph.findall(A + "r")
+    template_run = runs[0] if runs else None
+    for child in list(paragraph):
+        if child.tag in (A + "r", A + "br", A + "fld"):
+            paragraph.remove(child)
+    if not text:
+        return
+    if template_run is None:
+        template_run = etree.Element(A + "r")
+        end = paragraph.find(A + "endParaRPr")
+        rpr = etree.SubElement(template_run, A + "rPr")
+        if end is not None:
+            for key in ("lang", "altLang", "sz", "b", "i"):
+                if end.get(key) is not None:
+                    rpr.set(key, end.get(key))
+    t = template_run.find(A + "t")
+    if t is None:
+        t = etree.SubElement(template_run, A + "t")
+    t.text = text
+    end = paragraph.find(A + "endParaRPr")
+    position = list(paragraph).index(end) if end is not None else len(paragraph)
+    paragraph.insert(position, template_run)
+
+
+def _shape_font_size(sp) -> int:
+    sizes = [int(rpr.get("sz")) for rpr in sp.iter(A + "rPr") if rpr.get("sz")]
+    return max(sizes) if sizes else DEFAULT_SZ
+
+
+def _fit_shape(sp, body, slide_height: Optional[int], min_sz: int) -> Optional[Dict[str, int]]:
+    """넘치는 텍스트에 맞게 높이를 늘리고, 필요하면 글자 크기를 줄인다"""
+    xfrm = sp.find(f"{P}spPr/{A}xfrm")
+    if xfrm is None or xfrm.find(A + "ext") is None:
+        return None
+    off, ext = xfrm.find(A + "off"), xfrm.find(A + "ext")
+    cx, cy = int(ext.get("cx", 0)), int(ext.get("cy", 0))
+    y = int(off.get("y", 0)) if off is not None else 0
+    body_pr = body.find(A + "bodyPr")
+    get = body_pr.get if body_pr is not None else (lambda key, default=None: default)
+    h_insets = int(get("lIns", DEFAULT_INSET)) + int(get("rIns", DEFAULT_INSET))
+    v_insets = int(get("tIns", DEFAULT_V_INSET)) + int(get("bIns", DEFAULT_V_INSET))
+
+    def needed_height(sz: int) -> float:
+        per_line = chars_per_line(cx, sz, h_insets)
+        lines = sum(max(1, math.ceil(len(_paragraph_text(p)) / per_line)) for p in body.findall(A + "p"))
+        return lines * line_height(sz) + v_insets
+
+    sz = _shape_font_size(sp)
+    needed = needed_height(sz)
+    if needed <= cy:
+        return None
+    changes = {}
+    limit = max(slide_height - y, cy) if slide_height else needed
+    new_cy = int(min(needed, limit))
+    if new_cy > cy:
+        ext.set("cy", str(new_cy))
+        changes["cy"] = new_cy
+    if needed > new_cy and sz > min_sz:
+        # 글자 폭과 줄 높이가 모두 sz에 비례하므로 면적 비율의 제곱근만큼 줄인다
+        new_sz = max(min_sz, int(sz * math.sqrt(new_cy / needed)) // 100 * 100)
+        while new_sz > min_sz and needed_height(new_sz) > new_cy:
+            new_sz -= 100
+        scale = new_sz / sz
+        for rpr in list(body.iter(A + "rPr")) + list(body.iter(A + "endParaRPr")):
+            rpr.set("sz", str(max(min_sz, int(int(rpr.get("sz", sz)) * scale) // 100 * 100)))
+        changes["sz"] = new_sz
+    return changes or None
+
+
+def shape_text_body(sp) -> Tuple[Optional[str], Any]:
+    """p:sp의 (cNvPr id, txBody). 텍스트가 없는 도형이면 txBody는 None"""
+    c_nv_pr = sp.find(f"{P}nvSpPr/{P}cNvPr")
+    return (c_nv_pr.get("id") if c_nv_pr is not None else None), sp.find(P + "txBody")
+
+
+def group_slots(values: Dict[str, Optional[str]]) -> Tuple[Dict[str, Dict[str, Optional[str]]], List[str]]:
+    """slot id -> 값을 도형 id별로 묶는다. 형식이 잘못된 slot id는 따로 돌려준다"""
+    by_shape: Dict[str, Dict[str, Optional[str]]] = {}
+    invalid = []
+    for slot_id, value in values.items():
+        shape_id, _, p_idx = str(slot_id).partition(".")
+        if not p_idx.isdigit():
+            invalid.append(slot_id)
+            continue
+        by_shape.setdefault(shape_id, {})[slot_id] = value
+    return by_shape, invalid
+
+
+def fill_shape(sp, body, shape_id: str, values: Dict[str, Optional[str]], result: FillResult,
+               slide_height: Optional[int] = None, min_sz: int = MIN_SZ) -> bool:
+    """
+    도형 하나의 slot을 채운다. 모든 텍스트가 비워져서 도형을 지워야 하면 False.
+    슬라이드 전체가 필요 없으므로 큰 part는 fill_template이 xml_stream.stream_fill로 도형마다 호출한다.
+    """
+    paragraphs = body.findall(A + "p")
+    updates = sorted(((int(slot_id.partition(".")[2]), slot_id, value) for slot_id, value in values.items()),
+                     reverse=True)
+    # 뒤 문단부터 바꿔야 줄바꿈으로 문단을 추가해도 앞 slot의 번호가 밀리지 않는다
+    for p_idx, slot_id, value in updates:
+        if p_idx >= len(paragraphs):
+            result.unknown.append(slot_id)
+            continue
+        paragraph = paragraphs[p_idx]
+        lines = [] if value is None else str(value).split("\n")
+        if not lines or not any(line.strip() for line in lines):
+            _set_paragraph_text(paragraph, "")
+            result.cleared.append(slot_id)
+            continue
+        _set_paragraph_text(paragraph, lines[0])
+        position = list(body).index(paragraph)
+        for offset, line in enumerate(lines[1:], start=1):
+            clone = copy.deepcopy(paragraph)
+            _set_paragraph_text(clone, line)
+            body.insert(position + offset, clone)
+        result.filled.append(slot_id)
+
+    if not any(_paragraph_text(p).strip() for p in body.findall(A + "p")):
+        result.removed.append(shape_id)
+        return False
+    changes = _fit_shape(sp, body, slide_height, min_sz)
+    if changes:
+        result.resized[shape_id] = changes
+    return True
+
+
+def fill_slide(template_xml: bytes, values: Dict[str, Optional[str]], slide_height: Optional[int] = None,
+               min_sz: int = MIN_SZ, template: str = "") -> FillResult:
+    result = FillResult(template)
+    root = etree.fromstring(template_xml)
+    parents = {child: parent for parent in root.iter() for child in parent}
+    by_shape, result.unknown = group_slots(values)
+    for sp in list(root.iter(P + "sp")):
+        shape_id, body = shape_text_body(sp)
+        if body is None or shape_id not in by_shape:
+            continue
+        if not fill_shape(sp, body, shape_id, by_shape.pop(shape_id), result, slide_height, min_sz):
+            parents[sp].remove(sp)
+    for slots in by_shape.values():
+        result.unknown.extend(slots)
+
+    # lxml/ElementTree 모두 encoding="unicode"면 선언 없이 문자열을 돌려준다
+    text = etree.tostring(root, encoding="unicode")
+    # ElementTree는 쓰이지 않는 namespace 선언을 지우므로 mc:Ignorable이 가리키는 prefix를 되살린다
+    for prefix in (root.get(MC_IGNORABLE) or "").split():
+        if f"xmlns:{prefix}=" not in text and prefix in PREFIXES:
+            head, _, rest = text.partition(" ")
+            text = f'{head} xmlns:{prefix}="{PREFIXES[prefix]}" {rest}'
+    result.xml = XML_DECLARATION + text.encode("utf-8")
+    return result
+
+
+def slide_height(template_dir: str) -> Optional[int]:
+    path = os.path.join(template_dir, "ppt", "presentation.xml")
+    if not os.path.exists(path):
+        return None
+    size = etree.parse(path).getroot().find(f"{P}sldSz")
+    return int(size.get("cy")) if size is not None else None
+
+
+def fill_template(template_dir: str, template: str, values: Dict[str, Optional[str]],
+                  min_sz: int = MIN_SZ, stream_threshold: int = STREAM_THRESHOLD) -> FillResult:
+    """
+    풀어 둔 템플릿 디렉토리의 슬라이드(template, 예: "slide4")를 채운다.
+    다른 번호의 슬라이드로 저장할 때 그림/레이아웃 연결이 유지되도록 템플릿의 .rels도 함께 돌려준다.
+    part가 stream_threshold보다 크면 파일에서 바로 도형 단위로 읽으므로 메모리는 결과 바이트 + 도형 하나 수준이다.
+    """
+    slide_path = os.path.join(template_dir, "ppt", "slides", f"{template}.xml")
+    height = slide_height(template_dir)
+    import xml_stream  # xml_stream이 이 모듈을 import하므로 여기서 가져온다
+    if xml_stream.etree is not None and os.path.getsize(slide_path) > stream_threshold:
+        out = io.BytesIO()
+        result = xml_stream.stream_fill(slide_path, out, values, height, min_sz, template=template)
+        result.xml = out.getvalue()
+    else:
+        with open(slide_path, "rb") as f:
+            template_xml = f.read()
+        result = fill_slide(template_xml, values, height, min_sz, template=template)
+    rels_path = os.path.join(template_dir, "ppt", "slides", "_rels", f"{template}.xml.rels")
+    if os.path.exists(rels_path):
+        with open(rels_path, "rb") as f:
+            result.rels = f.read()
+    return result
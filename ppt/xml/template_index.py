@@ -0,0 +1,314 @@
+"""
+템플릿 슬라이드 인덱서.
+
+xml_ppt_agent는 슬라이드마다 filesystem MCP로 xml_template/ppt/slides의 XML을 여러 개
+읽어 보고 적당한 템플릿을 골랐다. 큰 DrawingML 문서를 매번 read_file로 넘기는 비용을 없애기 위해
+템플릿 슬라이드를 한 번만 파싱해서 작은 카탈로그(JSON, 선택적으로 SQLite)를 만든다.
+
+슬라이드마다 기록하는 것:
+- text slot: 문단(a:p) 단위. id는 "{cNvPr id}.{문단 번호}", 현재 더미 텍스트(a:t), 박스(a:off/a:ext),
+  글자 크기, 대략적인 수용 글자 수(capacity)
+- picture slot: p:pic의 id, 박스, 연결된 media part
+- table(graphicFrame) 수
+
+슬라이드 XML의 sha1을 함께 저장해서 다시 실행하면 바뀐 슬라이드만 다시 파싱한다.
+
+실행:
+    python template_index.py xml_template --sqlite template_index.db  # xml_template_index.json에 저장
+사용:
+    catalog = load_or_build_index("xml_template", index_path_for("xml_template"))
+    prompt += summarize_catalog(catalog)   # 슬라이드당 한 줄
+"""
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional
+from xml.etree import ElementTree as ET
+
+from opc_package import OpcPackage
+
+NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+R_EMBED = f"{{{NS['r']}}}embed"
+
+INDEX_VERSION = 1
+EMU_PER_PT = 12700
+DEFAULT_SZ = 1800  # a:rPr sz 기본값 (1/100 pt)
+DEFAULT_INSET = 91440  # bodyPr lIns/rIns 기본값 (EMU)
+CHAR_WIDTH_EM = 0.6  # 평균 글자 폭 (em). 한글은 더 넓지만 요약용 추정치로 충분
+LINE_HEIGHT_EM = 1.2
+
+_SLIDE_RE = re.compile(r"^ppt/slides/slide(\d+)\.xml$")
+
+
+def line_height(sz: int) -> float:
+    """글자 크기 sz(1/100 pt)의 한 줄 높이 (EMU)"""
+    return sz / 100 * EMU_PER_PT * LINE_HEIGHT_EM
+
+
+def chars_per_line(cx: int, sz: int = DEFAULT_SZ, insets: int = 2 * DEFAULT_INSET) -> int:
+    return max(1, int((cx - insets) / (sz / 100 * EMU_PER_PT * CHAR_WIDTH_EM)))
+
+
+def estimate_capacity(cx: int, cy: int, sz: int = DEFAULT_SZ, insets: int = 2 * DEFAULT_INSET) -> int:
+    """박스(cx, cy EMU)에 글자 크기 sz(1/100 pt)로 들어가는 대략적인 글자 수"""
+    return chars_per_line(cx, sz, insets) * max(1, int(cy / line_height(sz)))
+
+
+def _box(element: ET.Element) -> Optional[List[int]]:
+    xfrm = element.find("p:spPr/a:xfrm", NS)
+    if xfrm is None:
+        xfrm = element.find("p:xfrm", NS)  # graphicFrame
+    if xfrm is None:
+        return None  # layout placeholder에서 위치를 상속
+    off, ext = xfrm.find("a:off", NS), xfrm.find("a:ext", NS)
+    if off is None or ext is None:
+        return None
+    return [int(off.get("x", 0)), int(off.get("y", 0)), int(ext.get("cx", 0)), int(ext.get("cy", 0))]
+
+
+def _c_nv_pr(element: ET.Element) -> ET.Element:
+    for path in ("p:nvSpPr/p:cNvPr", "p:nvPicPr/p:cNvPr", "p:nvGraphicFramePr/p:cNvPr"):
+        found = element.find(path, NS)
+        if found is not None:
+            return found
+    return ET.Element("cNvPr")
+
+
+def _placeholder(element: ET.Element) -> Optional[str]:
+    ph = element.find("p:nvSpPr/p:nvPr/p:ph", NS)
+    if ph is None:
+        return None
+    return ph.get("type", "body") + (f":{ph.get('idx')}" if ph.get("idx") else "")
+
+
+def _font_size(paragraph: ET.Element) -> int:
+    for rpr in paragraph.iterfind("a:r/a:rPr", NS):
+        if rpr.get("sz"):
+            return int(rpr.get("sz"))
+    end = paragraph.find("a:endParaRPr", NS)
+    if end is not None and end.get("sz"):
+        return int(end.get("sz"))
+    return DEFAULT_SZ
+
+
+def _insets(body_pr: Optional[ET.Element]) -> int:
+    if body_pr is None:
+        return 2 * DEFAULT_INSET
+    return int(body_pr.get("lIns", DEFAULT_INSET)) + int(body_pr.get("rIns", DEFAULT_INSET))
+
+
+def _relationships(pkg_read, slide_part: str) -> Dict[str, str]:
+    folder, filename = posixpath.split(slide_part)
+    rels_part = posixpath.join(folder, "_rels", filename + ".rels")
+    data = pkg_read(rels_part)
+    if data is None:
+        return {}
+    targets = {}
+    for rel in ET.fromstring(data).iterfind("rel:Relationship", NS):
+        target = rel.get("Target", "")
+        if rel.get("TargetMode") != "External":
+            target = posixpath.normpath(posixpath.join(folder, target))
+        targets[rel.get("Id")] = target
+    return targets
+
+
+def index_slide(slide_part: str, xml: bytes, rels: Dict[str, str]) -> Dict[str, Any]:
+    root = ET.fromstring(xml)
+    text_slots, pictures, tables = [], [], 0
+    title = None
+    for sp in root.iter(f"{{{NS['p']}}}sp"):
+        body = sp.find("p:txBody", NS)
+        if body is None:
+            continue
+        c_nv_pr = _c_nv_pr(sp)
+        shape_id = c_nv_pr.get("id")
+        box = _box(sp)
+        ph = _placeholder(sp)
+        paragraphs = body.findall("a:p", NS)
+        insets = _insets(body.find("a:bodyPr", NS))
+        for p_idx, paragraph in enumerate(paragraphs):
+            text = "".join(t.text or "" for t in paragraph.iterfind(".//a:t", NS))
+            if not text.strip():
+                continue
+            sz = _font_size(paragraph)
+            slot = {"id": f"{shape_id}.{p_idx}", "name": c_nv_pr.get("name", ""), "text": text, "sz": sz}
+            if box is not None:
+                slot["box"] = box
+                # 문단이 여러 개면 박스 높이를 나눠 쓴다고 보고 추정
+                slot["capacity"] = estimate_capacity(box[2], max(box[3] // len(paragraphs), 1), sz, insets)
+            if ph:
+                slot["ph"] = ph
+            text_slots.append(slot)
+            if title is None and (ph or "").startswith(("title", "ctrTitle")):
+                title = text
+    for pic in root.iter(f"{{{NS['p']}}}pic"):
+        c_nv_pr = _c_nv_pr(pic)
+        blip = pic.find("p:blipFill/a:blip", NS)
+        rid = blip.get(R_EMBED) if blip is not None else None
+        pictures.append({
+            "id": c_nv_pr.get("id"),
+            "name": c_nv_pr.get("name", ""),
+            "box": _box(pic),
+            "rId": rid,
+            "media": rels.get(rid),
+        })
+    for frame in root.iter(f"{{{NS['p']}}}graphicFrame"):
+        if frame.find(".//a:tbl", NS) is not None:
+            tables += 1
+    if title is None and text_slots:
+        # 제목 placeholder가 없으면 가장 큰 글자 크기의 텍스트를 제목으로 본다
+        title = max(text_slots, key=lambda s: s["sz"])["text"]
+    return {
+        "slide": posixpath.splitext(posixpath.basename(slide_part))[0],
+        "part": slide_part,
+        "sha1": hashlib.sha1(xml).hexdigest(),
+        "title": title,
+        "text_slots": text_slots,
+        "pictures": pictures,
+        "tables": tables,
+    }
+
+
+def _slide_sort_key(part: str) -> int:
+    return int(_SLIDE_RE.match(part).group(1))
+
+
+def build_index(source: str, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    템플릿(풀어 둔 디렉토리 또는 pptx)의 모든 슬라이드를 인덱싱한다.
+    previous 카탈로그에 sha1이 같은 슬라이드가 있으면 다시 파싱하지 않는다.
+    """
+    if os.path.isdir(source):
+        def read(part: str) -> Optional[bytes]:
+            path = os.path.join(source, *part.split("/"))
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        slides_dir = os.path.join(source, "ppt", "slides")
+        names = os.listdir(slides_dir) if os.path.isdir(slides_dir) else []
+        parts = [f"ppt/slides/{name}" for name in names]
+    else:
+        pkg = OpcPackage.open(source)
+
+        def read(part: str) -> Optional[bytes]:
+            return pkg.read(part) if part in pkg else None
+        parts = list(pkg)
+    parts = sorted((p for p in parts if _SLIDE_RE.match(p)), key=_slide_sort_key)
+
+    cached = {s["part"]: s for s in (previous or {}).get("slides", [])}
+    slides = []
+    for part in parts:
+        xml = read(part)
+        old = cached.get(part)
+        if old is not None and old["sha1"] == hashlib.sha1(xml).hexdigest():
+            slides.append(old)
+        else:
+            slides.append(index_slide(part, xml, _relationships(read, part)))
+    return {"version": INDEX_VERSION, "source": os.path.abspath(source), "slides": slides}
+
+
+def save_index(catalog: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_index(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return catalog if catalog.get("version") == INDEX_VERSION else None
+
+
+def index_path_for(template_dir: str) -> str:
+    """템플릿 디렉토리마다 따로 두는 카탈로그 경로 (xml_template -> xml_template_index.json, 디렉토리 옆)"""
+    template_dir = os.path.abspath(template_dir)
+    return os.path.join(os.path.dirname(template_dir), f"{os.path.basename(template_dir)}_index.json")
+
+
+def load_or_build_index(source: str, path: str) -> Dict[str, Any]:
+    """저장된 카탈로그를 읽고, 바뀐 슬라이드가 있으면 그 슬라이드만 다시 인덱싱해서 저장"""
+    previous = load_index(path)
+    catalog = build_index(source, previous)
+    if catalog != previous:
+        save_index(catalog, path)
+    return catalog
+
+
+def save_sqlite(catalog: Dict[str, Any], db_path: str):
+    """같은 카탈로그를 SQLite로 내보낸다 (슬라이드 검색/필터용)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(
+            """
+            DROP TABLE IF EXISTS slides;
+            DROP TABLE IF EXISTS slots;
+            CREATE TABLE slides (part TEXT PRIMARY KEY, slide TEXT, sha1 TEXT, title TEXT,
+                                 text_slots INTEGER, pictures INTEGER, tables INTEGER, summary TEXT);
+            CREATE TABLE slots (part TEXT, slot_id TEXT, kind TEXT, name TEXT, text TEXT, sz INTEGER,
+                                x INTEGER, y INTEGER, cx INTEGER, cy INTEGER, capacity INTEGER, media TEXT);
+            """
+        )
+        for slide in catalog["slides"]:
+            conn.execute(
+                "INSERT INTO slides VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (slide["part"], slide["slide"], slide["sha1"], slide["title"], len(slide["text_slots"]),
+                 len(slide["pictures"]), slide["tables"], summarize_slide(slide)),
+            )
+            for slot in slide["text_slots"]:
+                box = slot.get("box") or [None] * 4
+                conn.execute(
+                    "INSERT INTO slots VALUES (?, ?, 'text', ?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+                    (slide["part"], slot["id"], slot["name"], slot["text"], slot["sz"], *box, slot.get("capacity")),
+                )
+            for pic in slide["pictures"]:
+                box = pic.get("box") or [None] * 4
+                conn.execute(
+                    "INSERT INTO slots VALUES (?, ?, 'picture', ?, NULL, NULL, ?, ?, ?, ?, NULL, ?)",
+                    (slide["part"], pic["id"], pic["name"], *box, pic.get("media")),
+                )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def summarize_slide(slide: Dict[str, Any], max_text: int = 24) -> str:
+    """모델이 템플릿을 고를 수 있을 만큼만 요약한 한 줄"""
+    slots = ", ".join(
+        f"{s['id']}:{s['text'][:max_text]!r}({s.get('capacity', '?')})" for s in slide["text_slots"]
+    )
+    return (f"{slide['slide']} | title={slide['title']!r} | text[{len(slide['text_slots'])}]: {slots}"
+            f" | pictures={len(slide['pictures'])} | tables={slide['tables']}")
+
+
+def summarize_catalog(catalog: Dict[str, Any]) -> str:
+    return "\n".join(summarize_slide(slide) for slide in catalog["slides"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index template slides into a compact catalog")
+    parser.add_argument("source", help="extracted template directory or .pptx")
+    parser.add_argument("--out", default=None, help="catalog JSON (default: <source>_index.json next to source)")
+    parser.add_argument("--sqlite", help="also export the catalog to this SQLite database")
+    args = parser.parse_args()
+
+    catalog = load_or_build_index(args.source, args.out or index_path_for(args.source))
+    if args.sqlite:
+        save_sqlite(catalog, args.sqlite)
+    print(summarize_catalog(catalog))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,10 @@ import asyncio
 import shutil
 
 import os
-import subprocess
 import dotenv
 dotenv.load_dotenv(override=True)
 
-from typing import List
+from typing import List, Optional
 from collections import deque
 from xml.etree import ElementTree as ET
 
@@ -14,23 +13,49 @@ GITHUB_PERSONAL_ACCESS_TOKEN = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL")
 print(OPENAI_MODEL)
 
-from agents import Agent, Runner, trace, WebSearchTool
-from agents.mcp import MCPServer, MCPServerStdio
+from agents import Agent, trace, WebSearchTool
+from agents.mcp import MCPServer
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from instrumentation import run_agent
+from deck_builder import DeckBuilder
+from media_store import MediaHashCache
+from slide_scheduler import SlideResult, run_slides
+from template_index import index_path_for, load_or_build_index, summarize_catalog
+from slot_filler import FillResult, fill_template, parse_fill_response
+from build_manifest import BuildManifest, content_section
 
 import json
 
 CUR_PATH = os.getcwd()
+# 0이면 마지막에 한 번만 저장, N이면 N장마다 중간 저장 (중간 실패 대비)
+CHECKPOINT_EVERY = int(os.getenv("PPT_CHECKPOINT_EVERY", "0"))
+# xml_template을 푼 원본 pptx. DeckBuilder가 바뀌지 않은 part의 압축 바이트를 그대로 복사한다
+TEMPLATE_PPTX = os.getenv("PPT_TEMPLATE_PPTX", os.path.join(CUR_PATH, 'template.pptx'))
+# 동시에 생성할 슬라이드 수
+SLIDE_WORKERS = int(os.getenv("PPT_SLIDE_WORKERS", "4"))
+# 프롬프트/출력 형식을 바꾸면 올린다. 바뀌면 manifest의 이전 결과를 쓰지 않는다
+PROMPT_VERSION = "slots-1"
 
 TEMPLATE_XML_PROJECT_PATH = "C:/Users/kwon/Desktop/repo/github_mcp/ppt/xml/xml_template/ppt/slides/slide7.xml"
 RESULT_XML_PROJECT_PATH = "C:/Users/kwon/Desktop/repo/github_mcp/ppt/xml//xml_result/ppt/slides/slide{slide_idx}.xml"
-async def run(mcp_servers: List[MCPServer], content: str):
+async def run(mcp_servers: Optional[List[MCPServer]], content: str, checkpoint_every: int = CHECKPOINT_EVERY,
+              max_workers: int = SLIDE_WORKERS, output: Optional[str] = None, catalog: Optional[dict] = None,
+              manifest_path: Optional[str] = None, template_dir: Optional[str] = None,
+              media_cache: Optional[MediaHashCache] = None, template_pptx: Optional[str] = None) -> dict:
+    """
+    content로 덱 하나를 만들고 {"output", "slides", "failed", "reused"}를 돌려준다.
+    batch_decks처럼 여러 덱을 만들 때는 미리 읽은 catalog/media_cache를 공유하고
+    덱마다 다른 output/manifest_path를 넘긴다.
+    template_pptx는 template_dir을 푼 원본 pptx다 (없으면 모든 part를 다시 압축한다).
+    """
     print("Running...")
     agent = Agent(
         model=OPENAI_MODEL,
         name="Assistant",
         instructions=f"Answer questions about json",
-        mcp_servers=mcp_servers,
-        # tools=[WebSearchTool()]
+        mcp_servers=mcp_servers or [],
     )
 
     print("Agent initialized.")
@@ -47,52 +72,98 @@ async def run(mcp_servers: List[MCPServer], content: str):
     content: {content}
     project name:
     """
-    result = await Runner.run(starting_agent=agent, input=extract_prompt, max_turns=30)
-    projects = result.final_output.split(",")
-    print("추출한 프로젝트:", result.final_output)
-    # 내용 기반으로 슬라이드 개수만큼 반복
-    for i, project in enumerate(projects, start=5):
-        # 슬라이드 개수만큼 xml 생성
+    # 입력/템플릿/프롬프트가 같은 단계는 이전 빌드 결과를 재사용한다
+    manifest = BuildManifest(manifest_path or os.path.join(CUR_PATH, 'build_manifest.json'))
+    extract_key = manifest.key(content, PROMPT_VERSION)
+    projects = manifest.lookup("extract", extract_key)
+    if projects is None:
+        result = await run_agent(agent, extract_prompt, workflow="xml_ppt_extract", max_turns=30)
+        projects = [project.strip() for project in result.final_output.split(",") if project.strip()]
+        manifest.record("extract", extract_key, projects)
+    print("추출한 프로젝트:", ", ".join(projects))
+
+    # 템플릿 슬라이드는 한 번만 인덱싱하고 요약만 프롬프트에 넣는다 (슬라이드마다 XML을 읽어 보지 않도록)
+    template_dir = template_dir or os.path.join(CUR_PATH, 'xml_template')
+    if catalog is None:
+        catalog = load_or_build_index(template_dir, index_path_for(template_dir))
+    template_summary = summarize_catalog(catalog)
+    template_key = manifest.key([slide["sha1"] for slide in catalog["slides"]])
+    slide_keys = {
+        project: manifest.key(content_section(content, project), project, template_key, PROMPT_VERSION)
+        for project in projects
+    }
+    output = output or os.path.join(CUR_PATH, 'new.pptx')
+    deck_key = manifest.key(template_key, [slide_keys[project] for project in projects])
+    if manifest.lookup("deck", deck_key, output_path=output):
+        print("바뀐 슬라이드가 없습니다:", output)
+        return {"output": output, "slides": len(projects), "failed": [], "reused": len(projects)}
+
+    # 슬라이드는 메모리에서 채워서 바로 넘기고 덱은 마지막에 한 번만 패키징
+    template_pptx = template_pptx or TEMPLATE_PPTX
+    if not os.path.exists(template_pptx):
+        print(f"경고: 템플릿 pptx({template_pptx})가 없어 템플릿 part를 모두 다시 압축합니다")
+    builder = DeckBuilder(
+        template_dir=template_dir,
+        output=output,
+        checkpoint_every=checkpoint_every,
+        base=template_pptx,
+        # 같은 그림이 여러 이름으로 들어가면 하나만 남긴다. 해시는 빌드 사이에 재사용
+        media_cache=media_cache or MediaHashCache(os.path.join(CUR_PATH, 'media_hashes.json')),
+    )
+    # 모델은 슬라이드 XML 대신 slot id -> 텍스트 JSON만 출력하고, XML 치환/크기 조정은 slot_filler가 한다
+    slot_agent = Agent(
+        model=OPENAI_MODEL,
+        name="SlotFiller",
+        instructions="Fill presentation template slots. Reply with a single JSON object only.",
+    )
+
+    reused: List[str] = []
+
+    # 프로젝트마다 독립된 슬라이드이므로 동시에 생성 (전체 시간 ~ 가장 느린 슬라이드)
+    async def generate_slide(i: int, project: str) -> FillResult:
+        cached = manifest.lookup(f"project:{project}", slide_keys[project])
+        if cached is not None:
+            reused.append(project)
+            return fill_template(template_dir, cached["template"], cached["slots"])
         slide_prompt = f"""
         {content}
         위 내용에서 {project}에 대한 내용을 추출합니다.
-        xml_template/ppt/slides의 xml 파일 중 내용과 적절한 xml을 고릅니다.
-        이후 선택한 xml에 내용을 적절한 위치에 삽입합니다.
-        만약 내용을 모두 채우지 못했다면 채운 요소의 크기를 키우고 나머지를 삭제하여 화면을 최대한 채웁니다. 이때 다른 요소들은 절대 건들지 않고 침범하지 않습니다.
-        xml_result/ppt/slides/slide{i}.xml에 저장해주세요
+        아래 템플릿 슬라이드 목록(슬롯 id:현재 텍스트(수용 글자 수))에서 내용과 적절한 슬라이드를 하나 고릅니다.
+        {template_summary}
+        고른 슬라이드의 슬롯에 넣을 텍스트만 JSON으로 답합니다. XML은 출력하지 않습니다.
+        - 수용 글자 수를 넘지 않게 요약하고, 목록은 줄바꿈(\n)으로 구분합니다.
+        - 채울 내용이 없는 슬롯은 null로 두면 삭제됩니다. 언급하지 않은 슬롯은 템플릿 텍스트가 유지됩니다.
+        형식: {{"template": "slide7", "slots": {{"3.0": "프로젝트 이름", "5.0": "첫 줄\n둘째 줄", "6.0": null}}}}
         """
-        result = await Runner.run(starting_agent=agent, input=slide_prompt, max_turns=30)
-        print(f"Slide{i}의 xml:", result.final_output)
-        save_dir = os.path.join(CUR_PATH, 'xml_template')
-
-        new_ppt_name = os.path.join(CUR_PATH, 'new.pptx')
-        subprocess.call(f'opc repackage {save_dir} {new_ppt_name}')
-
-        print(new_ppt_name, "에 저장됨")
-        # xml_root = ET.fromstring(result.final_output)
-        # tree = ET.ElementTree(xml_root)
-        # # xml 파일로 저장
-        # xml_path = RESULT_XML_PROJECT_PATH.format(slide_idx=i)
-        # with open(xml_path, "wb") as xml_file:
-        #     tree.write(xml_file, encoding="utf-8", xml_declaration=True)
-
-
-
-async def init_servers():
-    # Initialize the MCP server with the specified parameters
-    # print("Initializing PPT servers...")
-
-    print("Initializing File System servers...")
-
-    server = MCPServerStdio(
-        name="Filesystem Server, via npx",
-        params={
-            "command": "npx",
-            "args": ["-y", "@modelcontextprotocol/server-filesystem", "C:/Users/SSAFY/Desktop/repo/github_mcp/ppt/xml"],
-        }
-    )
+        result = await run_agent(slot_agent, slide_prompt, workflow="xml_ppt_slide", max_turns=1)
+        template, values = parse_fill_response(result.final_output)
+        filled = fill_template(template_dir, template, values)
+        manifest.record(f"project:{project}", slide_keys[project], {"template": template, "slots": values})
+        return filled
+
+    def on_slide_done(slide: SlideResult):
+        if slide.ok:
+            filled: FillResult = slide.value
+            print(f"Slide{slide.index} <- {filled.template}:", filled.summary())
+            builder.add_slide(slide.index, xml=filled.xml, rels=filled.rels)
+        else:
+            print(f"Slide{slide.index} 생성 실패 ({slide.attempts}회 시도): {slide.error}")
+
+    slides = await run_slides(list(enumerate(projects, start=5)), generate_slide, max_workers=max_workers,
+                              on_done=on_slide_done)
+
+    new_ppt_name = builder.build()
+    print(new_ppt_name, "에 저장됨", f"({manifest.summary()})")
+    print(f"미디어 해시 캐시: hit {builder.media_cache.hits}, miss {builder.media_cache.misses}")
+    manifest.prune(["extract", "deck"] + [f"project:{project}" for project in projects])
+    failed = [slide for slide in slides if not slide.ok]
+    if not failed:
+        manifest.record("deck", deck_key)
+    if failed and len(failed) == len(slides):
+        raise RuntimeError(f"모든 슬라이드 생성 실패: {failed[0].error!r}")
+    return {"output": new_ppt_name, "slides": len(slides), "failed": [slide.index for slide in failed],
+            "reused": len(reused)}
 
-    return server
 
 content = """
   ## 👀 About Me
@@ -185,30 +256,9 @@ content = """
 
 
 async def main():
-    print("PPT servers initialized.")
-    async with MCPServerStdio(
-        name="Filesystem Server, via npx",
-        params={
-            "command": "npx",
-            "args": ["-y", "@modelcontextprotocol/server-filesystem", "C:/Users/kwon/Desktop/repo/github_mcp/ppt/xml"],
-        }
-        # prarams={
-        #     "command": "docker",
-        #     "args": [
-        #         "run",
-        #         "-i",
-        #         "--rm",
-        #         "--mount", "type=bind,src=C:/Users/SSAFY/Desktop/repo/github_mcp/ppt/xml,dst=/projects/Desktop",
-        #         "--mount", "type=bind,src=C:/Users/SSAFY/Desktop/repo/github_mcp/ppt/xml,dst=/projects/other/allowed/dir,ro",
-        #         "mcp/filesystem",
-        #         "/projects"
-        #         ]
-        # }
-    ) as s:
-        mcp_servers = [s]
-        with trace(workflow_name="MCP PPT XML Example"):
-            print('t')
-            await run(mcp_servers=mcp_servers, content=content)
+    # 프로젝트 추출은 content만, 슬라이드는 slot JSON만 다루므로 파일 도구가 필요 없다
+    with trace(workflow_name="MCP PPT XML Example"):
+        await run(mcp_servers=[], content=content)
 
 if __name__ == "__main__":
     # if not shutil.which("uv"):
@@ -0,0 +1,231 @@
+"""
+lxml iterparse/xmlfile 기반 스트리밍 XML 변환.
+
+ElementTree.fromstring은 part 전체를 트리로 올린다. 무거운 slide master, 차트가 들어간 덱은
+part 하나가 수 MB가 되고 작은 worker에서는 메모리가 부족해진다.
+여기서는 part를 한 번만 읽으면서
+
+- 도형(p:sp, p:pic, p:graphicFrame, p:cxnSp) 단위로만 서브트리를 만들어 handler에 넘기고
+- 그 밖의 요소는 시작/끝 태그를 바로 써 내려가며
+- 처리한 요소는 즉시 지운다.
+
+메모리는 part 크기가 아니라 가장 큰 도형 하나 크기에 비례한다.
+slot_filler.fill_template은 STREAM_THRESHOLD(PPT_STREAM_THRESHOLD)보다 큰 슬라이드 part를 stream_fill로 채운다.
+OOXML은 mixed content가 a:t 같은 도형 내부에만 있으므로 도형 밖의 tail(들여쓰기 공백)은 버린다.
+
+사용 예:
+    stream_transform("slide5.xml", "out.xml", chain(
+        replace_text({"applicant_name": "권범준", "job": "Backend 개발자"}),
+        set_geometry({"3": {"cy": 1200000}}),
+    ))
+    result = stream_fill("xml_template/ppt/slides/slide4.xml", "slide5.xml", {"3.0": "프로젝트"})
+"""
+import io
+import os
+import zipfile
+from typing import Callable, Dict, IO, Optional, Union
+
+try:
+    from lxml import etree
+except ImportError:  # 스트리밍 변환을 쓸 때만 필요하다
+    etree = None
+
+from slot_filler import A, P, MIN_SZ, FillResult, fill_shape, group_slots, shape_text_body
+
+SHAPE_TAGS = frozenset(P + tag for tag in ("sp", "pic", "graphicFrame", "cxnSp"))
+GEOMETRY_KEYS = {"x": "off", "y": "off", "cx": "ext", "cy": "ext"}
+
+Source = Union[str, bytes, IO[bytes]]
+# 도형 서브트리를 받아 수정한다. None을 돌려주면 도형을 지운다
+Handler = Callable[[object], Optional[object]]
+
+
+def _require_lxml():
+    if etree is None:
+        raise ImportError("스트리밍 XML 변환에는 lxml이 필요합니다: pip install lxml")
+
+
+def _shape_id(shape) -> Optional[str]:
+    for c_nv_pr in shape.iter(P + "cNvPr"):
+        return c_nv_pr.get("id")
+    return None
+
+
+def stream_transform(source: Source, dest: Union[str, IO[bytes]], handler: Handler,
+                     units=SHAPE_TAGS) -> int:
+    """
+    source를 한 번 읽으면서 units 태그의 서브트리마다 handler를 적용해 dest에 쓴다.
+    units 안에 다시 units 태그가 있으면(그룹 도형 등) 바깥 것 하나만 넘어간다.
+    처리한 도형 수를 돌려준다.
+    """
+    _require_lxml()
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    count = 0
+    open_tags = []  # (요소, xmlfile context, text를 썼는지)
+    unit = None
+    with etree.xmlfile(dest, encoding="UTF-8") as xf:
+        xf.write_declaration(standalone=True)
+        for event, el in etree.iterparse(source, events=("start", "end"), huge_tree=True):
+            if unit is not None:
+                if event == "end" and el is unit:
+                    count += 1
+                    new = handler(el)
+                    if new is not None:
+                        new.tail = None
+                        xf.write(new)
+                    unit = None
+                    _release(el)
+                continue
+
+            if event == "start":
+                # 자식이 시작되는 시점에는 부모의 text가 이미 파싱되어 있다
+                _flush_text(xf, open_tags)
+                if el.tag in units:
+                    unit = el
+                    continue
+                parent_nsmap = open_tags[-1][0].nsmap if open_tags else {}
+                nsmap = {k: v for k, v in el.nsmap.items() if parent_nsmap.get(k) != v}
+                ctx = xf.element(el.tag, dict(el.attrib), nsmap=nsmap or None)
+                ctx.__enter__()
+                open_tags.append([el, ctx, False])
+            else:
+                _flush_text(xf, open_tags)
+                _, ctx, _ = open_tags.pop()
+                ctx.__exit__(None, None, None)
+                xf.flush()
+                _release(el)
+    return count
+
+
+def _flush_text(xf, open_tags):
+    if open_tags and not open_tags[-1][2]:
+        open_tags[-1][2] = True
+        text = open_tags[-1][0].text
+        if text and text.strip():
+            xf.write(text)
+
+
+def _release(el):
+    """이미 쓴 요소와 앞 형제들을 지워서 트리가 커지지 않게 한다"""
+    el.clear(keep_tail=False)
+    parent = el.getparent()
+    if parent is not None:
+        while el.getprevious() is not None:
+            del parent[0]
+
+
+def stream_part(package_path: str, partname: str, dest: Union[str, IO[bytes]], handler: Handler) -> int:
+    """pptx 안의 part를 압축을 푼 채로 메모리에 올리지 않고 변환한다"""
+    with zipfile.ZipFile(package_path) as zf, zf.open(partname) as source:
+        return stream_transform(source, dest, handler)
+
+
+# --- handler ---
+
+def chain(*handlers: Handler) -> Handler:
+    def apply(shape):
+        for handler in handlers:
+            shape = handler(shape)
+            if shape is None:
+                return None
+        return shape
+    return apply
+
+
+def replace_text(mapping: Union[Dict[str, str], Callable[[str], str]]) -> Handler:
+    """
+    모든 a:t의 텍스트를 바꾼다.
+    dict면 템플릿 자리표시자(applicant_name 등)를 부분 문자열로 치환하고, 함수면 a:t 텍스트마다 호출한다.
+    """
+    if callable(mapping):
+        rewrite = mapping
+    else:
+        items = sorted(mapping.items(), key=lambda kv: -len(kv[0]))  # 긴 자리표시자부터
+
+        def rewrite(text: str) -> str:
+            for old, new in items:
+                text = text.replace(old, new)
+            return text
+
+    def apply(shape):
+        for t in shape.iter(A + "t"):
+            if t.text:
+                t.text = rewrite(t.text)
+        return shape
+    return apply
+
+
+def set_geometry(boxes: Dict[str, Dict[str, int]]) -> Handler:
+    """도형 id -> {"x", "y", "cx", "cy"} 중 주어진 값으로 a:off/a:ext를 바꾼다"""
+    def apply(shape):
+        box = boxes.get(_shape_id(shape))
+        if box:
+            xfrm = next(shape.iter(A + "xfrm"), None)
+            if xfrm is not None:
+                for key, value in box.items():
+                    target = xfrm.find(A + GEOMETRY_KEYS[key])
+                    if target is not None:
+                        target.set(key, str(int(value)))
+        return shape
+    return apply
+
+
+def scale_geometry(sx: float, sy: float) -> Handler:
+    """모든 도형의 위치/크기를 비율만큼 조정한다 (예: 4:3 -> 16:9 템플릿 변환)"""
+    def apply(shape):
+        xfrm = next(shape.iter(A + "xfrm"), None)
+        if xfrm is not None:
+            for tag, keys in (("off", ("x", "y")), ("ext", ("cx", "cy"))):
+                target = xfrm.find(A + tag)
+                if target is not None:
+                    for key, scale in zip(keys, (sx, sy)):
+                        target.set(key, str(int(int(target.get(key, 0)) * scale)))
+        return shape
+    return apply
+
+
+def stream_fill(source: Source, dest: Union[str, IO[bytes]], values: Dict[str, Optional[str]],
+                slide_height: Optional[int] = None, min_sz: int = MIN_SZ, template: str = "") -> FillResult:
+    """slot_filler.fill_slide와 같은 결과를 도형 단위 스트리밍으로 만든다 (result.xml은 비어 있다)"""
+    result = FillResult(template)
+    by_shape, result.unknown = group_slots(values)
+
+    def fill(shape):
+        if shape.tag != P + "sp":
+            return shape
+        shape_id, body = shape_text_body(shape)
+        slots = by_shape.pop(shape_id, None)
+        if body is None or slots is None:
+            return shape
+        return shape if fill_shape(shape, body, shape_id, slots, result, slide_height, min_sz) else None
+
+    stream_transform(source, dest, fill)
+    for slots in by_shape.values():
+        result.unknown.extend(slots)
+    return result
+
+
+def stream_file(path: str, handler: Handler) -> int:
+    """풀어 둔 패키지의 part 파일을 제자리에서 변환한다 (임시 파일에 쓴 뒤 교체)"""
+    tmp = path + ".tmp"
+    try:
+        count = stream_transform(path, tmp, handler)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return count
+
+
+def stream_dir(xml_dir: str, handler: Handler, folders=("ppt/slides", "ppt/slideLayouts", "ppt/slideMasters")) -> Dict[str, int]:
+    """풀어 둔 패키지(xml_template 등)의 슬라이드/레이아웃/마스터 part를 하나씩 변환한다"""
+    counts = {}
+    for folder in folders:
+        path = os.path.join(xml_dir, *folder.split("/"))
+        if not os.path.isdir(path):
+            continue
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith(".xml"):
+                counts[f"{folder}/{filename}"] = stream_file(os.path.join(path, filename), handler)
+    return counts
@@ -0,0 +1,141 @@
+"""
+사용자 repository 목록(inventory)을 LLM 없이 MCP tool로 직접 가져온다.
+
+기존에는 세션 시작마다 Runner.run(... "모든 repository를 나열")으로
+모델 한 턴 + 여러 번의 tool 호출을 써서 목록을 자유 텍스트로 받았다.
+여기서는 search_repositories tool을 페이지 단위로 한 번에 호출해 구조화된 목록을 만들고,
+사용자별로 디스크에 캐시한 뒤 이후에는 변경된 repository만 증분으로 갱신한다.
+
+사용 예:
+    repos = await load_inventory(server, "qja1998", identity=token_key(token))
+    PROMPT = f"... repositories:\n{format_inventory(repos)}"
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.dirname(__file__))
+INVENTORY_DIR = os.getenv("INVENTORY_DIR", os.path.join(ROOT, ".cache", "inventory"))
+
+PER_PAGE = 100
+# 증분 갱신으로는 삭제/비공개 전환을 알 수 없으므로 이 주기마다 전체 갱신
+FULL_REFRESH_AFTER = 24 * 3600
+# 이 시간 안에 갱신한 inventory는 tool 호출 없이 그대로 사용
+FRESH_FOR = 300
+
+REPO_FIELDS = ("name", "full_name", "description", "language", "stargazers_count",
+               "fork", "private", "html_url", "default_branch", "topics", "pushed_at", "updated_at")
+
+
+def _parse_tool_json(result) -> Dict[str, Any]:
+    if getattr(result, "isError", False):
+        raise RuntimeError(f"search_repositories failed: {result.content}")
+    text = "".join(getattr(c, "text", "") for c in result.content)
+    return json.loads(text)
+
+
+def _slim(repo: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: repo.get(k) for k in REPO_FIELDS}
+
+
+async def _search_page(server, query: str, page: int) -> Dict[str, Any]:
+    result = await server.call_tool("search_repositories", {"query": query, "page": page, "perPage": PER_PAGE})
+    return _parse_tool_json(result)
+
+
+async def fetch_repositories(server, owner: str, pushed_after: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    owner의 repository를 모두 가져온다.
+    첫 페이지로 total_count를 확인한 뒤 나머지 페이지는 동시에 요청한다.
+    """
+    query = f"user:{owner} fork:true"
+    if pushed_after:
+        query += f" pushed:>{pushed_after}"
+
+    first = await _search_page(server, query, 1)
+    items = list(first.get("items") or [])
+    total = min(first.get("total_count", len(items)), 1000)  # search API는 1000개까지만 반환
+    pages = (total + PER_PAGE - 1) // PER_PAGE
+    if pages > 1:
+        rest = await asyncio.gather(*(_search_page(server, query, p) for p in range(2, pages + 1)))
+        for data in rest:
+            items.extend(data.get("items") or [])
+    return [_slim(repo) for repo in items]
+
+
+def _inventory_path(owner: str, identity: str) -> str:
+    return os.path.join(INVENTORY_DIR, f"{owner}-{identity}.json")
+
+
+def _read_cached(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cached(path: str, data: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+async def load_inventory(server, owner: str, identity: str = "public", force_full: bool = False) -> List[Dict[str, Any]]:
+    """
+    사용자별 캐시된 inventory를 반환하고, 필요하면 갱신한다.
+
+    Args:
+        server: GitHub MCP 서버
+        owner: GitHub user/org 이름
+        identity: 토큰 식별자 (토큰에 따라 보이는 private repository가 다르므로 캐시 키에 포함)
+        force_full: 캐시를 무시하고 전체 갱신
+    """
+    path = _inventory_path(owner, identity)
+    cached = None if force_full else _read_cached(path)
+    now = time.time()
+
+    if cached is not None and now - cached["refreshed_at"] < FRESH_FOR:
+        return cached["repositories"]
+
+    if cached is None or now - cached["full_refreshed_at"] > FULL_REFRESH_AFTER:
+        repos = await fetch_repositories(server, owner)
+        full_refreshed_at = now
+    else:
+        # 마지막으로 본 push 이후에 바뀐 repository만 가져와서 병합
+        repos_by_name = {r["full_name"]: r for r in cached["repositories"]}
+        changed = await fetch_repositories(server, owner, pushed_after=cached.get("latest_pushed_at"))
+        for repo in changed:
+            repos_by_name[repo["full_name"]] = repo
+        repos = list(repos_by_name.values())
+        full_refreshed_at = cached["full_refreshed_at"]
+
+    repos.sort(key=lambda r: r.get("pushed_at") or "", reverse=True)
+    latest = repos[0].get("pushed_at") if repos else None
+    _write_cached(path, {
+        "owner": owner,
+        "refreshed_at": now,
+        "full_refreshed_at": full_refreshed_at,
+        "latest_pushed_at": latest or (cached or {}).get("latest_pushed_at"),
+        "repositories": repos,
+    })
+    return repos
+
+
+def format_inventory(repos: List[Dict[str, Any]]) -> str:
+    """프롬프트에 넣을 간결한 repository 목록 (한 줄에 하나)"""
+    lines = []
+    for r in repos:
+        parts = [r["name"]]
+        if r.get("language"):
+            parts.append(r["language"])
+        if r.get("fork"):
+            parts.append("fork")
+        if r.get("description"):
+            parts.append(r["description"])
+        lines.append(" | ".join(parts))
+    return "\n".join(lines)
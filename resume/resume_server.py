@@ -5,15 +5,23 @@ import os
 import dotenv
 dotenv.load_dotenv()
 ROOT = os.path.abspath(os.path.dirname(__file__))
-
-from collections import deque
+import sys
+sys.path.append(os.path.dirname(ROOT))
 
 GITHUB_PERSONAL_ACCESS_TOKEN = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL")
 
-from agents import Agent, Runner, trace
+from agents import Agent, trace
 from agents.mcp import MCPServer, MCPServerStdio
 
+from conversation_memory import ConversationMemory, agent_summarizer
+from instrumentation import InstrumentedMCPServer, run_agent
+from mcp_cache import CachingMCPServer, ToolResultCache
+from mcp_pool import token_key
+from repo_inventory import load_inventory, format_inventory
+
+MCP_CACHE_DB = os.getenv("MCP_CACHE_DB", os.path.join(os.path.dirname(ROOT), ".cache", "mcp_cache.db"))
+
 
 import json
 with open(os.path.join(ROOT, "resume.json"), "r", encoding='UTF8') as f:
@@ -29,17 +37,18 @@ async def run(mcp_server: MCPServer, directory_path: str):
     
     user_id = directory_path.split("/")[-1]
 
-    repositories = await Runner.run(starting_agent=agent, input=f"{directory_path}의 **모든** repository를 '\n'로 구분해서 나열")
+    repositories = await load_inventory(mcp_server, user_id, identity=token_key(GITHUB_PERSONAL_ACCESS_TOKEN))
 
     PROMPT = f"""
     You are a potfolio assistant. You are given {directory_path}.
     철저하게 {user_id} 관점에서 답변하라.
     json resume에 대한 전문가임을 명심하라.
     resume example: {resume}
-    repositories: {repositories.final_output}
+    repositories:
+    {format_inventory(repositories)}
     """
 
-    chat_history = deque([], maxlen=5)
+    memory = ConversationMemory(PROMPT, summarizer=agent_summarizer(OPENAI_MODEL), model=OPENAI_MODEL)
 
     while True:
         # Ask the user for the git command
@@ -48,23 +57,15 @@ async def run(mcp_server: MCPServer, directory_path: str):
         if command.lower() == "exit":
             break
         
-        END_PROMPT = f"""
-        history: {chat_history}
-        user: {command}"""
-
-        prompt = PROMPT + END_PROMPT
+        prompt = await memory.prompt(command)
         print(prompt)
 
         # Run the command and print the result
         print("\n" + "-" * 40)
         print(f"Running: {command}")
-        result = await Runner.run(starting_agent=agent, input=prompt)
+        result = await run_agent(agent, prompt, workflow="resume_server")
         print(result.final_output)
-        current_chat = [
-            {"role": "user", "content": command},
-            {"role": "assistant", "content": result.final_output},
-        ]
-        chat_history.append(current_chat)
+        memory.add(command, result.final_output)
         print("\n" + "-" * 40)
 
 
@@ -90,8 +91,11 @@ async def main():
             }
         },
     ) as server:
+        cached_server = CachingMCPServer.for_token(
+            server, GITHUB_PERSONAL_ACCESS_TOKEN, cache=ToolResultCache(db_path=MCP_CACHE_DB)
+        )
         with trace(workflow_name="MCP Git-Resume Example"):
-            await run(server, directory_path)
+            await run(InstrumentedMCPServer(cached_server), directory_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+"""
+서로 독립적인 슬라이드 생성 작업을 동시에 실행하는 스케줄러.
+
+프로젝트 목록이 정해지면 슬라이드마다 별도의 agent run을 돌리므로 순서대로 기다릴 필요가 없다.
+- 동시에 실행되는 작업 수를 max_workers로 제한하고 (모델 rate limit / MCP 서버 부하)
+- 실패한 슬라이드만 지수 backoff로 다시 시도하며
+- 결과는 완료 순서와 관계없이 입력 순서대로 돌려준다.
+
+사용 예:
+    async def generate(slide_idx, project):
+        result = await run_agent(agent, make_prompt(project, slide_idx), max_turns=30)
+        return result.final_output
+
+    slides = await run_slides(list(enumerate(projects, start=5)), generate, max_workers=4)
+    for slide in slides:
+        print(slide.index, slide.value if slide.ok else slide.error)
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+SLIDE_WORKERS = 4
+SLIDE_RETRIES = 2
+
+
+class SlideResult:
+    __slots__ = ("index", "value", "error", "attempts")
+
+    def __init__(self, index: int, value: Any = None, error: Optional[BaseException] = None, attempts: int = 1):
+        self.index = index
+        self.value = value
+        self.error = error
+        self.attempts = attempts
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def run_slides(jobs: Sequence[Tuple[int, Any]], generate: Callable[[int, Any], Awaitable[Any]],
+                     max_workers: int = SLIDE_WORKERS, retries: int = SLIDE_RETRIES, retry_delay: float = 2.0,
+                     on_done: Optional[Callable[[SlideResult], None]] = None) -> List[SlideResult]:
+    """
+    Args:
+        jobs: (슬라이드 번호, 작업 입력) 목록
+        generate: 슬라이드 하나를 만드는 코루틴 함수
+        max_workers: 동시에 실행할 최대 작업 수
+        retries: 슬라이드별 재시도 횟수 (최대 retries + 1번 실행)
+        retry_delay: 첫 재시도 전 대기 시간(초). 이후 두 배씩 늘어난다
+        on_done: 슬라이드가 끝날 때마다(성공/최종 실패) 완료 순서대로 호출
+    """
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def _run(slide_idx: int, job: Any) -> SlideResult:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with semaphore:
+                    value = await generate(slide_idx, job)
+                result = SlideResult(slide_idx, value=value, attempts=attempt)
+                break
+            except Exception as e:
+                if attempt > retries:
+                    result = SlideResult(slide_idx, error=e, attempts=attempt)
+                    break
+                print(f"[slide {slide_idx}] 실패 ({attempt}/{retries + 1}): {e!r}, 재시도")
+                # 대기 중에는 worker 자리를 다른 슬라이드에 양보한다
+                await asyncio.sleep(retry_delay * 2 ** (attempt - 1))
+        if on_done is not None:
+            on_done(result)
+        return result
+
+    # gather는 입력 순서대로 결과를 돌려주므로 출력 순서가 항상 같다
+    return list(await asyncio.gather(*(_run(slide_idx, job) for slide_idx, job in jobs)))
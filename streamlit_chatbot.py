@@ -1,17 +1,9 @@
 import streamlit as st
-import asyncio
 import shutil
 import os
+import queue
 import dotenv
 from collections import deque
-import platform # platform 모듈 임포트
-
-# --- Windows 환경일 경우 이벤트 루프 정책 설정 ---
-if platform.system() == "Windows":
-    try:
-        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-    except Exception as e:
-        st.warning(f"Failed to set WindowsProactorEventLoopPolicy: {e}")
 
 # --- 초기 설정 및 환경 변수 로드 ---
 try:
@@ -26,6 +18,7 @@ OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4") # 기본값 설정
 try:
     from agents import Agent, Runner, trace # trace는 선택적으로 사용
     from agents.mcp import MCPServer, MCPServerStdio
+    from openai.types.responses import ResponseTextDeltaEvent
 except ImportError:
     st.error("필수 라이브러리(`agents`, `agents-mcp`)를 찾을 수 없습니다.")
     st.stop()
@@ -34,39 +27,61 @@ if not GITHUB_PERSONAL_ACCESS_TOKEN:
     st.error("GITHUB_PERSONAL_ACCESS_TOKEN 환경 변수가 설정되지 않았습니다.")
     st.stop()
 
-# --- 원본 run 함수의 로직을 분할한 비동기 함수들 ---
+from async_runner import BackgroundLoop
+from instrumentation import InstrumentedMCPServer, run_agent, track_run
+from mcp_cache import CachingMCPServer, ToolResultCache
+from mcp_pool import MCPServerPool, token_key
+from repo_inventory import load_inventory, format_inventory
+
+
+@st.cache_resource(show_spinner=False)
+def get_app_loop() -> BackgroundLoop:
+    """
+    앱이 소유하는 장수 이벤트 루프 (Streamlit rerun/세션 간 공유).
+    Windows Proactor 루프도 여기서 만들어지므로 전역 이벤트 루프 정책을 바꿀 필요가 없다.
+    """
+    return BackgroundLoop(name="streamlit-app-loop")
+
+
+@st.cache_resource(show_spinner=False)
+def get_mcp_pool() -> MCPServerPool:
+    """프로세스 전역 MCP 서버 풀 (Streamlit rerun/세션 간 공유)"""
+    pool = MCPServerPool(loop=get_app_loop())
+    pool.warm(GITHUB_PERSONAL_ACCESS_TOKEN)  # 첫 요청 전에 컨테이너를 미리 띄움
+    return pool
+
 
-async def fetch_initial_repositories(github_path: str) -> str | None:
+@st.cache_resource(show_spinner=False)
+def get_tool_cache() -> ToolResultCache:
+    """읽기 전용 MCP tool 결과 캐시 (Streamlit rerun/세션 간 공유)"""
+    return ToolResultCache()
+
+
+app_loop = get_app_loop()
+mcp_pool = get_mcp_pool()
+tool_cache = get_tool_cache()
+
+# --- 원본 run 함수의 로직을 분할한 함수들 ---
+# 코루틴은 모두 app_loop에서 실행되고, st.* 호출은 스크립트 스레드에서만 한다.
+
+def fetch_initial_repositories(github_path: str) -> str | None:
     """초기 레포지토리 목록을 가져옵니다 (원본 run 함수의 첫 부분)"""
     st.info(f"'{github_path}'에서 레포지토리 목록을 가져오는 중...")
-    docker_env = f"GITHUB_PERSONAL_ACCESS_TOKEN={GITHUB_PERSONAL_ACCESS_TOKEN}"
-    try:
-        # 이 작업을 위해 별도의 서버 컨텍스트 생성
-        async with MCPServerStdio(
-            cache_tools_list=True, # 원본처럼 캐시 사용 (선택 사항)
-            params={
-                "command": "docker",
-                "args": ["run", "-i", "--rm", "-e", docker_env, "ghcr.io/github/github-mcp-server"]
-            }
-        ) as server:
-            # 레포지토리 목록 가져오기용 임시 Agent
-            repo_agent = Agent(
-                model=OPENAI_MODEL,
-                name="RepoFetcher",
-                instructions="List all repositories separated by '\\n'. Use the provided path.",
-                mcp_servers=[server],
-            )
-            # 원본의 첫 Runner.run 호출과 유사
-            result = await Runner.run(
-                starting_agent=repo_agent,
-                input=f"{github_path}의 모든 repository를 '\\n'로 구분해서 나열"
+
+    owner = github_path.rstrip("/").split("/")[-1]
+
+    async def _fetch():
+        # 풀에 미리 떠 있는 서버 사용 (docker run 대기 없음)
+        async with mcp_pool.lease(GITHUB_PERSONAL_ACCESS_TOKEN) as pooled_server:
+            server = InstrumentedMCPServer(
+                CachingMCPServer.for_token(pooled_server, GITHUB_PERSONAL_ACCESS_TOKEN, cache=tool_cache)
             )
-            if hasattr(result, 'final_output'):
-                st.success("레포지토리 목록 로딩 완료!")
-                return result.final_output
-            else:
-                st.error("레포지토리 목록 결과 형식 오류")
-                return None
+            return await load_inventory(server, owner, identity=token_key(GITHUB_PERSONAL_ACCESS_TOKEN))
+
+    try:
+        repos = app_loop.run(_fetch())
+        st.success(f"레포지토리 목록 로딩 완료! ({len(repos)}개)")
+        return format_inventory(repos)
     except Exception as e:
         st.error(f"레포지토리 목록 로딩 중 오류: {e}")
         import traceback
@@ -75,10 +90,64 @@ async def fetch_initial_repositories(github_path: str) -> str | None:
         print("--------------------------------------")
         return None
 
-async def process_user_command(github_path: str, repositories: str, chat_history: deque, user_command: str) -> str:
-    """사용자 명령(채팅 입력)을 처리합니다 (원본 run 함수의 루프 내부 로직)"""
-    st.info("AI 응답 생성 중...")
-    docker_env = f"GITHUB_PERSONAL_ACCESS_TOKEN={GITHUB_PERSONAL_ACCESS_TOKEN}"
+def _tool_name(item) -> str:
+    raw_item = getattr(item, "raw_item", None)
+    return getattr(raw_item, "name", None) or "tool"
+
+
+async def _stream_agent(agent, full_prompt: str, events: queue.Queue):
+    """
+    Runner.run_streamed 이벤트를 (종류, 값) 형태로 events 큐에 넣는다.
+    app_loop 스레드에서 실행되므로 st.* 를 직접 호출하지 않고 큐로만 전달한다.
+    """
+    async with track_run(agent, "streamlit") as run:
+        result = Runner.run_streamed(starting_agent=agent, input=full_prompt)
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                events.put(("text", event.data.delta))
+            elif event.type == "run_item_event":
+                if event.name == "tool_called":
+                    events.put(("tool_called", _tool_name(event.item)))
+                elif event.name == "tool_output":
+                    events.put(("tool_output", None))
+                elif event.name == "message_output_created":
+                    events.put(("message_done", None))
+        run.result = result
+    return result
+
+
+def _render_stream(future, events: queue.Queue, placeholder, status) -> None:
+    """app_loop에서 들어오는 이벤트를 스크립트 스레드에서 화면에 반영"""
+    text = ""
+    while True:
+        try:
+            kind, value = events.get(timeout=0.05)
+        except queue.Empty:
+            if future.done() and events.empty():
+                break
+            continue
+        if kind == "text":
+            text += value
+            placeholder.markdown(text + "▌")
+        elif kind == "tool_called":
+            status.update(label=f"도구 호출 중: {value}")
+            status.write(f"🔧 {value}")
+        elif kind == "message_done" and text:
+            # tool 호출 전후로 여러 메시지가 나올 수 있으므로 메시지 단위로 구분
+            text += "\n\n"
+
+
+def process_user_command(github_path: str, repositories: str, chat_history: deque, user_command: str,
+                         placeholder=None, status=None) -> str:
+    """
+    사용자 명령(채팅 입력)을 처리합니다 (원본 run 함수의 루프 내부 로직)
+
+    placeholder(st.empty)와 status(st.status)가 주어지면 streaming 모드로 동작하여
+    토큰과 도구 호출 진행 상황을 도착하는 대로 화면에 표시합니다.
+    """
+    streaming = placeholder is not None and status is not None
+    if not streaming:
+        st.info("AI 응답 생성 중...")
     user_id = github_path.split("/")[-1] if "github.com" in github_path else "local_user"
 
     # 원본 PROMPT 구성 (상수 부분)
@@ -103,15 +172,12 @@ async def process_user_command(github_path: str, repositories: str, chat_history
     full_prompt = PROMPT_BASE + END_PROMPT
     # print(f"--- Full Prompt ---\n{full_prompt}\n-------------------") # 디버깅용
 
-    try:
-        # 이 상호작용을 위해 별도의 서버 컨텍스트 생성
-        async with MCPServerStdio(
-            cache_tools_list=True,
-            params={
-                "command": "docker",
-                "args": ["run", "-i", "--rm", "-e", docker_env, "ghcr.io/github/github-mcp-server"]
-            }
-        ) as server:
+    async def _chat(events: queue.Queue | None = None):
+        # 풀에 미리 떠 있는 서버 사용 (docker run 대기 없음)
+        async with mcp_pool.lease(GITHUB_PERSONAL_ACCESS_TOKEN) as pooled_server:
+            server = InstrumentedMCPServer(
+                CachingMCPServer.for_token(pooled_server, GITHUB_PERSONAL_ACCESS_TOKEN, cache=tool_cache)
+            )
             # 채팅 응답용 Agent (원본 run 함수의 agent와 동일)
             chat_agent = Agent(
                 model=OPENAI_MODEL,
@@ -120,18 +186,34 @@ async def process_user_command(github_path: str, repositories: str, chat_history
                 mcp_servers=[server],
             )
 
+            if events is not None:
+                return await _stream_agent(chat_agent, full_prompt, events)
             # 원본의 루프 내 Runner.run 호출과 유사
             # trace 사용 가능: with trace(workflow_name="Streamlit Chat Interaction"):
-            result = await Runner.run(starting_agent=chat_agent, input=full_prompt)
+            return await run_agent(chat_agent, full_prompt, workflow="streamlit")
 
-            if hasattr(result, 'final_output'):
+    try:
+        if streaming:
+            events = queue.Queue()
+            future = app_loop.submit(_chat(events))
+            _render_stream(future, events, placeholder, status)
+            result = future.result()
+        else:
+            result = app_loop.run(_chat())
+
+        if hasattr(result, 'final_output'):
+             if streaming:
+                 status.update(label="AI 응답 생성 완료!", state="complete")
+             else:
                  st.success("AI 응답 생성 완료!")
-                 return result.final_output
-            else:
-                st.error("AI 응답 결과 형식 오류")
-                return "오류: 응답 형식이 올바르지 않습니다."
+             return result.final_output
+        else:
+            st.error("AI 응답 결과 형식 오류")
+            return "오류: 응답 형식이 올바르지 않습니다."
 
     except Exception as e:
+        if streaming:
+            status.update(label="AI 응답 생성 중 오류", state="error")
         st.error(f"AI 응답 생성 중 오류: {e}")
         import traceback
         print("--- process_user_command ERROR ---")
@@ -156,11 +238,14 @@ if "chat_history_deque" not in st.session_state:
     st.session_state.chat_history_deque = deque([], maxlen=5) # 원본과 동일하게 deque 사용
 if "initial_fetch_done" not in st.session_state:
      st.session_state.initial_fetch_done = False # 초기 로딩 완료 여부 플래그
+if "streaming" not in st.session_state:
+    st.session_state.streaming = True # 토큰 단위 streaming 표시 여부
 
 
 # --- 사이드바: GitHub 경로 입력 ---
 with st.sidebar:
     st.header("Target Repository")
+    st.toggle("Stream responses", key="streaming")
     new_path = st.text_input("GitHub User/Org URL:", value=st.session_state.github_path)
 
     # 경로 변경 시 상태 초기화 및 초기 정보 로드 트리거
@@ -172,7 +257,7 @@ with st.sidebar:
         st.session_state.initial_fetch_done = False # 초기 로딩 플래그 리셋
         # 초기 레포지토리 목록 로드 실행
         with st.spinner(f"Loading repositories from {new_path}..."):
-            repos = asyncio.run(fetch_initial_repositories(new_path))
+            repos = fetch_initial_repositories(new_path)
             st.session_state.repositories = repos # 결과 저장
             st.session_state.initial_fetch_done = True # 로딩 시도 완료
         st.rerun() # 상태 저장 후 UI 즉시 새로고침
@@ -208,19 +293,27 @@ if st.session_state.github_path and st.session_state.repositories:
         with st.chat_message("user"):
             st.markdown(user_command)
 
-        # 비동기 함수 호출하여 응답 받기
-        ai_response = asyncio.run(
-            process_user_command(
+        # app_loop에서 응답 생성 (streaming 모드면 도착하는 토큰을 바로 표시)
+        with st.chat_message("assistant"):
+            if st.session_state.streaming:
+                status = st.status("AI 응답 생성 중...", expanded=False)
+                placeholder = st.empty()
+            else:
+                status = placeholder = None
+            ai_response = process_user_command(
                 st.session_state.github_path,
                 st.session_state.repositories,
                 st.session_state.chat_history_deque, # 현재까지의 deque 전달
-                user_command
+                user_command,
+                placeholder=placeholder,
+                status=status,
             )
-        )
 
-        # AI 응답 표시
-        with st.chat_message("assistant"):
-            st.markdown(ai_response)
+            # AI 응답 표시
+            if placeholder is not None:
+                placeholder.markdown(ai_response)
+            else:
+                st.markdown(ai_response)
 
         # 대화 기록 업데이트 (deque) - 원본 구조 유지
         current_chat_turn = [
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mcp_multiplex
+from mcp_multiplex import MultiplexedMCPServer, _Lane, _Request
+
+
+def make_mux(processes: int) -> MultiplexedMCPServer:
+    mux = MultiplexedMCPServer(params={}, processes=processes)
+    mux._lanes = [_Lane(i, SimpleNamespace(name=f"fake#{i}"), 8, 16) for i in range(processes)]
+    return mux
+
+
+def fake_register(fail_users=()):
+    async def call(server, tool_name, arguments, meta):
+        await asyncio.sleep(0.01)  # 등록 응답을 기다리는 동안 다른 사용자도 등록을 시작한다
+        user_id = meta["request_id"].rsplit("-", 1)[0]
+        if user_id in fail_users:
+            raise ConnectionError("register failed")
+        text = json.dumps({"session_id": f"session-{user_id}"})
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], isError=False)
+    return call
+
+
+def test_concurrent_registrations_are_spread_across_lanes(monkeypatch):
+    monkeypatch.setattr(mcp_multiplex, "call_tool_with_meta", fake_register())
+    mux = make_mux(2)
+
+    async def main():
+        await asyncio.gather(*(mux.register_user(f"user{i}", "pat") for i in range(10)))
+
+    asyncio.run(main())
+    assert [lane["users"] for lane in mux.stats()] == [5, 5]
+
+
+def test_failed_registration_releases_the_lane(monkeypatch):
+    monkeypatch.setattr(mcp_multiplex, "call_tool_with_meta", fake_register(fail_users={"bad0", "bad1"}))
+    mux = make_mux(2)
+
+    async def main():
+        return await asyncio.gather(*(mux.register_user(user, "pat") for user in ("bad0", "bad1", "ok0", "ok1")),
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert isinstance(results[0], ConnectionError) and isinstance(results[1], ConnectionError)
+    assert [lane.assigned for lane in mux._lanes] == [1, 1]
+    assert "bad0" not in mux._user_lane and "bad1" not in mux._user_lane
+
+
+def test_stop_cancels_inflight_calls(monkeypatch):
+    started = []
+
+    async def hang(server, tool_name, arguments, meta):
+        started.append(tool_name)
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(mcp_multiplex, "call_tool_with_meta", hang)
+
+    async def main():
+        lane = _Lane(0, SimpleNamespace(name="fake#0"), 8, 16)
+        lane.start()
+        call = asyncio.create_task(lane.submit(_Request("user", "get_me", {}, "user-1")))
+        while not started:
+            await asyncio.sleep(0)
+        await lane.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(call, timeout=1)
+        assert lane.inflight == 0
+
+    asyncio.run(main())